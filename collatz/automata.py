@@ -1,10 +1,28 @@
 """
 This module provides automata that model certain aspects of the Collatz problem.
+
+Besides the state machines, the module provides functions that simulate many independent
+chains of the machines at once. The simulations encode the states as integers, namely
+as indices of LEADING_BITS_STATES and TRAILING_BITS_STATES, and draw the transitions
+from tables with numpy. The class TransitionCounter counts the transitions that actually
+occur in Collatz sequences, so that the machines can be validated against real data.
 """
 
 # Imports
 from abc import ABC, abstractmethod
 import random
+import numpy as np
+import pandas as pd
+from collatz import commons, tensor
+from collatz.markov import MarkovChain
+
+
+# States of the machines in the order of their integer codes
+LEADING_BITS_STATES = ("100", "101", "110", "111")
+TRAILING_BITS_STATES = ("001", "011", "101", "111")
+
+# Highest alpha_i counted separately by the TransitionCounter
+MAX_COUNTED_ALPHA = 127
 
 
 class AbstractStateMachine(ABC):
@@ -13,6 +31,10 @@ class AbstractStateMachine(ABC):
     Every state machine derived from this class has a current state and a previous state, which
     is allowed to be *None*. The machine can be moved to the next state by calling the
     method *next_state*.
+
+    The nondeterministic transitions of a machine are described by a dict, which maps the
+    current state and the input of the machine to a list of equally likely tuples of next
+    state and output.
     """
     def __init__(self, current_state=None, previous_state=None):
         """
@@ -23,6 +45,7 @@ class AbstractStateMachine(ABC):
         :param previous_state: The previous state or None.
         """
         self.valid_states = self._get_valid_states()
+        self.transitions = self._get_transitions()
         self._validate_state(current_state)
         self._validate_state(previous_state)
 
@@ -48,6 +71,34 @@ class AbstractStateMachine(ABC):
         :return: The set of valid states.
         """
 
+    @abstractmethod
+    def _get_transitions(self):
+        """
+        This method returns the transitions of the machine.
+
+        :return: A dict that maps every combination of current state and input to a list
+            of equally likely tuples of next state and output.
+        """
+
+    @abstractmethod
+    def markov_chain(self):
+        """
+        This method returns the transitions of the machine as Markov chain, where all
+        branches of a transition are equally likely. The states of the chain are the
+        combinations of state and input that determine the next transition.
+
+        :return: The MarkovChain.
+        """
+
+    def transition_matrix(self):
+        """
+        This method returns the transition matrix of the Markov chain of the machine.
+        The rows and columns follow the states of the chain returned by *markov_chain*.
+
+        :return: The transition matrix as numpy array.
+        """
+        return self.markov_chain().transition_matrix()
+
     def _validate_state(self, state):
         """
         This method validates a certain state. A state is considered valid
@@ -91,7 +142,52 @@ class LeadingBitsMachine(AbstractStateMachine):
     """
 
     def _get_valid_states(self):
-        return {"100", "101", "110", "111"}
+        return set(LEADING_BITS_STATES)
+
+    def _get_transitions(self):
+        """
+        This method returns the transitions of the machine. Since the transitions depend
+        on the previous state, the keys of the dict are tuples of previous state (or None)
+        and current state. The output of a transition is lambda_i.
+
+        :return: The dict of transitions.
+        """
+        transitions = {}
+
+        for previous_state in LEADING_BITS_STATES + (None,):
+            if previous_state == "101":
+                transitions[(previous_state, "100")] = [("110", 1)]
+            else:
+                transitions[(previous_state, "100")] = [("110", 1), ("111", 1)]
+
+            if previous_state == "111":
+                transitions[(previous_state, "101")] = [("100", 2)]
+            elif previous_state == "110":
+                transitions[(previous_state, "101")] = [("111", 1)]
+            else:
+                transitions[(previous_state, "101")] = [("100", 2), ("111", 1)]
+
+            transitions[(previous_state, "110")] = [("100", 2), ("101", 2)]
+            transitions[(previous_state, "111")] = [("101", 2)]
+
+        return transitions
+
+    def markov_chain(self):
+        """
+        This method returns the transitions of the machine as Markov chain. The states
+        of the chain are tuples of previous state and current state. The output of a
+        transition is lambda_i. The chain starts without previous state.
+
+        :return: The MarkovChain.
+        """
+        transitions = [
+            ((previous_state, current_state), (current_state, next_state),
+             1 / len(branches), lambda_i)
+            for (previous_state, current_state), branches in self.transitions.items()
+            for next_state, lambda_i in branches]
+
+        initial_states = [(None, state) for state in LEADING_BITS_STATES]
+        return MarkovChain(transitions, initial_states)
 
     def next_state(self):
         """
@@ -100,31 +196,8 @@ class LeadingBitsMachine(AbstractStateMachine):
 
         :return: The next state and the binary growth lambda_i as output.
         """
-        next_state = None
-        lambda_i = None
-
-        if self.current_state == "100":
-            lambda_i = 1
-            if self.previous_state == "101":
-                next_state = "110"
-            else:
-                next_state = self._random_item({"110", "111"})
-        elif self.current_state == "101":
-            if self.previous_state == "111":
-                next_state = "100"
-                lambda_i = 2
-            elif self.previous_state == "110":
-                next_state = "111"
-                lambda_i = 1
-            else:
-                next_state = self._random_item({"100", "111"})
-                lambda_i = 1 if next_state == "111" else 2
-        elif self.current_state == "110":
-            next_state = self._random_item({"100", "101"})
-            lambda_i = 2
-        elif self.current_state == "111":
-            next_state = "101"
-            lambda_i = 2
+        next_state, lambda_i = self._random_item(
+            self.transitions[(self.previous_state, self.current_state)])
 
         self.previous_state = self.current_state
         self.current_state = next_state
@@ -143,7 +216,44 @@ class TrailingBitsMachine(AbstractStateMachine):
     """
 
     def _get_valid_states(self):
-        return {"001", "011", "101", "111"}
+        return set(TRAILING_BITS_STATES)
+
+    def _get_transitions(self):
+        """
+        This method returns the transitions of the machine. The keys of the dict are
+        tuples of current state and lambda_i. The output of a transition is omega_i.
+
+        :return: The dict of transitions.
+        """
+        transitions = {}
+
+        for lambda_i in (1, 2):
+            transitions[("001", lambda_i)] = [
+                (state, lambda_i - 2) for state in TRAILING_BITS_STATES]
+            transitions[("011", lambda_i)] = [
+                (state, lambda_i - 1) for state in ("001", "101")]
+            transitions[("101", lambda_i)] = [
+                (state, lambda_i - alpha_i)
+                for state in TRAILING_BITS_STATES for alpha_i in (3, 4)]
+            transitions[("111", lambda_i)] = [
+                (state, lambda_i - 1) for state in ("011", "111")]
+
+        return transitions
+
+    def markov_chain(self):
+        """
+        This method returns the transitions of the machine as Markov chain. The states
+        of the chain are the states of the machine. The input lambda_i is chosen randomly.
+        The output of a transition is omega_i.
+
+        :return: The MarkovChain.
+        """
+        transitions = [
+            (current_state, next_state, 1 / (2 * len(branches)), omega_i)
+            for (current_state, _), branches in self.transitions.items()
+            for next_state, omega_i in branches]
+
+        return MarkovChain(transitions, TRAILING_BITS_STATES)
 
     # pylint: disable=arguments-differ
     # Additional input parameter lambda_i introduced
@@ -155,25 +265,771 @@ class TrailingBitsMachine(AbstractStateMachine):
         :param: The input lambda_i or None. If None is handed over, lambda_i is chosen randomly.
         :return: The next state and the net binary growth *omega* as output.
         """
-        next_state = None
-        omega_i = None
-
         if lambda_i is None:
             lambda_i = self._random_item({1, 2})
 
-        if self.current_state == "001":
-            next_state = self._random_item(self.valid_states)
-            omega_i = lambda_i - 2
-        elif self.current_state == "011":
-            next_state = self._random_item({"001", "101"})
-            omega_i = lambda_i - 1
-        elif self.current_state == "101":
-            next_state = self._random_item(self.valid_states)
-            omega_i = lambda_i - self._random_item({3, 4})
-        elif self.current_state == "111":
-            next_state = self._random_item({"011", "111"})
-            omega_i = lambda_i - 1
+        next_state, omega_i = self._random_item(
+            self.transitions[(self.current_state, lambda_i)])
 
         self.previous_state = self.current_state
         self.current_state = next_state
         return next_state, omega_i
+
+
+def simulate_leading_bits(chains: int, steps: int, current_state=None,
+                          previous_state=None, seed=None):
+    """
+    This function simulates many independent chains of the LeadingBitsMachine at once.
+
+    :param chains: The number of chains.
+    :param steps: The number of steps per chain.
+    :param current_state: The initial state of all chains or None (default). If None
+        is handed over, the initial states are chosen randomly.
+    :param previous_state: The previous state of all chains or None (default).
+    :param seed: The seed or numpy generator for the random numbers (default is None).
+    :return: A tuple with an int8 array of the state codes with the shape
+        (chains, steps + 1) and an int8 array of lambda_i with the shape (chains, steps).
+    """
+    rng = np.random.default_rng(seed)
+    next_states, outputs = _transition_table(
+        LeadingBitsMachine, LEADING_BITS_STATES + (None,), LEADING_BITS_STATES)
+
+    # The table is indexed by the code of the previous state and the current state
+    state_count = len(LEADING_BITS_STATES)
+    states = np.empty((steps + 1, chains), dtype=np.int8)
+    lambdas = np.empty((steps, chains), dtype=np.int8)
+
+    states[0] = _initial_states(rng, chains, current_state, LEADING_BITS_STATES)
+    previous_codes = np.full(
+        chains, _state_code(previous_state, LEADING_BITS_STATES), dtype=np.intp)
+
+    for i in range(steps):
+        current_codes = states[i].astype(np.intp)
+        keys = previous_codes * state_count + current_codes
+        cells = _random_cells(rng, keys, next_states.shape[1])
+
+        states[i + 1] = next_states.ravel()[cells]
+        lambdas[i] = outputs.ravel()[cells]
+        previous_codes = current_codes
+
+    return states.T, lambdas.T
+
+
+def simulate_trailing_bits(chains: int, steps: int, lambdas=None, current_state=None,
+                           seed=None):
+    """
+    This function simulates many independent chains of the TrailingBitsMachine at once.
+
+    :param chains: The number of chains.
+    :param steps: The number of steps per chain.
+    :param lambdas: An array of the inputs lambda_i with the shape (chains, steps) or None
+        (default). If None is handed over, the inputs are chosen randomly.
+    :param current_state: The initial state of all chains or None (default). If None
+        is handed over, the initial states are chosen randomly.
+    :param seed: The seed or numpy generator for the random numbers (default is None).
+    :return: A tuple with an int8 array of the state codes with the shape
+        (chains, steps + 1) and an int8 array of omega_i with the shape (chains, steps).
+    """
+    rng = np.random.default_rng(seed)
+    next_states, outputs = _transition_table(
+        TrailingBitsMachine, TRAILING_BITS_STATES, (1, 2))
+
+    # The table is indexed by the code of the current state and lambda_i
+    states = np.empty((steps + 1, chains), dtype=np.int8)
+    omegas = np.empty((steps, chains), dtype=np.int8)
+
+    states[0] = _initial_states(rng, chains, current_state, TRAILING_BITS_STATES)
+
+    for i in range(steps):
+        if lambdas is None:
+            lambda_codes = rng.integers(0, 2, chains)
+        else:
+            lambda_codes = np.asarray(lambdas)[:, i] - 1
+
+        keys = states[i].astype(np.intp) * 2 + lambda_codes
+        cells = _random_cells(rng, keys, next_states.shape[1])
+
+        states[i + 1] = next_states.ravel()[cells]
+        omegas[i] = outputs.ravel()[cells]
+
+    return states.T, omegas.T
+
+
+def simulate_bits(chains: int, steps: int, leading_state=None, trailing_state=None,
+                  seed=None):
+    """
+    This function simulates many independent chains of the composition of the
+    LeadingBitsMachine and the TrailingBitsMachine at once. The outputs lambda_i of the
+    LeadingBitsMachine serve as inputs of the TrailingBitsMachine.
+
+    :param chains: The number of chains.
+    :param steps: The number of steps per chain.
+    :param leading_state: The initial state of the LeadingBitsMachine or None (default).
+        If None is handed over, the initial states are chosen randomly.
+    :param trailing_state: The initial state of the TrailingBitsMachine or None (default).
+        If None is handed over, the initial states are chosen randomly.
+    :param seed: The seed or numpy generator for the random numbers (default is None).
+    :return: A tuple with the state codes of the LeadingBitsMachine, the state codes of
+        the TrailingBitsMachine, lambda_i and omega_i as int8 arrays. The state arrays
+        have the shape (chains, steps + 1), the others (chains, steps).
+    """
+    rng = np.random.default_rng(seed)
+
+    leading_states, lambdas = simulate_leading_bits(
+        chains, steps, current_state=leading_state, seed=rng)
+    trailing_states, omegas = simulate_trailing_bits(
+        chains, steps, lambdas=lambdas, current_state=trailing_state, seed=rng)
+
+    return leading_states, trailing_states, lambdas, omegas
+
+
+class TransitionCounter:
+    """
+    This class counts the transitions of the leading and the trailing three bits that
+    occur in odd Collatz numbers of the form *3v+1*. For every odd number v_i of a sequence,
+    the counter records the transition of the LeadingBitsMachine from the leading bits of
+    v_i to those of v_i+1, together with the previous leading bits and lambda_i. Likewise,
+    the transition of the TrailingBitsMachine is recorded together with lambda_i and
+    omega_i. The bits are extracted with shifts, the calculations are performed with numpy.
+
+    Leading bits are only defined for numbers with at least three bits. If the previous
+    number has less bits, the transition is counted without previous state. Counters of
+    different blocks can be merged.
+    """
+    def __init__(self):
+        """
+        Creates a new TransitionCounter without any counts.
+        """
+        # Indices: previous state (None is the last index), current state, next state
+        # and lambda_i
+        state_count = len(LEADING_BITS_STATES)
+        self.leading_counts = np.zeros(
+            (state_count + 1, state_count, state_count, 3), dtype=np.int64)
+
+        # Indices: current state, next state, lambda_i and alpha_i
+        state_count = len(TRAILING_BITS_STATES)
+        self.trailing_counts = np.zeros(
+            (state_count, state_count, 3, MAX_COUNTED_ALPHA + 1), dtype=np.int64)
+        self.step_count = 0
+
+    def count_block(self, start_value, stop_value, max_iterations=-1):
+        """
+        This method counts the transitions in the Collatz sequences of all odd start values
+        in the range [start_value, stop_value). Every sequence is followed until it
+        reaches one. Values that would overflow int64 are continued with Python ints.
+
+        :param start_value: The first value of the block (inclusive).
+        :param stop_value: The last value of the block (exclusive).
+        :param max_iterations: The maximum number of odd steps per sequence or -1 (default).
+        :return: The counter itself.
+        """
+        for codes in _window_steps(3, start_value, stop_value, max_iterations):
+            self._count(*codes)
+
+        return self
+
+    def merge(self, other):
+        """
+        This method adds the counts of another counter to this counter.
+
+        :param other: The other TransitionCounter.
+        :return: The counter itself.
+        """
+        self.leading_counts += other.leading_counts
+        self.trailing_counts += other.trailing_counts
+        self.step_count += other.step_count
+        return self
+
+    def leading_frame(self):
+        """
+        This method returns the counted transitions of the LeadingBitsMachine. The column
+        *possible* states if the machine is able to perform the transition.
+
+        :return: A pandas data frame with the columns previous, current, next, lambda_i,
+            count and possible.
+        """
+        transitions = LeadingBitsMachine().transitions
+        rows = []
+
+        for index in zip(*np.nonzero(self.leading_counts)):
+            previous_code, current_code, next_code, lambda_i = (int(i) for i in index)
+            previous_state = (LEADING_BITS_STATES + (None,))[previous_code]
+            current_state = LEADING_BITS_STATES[current_code]
+            next_state = LEADING_BITS_STATES[next_code]
+
+            rows.append((
+                previous_state, current_state, next_state, lambda_i,
+                int(self.leading_counts[index]),
+                (next_state, lambda_i) in transitions[(previous_state, current_state)]))
+
+        result_frame = pd.DataFrame(rows, columns=[
+            "previous", "current", "next", "lambda_i", "count", "possible"])
+
+        # Keep None as previous state instead of NaN
+        result_frame["previous"] = pd.Series(
+            [row[0] for row in rows], dtype="object", index=result_frame.index)
+        return result_frame
+
+    def trailing_frame(self):
+        """
+        This method returns the counted transitions of the TrailingBitsMachine. The column
+        *possible* states if the machine is able to perform the transition.
+
+        :return: A pandas data frame with the columns current, next, lambda_i, omega_i,
+            count and possible.
+        """
+        transitions = TrailingBitsMachine().transitions
+        rows = []
+
+        for index in zip(*np.nonzero(self.trailing_counts)):
+            current_code, next_code, lambda_i, alpha_i = (int(i) for i in index)
+            current_state = TRAILING_BITS_STATES[current_code]
+            next_state = TRAILING_BITS_STATES[next_code]
+            omega_i = lambda_i - alpha_i
+
+            rows.append((
+                current_state, next_state, lambda_i, omega_i,
+                int(self.trailing_counts[index]),
+                (next_state, omega_i) in transitions.get((current_state, lambda_i), [])))
+
+        return pd.DataFrame(rows, columns=[
+            "current", "next", "lambda_i", "omega_i", "count", "possible"])
+
+    # pylint: disable=too-many-arguments
+    # The components of the transitions are handed over separately
+    def _count(self, previous_codes, current_codes, next_codes, trailing_codes,
+               next_trailing_codes, lambdas, alphas):
+        """
+        This method counts transitions. The arguments are arrays as yielded by
+        the function _window_steps.
+
+        :param previous_codes: The leading codes of the previous values (-1 for None).
+        :param current_codes: The leading codes of the current values (-1 for None).
+        :param next_codes: The leading codes of the next values (-1 for None).
+        :param trailing_codes: The trailing codes of the current values.
+        :param next_trailing_codes: The trailing codes of the next values.
+        :param lambdas: The values of lambda_i.
+        :param alphas: The values of alpha_i.
+        :return: None.
+        """
+        self.step_count += len(lambdas)
+
+        # Leading
+        counted = (current_codes >= 0) & (next_codes >= 0)
+        previous_codes = np.where(
+            previous_codes < 0, len(LEADING_BITS_STATES), previous_codes)
+        indices = np.ravel_multi_index(
+            (previous_codes[counted], current_codes[counted],
+             next_codes[counted], lambdas[counted]), self.leading_counts.shape)
+        self.leading_counts += np.bincount(
+            indices, minlength=self.leading_counts.size).reshape(self.leading_counts.shape)
+
+        # Trailing
+        indices = np.ravel_multi_index(
+            (trailing_codes, next_trailing_codes, lambdas,
+             np.minimum(alphas, MAX_COUNTED_ALPHA)), self.trailing_counts.shape)
+        self.trailing_counts += np.bincount(
+            indices, minlength=self.trailing_counts.size).reshape(self.trailing_counts.shape)
+
+
+class BitWindowMachine:
+    """
+    This class is a table-driven finite state machine for the leading or the trailing
+    bits of odd Collatz numbers of the form *3v+1*. In contrast to the LeadingBitsMachine
+    and the TrailingBitsMachine, the window may have an arbitrary number of bits and the
+    transitions are not hard-coded. Instead, they are derived from real Collatz sequences
+    with the method *from_trajectories*. Every observed transition is a branch of the
+    nondeterministic machine, all branches are equally likely.
+
+    The states are integer codes. The code of leading bits is their value minus
+    2**(window_bits - 1), the code of trailing bits is their value divided by two. For
+    three bits, the codes are the indices in LEADING_BITS_STATES and TRAILING_BITS_STATES.
+    Like the LeadingBitsMachine, a machine of leading bits receives the previous state
+    as input and returns lambda_i. Like the TrailingBitsMachine, a machine of trailing
+    bits receives lambda_i as input and returns omega_i.
+
+    The transitions are stored in arrays whose rows correspond to the combinations of
+    input and current state. The row of a machine of leading bits is the previous state
+    times the number of states plus the current state, where the number of states
+    represents a missing previous state. The row of a machine of trailing bits is the
+    current state times three plus lambda_i.
+    """
+    __slots__ = ("window_bits", "leading", "next_states", "outputs", "branch_counts",
+                 "observations", "current_state", "previous_state", "_rng")
+
+    # pylint: disable=too-many-arguments
+    # The tables are handed over separately
+    def __init__(self, window_bits, leading, next_states, outputs, branch_counts,
+                 observations, seed=None):
+        """
+        Creates a new BitWindowMachine. Usually, machines are created with the method
+        *from_trajectories*.
+
+        :param window_bits: The number of bits of the window.
+        :param leading: True for leading bits, False for trailing bits.
+        :param next_states: An array with the next states per row and branch.
+        :param outputs: An array with the outputs per row and branch.
+        :param branch_counts: An array with the number of branches per row.
+        :param observations: An array with the number of observations per row and branch.
+        :param seed: The seed or numpy generator for the random numbers (default is None).
+        """
+        self.window_bits = window_bits
+        self.leading = leading
+        self.next_states = next_states
+        self.outputs = outputs
+        self.branch_counts = branch_counts
+        self.observations = observations
+        self._rng = np.random.default_rng(seed)
+
+        self.previous_state = None
+        self.current_state = int(self._rng.choice(self.initial_states()))
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    # The range of the trajectories is handed over explicitly
+    @classmethod
+    def from_trajectories(cls, window_bits: int, leading: bool, start_value: int,
+                          stop_value: int, max_iterations=-1, seed=None):
+        """
+        This method creates a machine from the transitions that occur in the Collatz
+        sequences of all odd start values in the range [start_value, stop_value).
+
+        :param window_bits: The number of bits of the window.
+        :param leading: True for leading bits, False for trailing bits.
+        :param start_value: The first start value (inclusive).
+        :param stop_value: The last start value (exclusive).
+        :param max_iterations: The maximum number of odd steps per sequence or -1 (default).
+        :param seed: The seed or numpy generator for the random numbers (default is None).
+        :return: The BitWindowMachine.
+        """
+        state_count = 2**(window_bits - 1)
+        output_count = 3 if leading else MAX_COUNTED_ALPHA + 1
+        row_count = (state_count + 1) * state_count if leading else state_count * 3
+
+        # Every observed transition is encoded as a single integer
+        keys = []
+        for previous, current, following, trailing, next_trailing, lambdas, alphas \
+                in _window_steps(window_bits, start_value, stop_value, max_iterations):
+            if leading:
+                observed = (current >= 0) & (following >= 0)
+                previous = np.where(previous < 0, state_count, previous)
+                rows = previous[observed] * state_count + current[observed]
+                transitions = (rows, following[observed], lambdas[observed])
+            else:
+                rows = trailing * 3 + lambdas
+                transitions = (rows, next_trailing, np.minimum(alphas, MAX_COUNTED_ALPHA))
+
+            keys.append(np.ravel_multi_index(
+                transitions, (row_count, state_count, output_count)))
+
+        keys, counts = np.unique(
+            np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64), return_counts=True)
+        rows, next_states, outputs = np.unravel_index(
+            keys, (row_count, state_count, output_count))
+
+        if not leading:
+            outputs = rows % 3 - outputs
+
+        # The branches of a row are consecutive, since the keys are sorted
+        branch_counts = np.bincount(rows, minlength=row_count)
+        branches = np.arange(keys.size) - (np.cumsum(branch_counts) - branch_counts)[rows]
+        shape = (row_count, max(int(branch_counts.max(initial=0)), 1))
+
+        next_state_table = np.zeros(shape, dtype=np.int64)
+        output_table = np.zeros(shape, dtype=np.int64)
+        observation_table = np.zeros(shape, dtype=np.int64)
+        next_state_table[rows, branches] = next_states
+        output_table[rows, branches] = outputs
+        observation_table[rows, branches] = counts
+
+        return cls(window_bits, leading, next_state_table, output_table, branch_counts,
+                   observation_table, seed)
+
+    def state_count(self):
+        """
+        This method returns the number of states.
+
+        :return: The number of states.
+        """
+        return 2**(self.window_bits - 1)
+
+    def state_name(self, state):
+        """
+        This method returns the bits of a state as string.
+
+        :param state: The code of the state or None.
+        :return: The bits as string or None.
+        """
+        if state is None:
+            return None
+        value = state + self.state_count() if self.leading else 2 * state + 1
+        return format(value, "0" + str(self.window_bits) + "b")
+
+    def initial_states(self):
+        """
+        This method returns the states from which a transition without previous state
+        (leading bits) or with any lambda_i (trailing bits) has been observed.
+
+        :return: An array with the codes of the states.
+        """
+        if self.leading:
+            rows = self.state_count() * self.state_count() + np.arange(self.state_count())
+            return np.nonzero(self.branch_counts[rows] > 0)[0]
+
+        rows = np.arange(self.state_count() * 3).reshape(-1, 3)
+        return np.nonzero((self.branch_counts[rows] > 0).any(axis=1))[0]
+
+    def next_state(self, lambda_i=None):
+        """
+        This method moves the machine to the next state. A ValueError is raised if no
+        transition has been observed for the current state and the input.
+
+        :param lambda_i: The input lambda_i of a machine of trailing bits or None. If None
+            is handed over, lambda_i is chosen randomly among the observed values.
+        :return: The next state and the output.
+        """
+        state_count = self.state_count()
+
+        if self.leading:
+            previous_state = state_count if self.previous_state is None \
+                else self.previous_state
+            row = previous_state * state_count + self.current_state
+        else:
+            if lambda_i is None:
+                observed = [i for i in (1, 2) if self.branch_counts[
+                    self.current_state * 3 + i] > 0]
+                lambda_i = observed[int(self._rng.random() * len(observed))] \
+                    if observed else 1
+            row = self.current_state * 3 + lambda_i
+
+        branch_count = int(self.branch_counts[row])
+        if branch_count == 0:
+            raise ValueError("No transition observed for state "
+                             + str(self.state_name(self.current_state)))
+
+        branch = int(self._rng.random() * branch_count)
+        next_state = int(self.next_states[row, branch])
+        output = int(self.outputs[row, branch])
+
+        self.previous_state = self.current_state
+        self.current_state = next_state
+        return next_state, output
+
+    def simulate(self, chains: int, steps: int, lambdas=None, seed=None):
+        """
+        This method simulates many independent chains of the machine at once. The chains
+        start in random initial states. Chains that reach a combination of input and
+        state without observed transitions are stopped. Their following states are -1
+        and their following outputs are 0.
+
+        :param chains: The number of chains.
+        :param steps: The number of steps per chain.
+        :param lambdas: An array of the inputs lambda_i with the shape (chains, steps)
+            for a machine of trailing bits or None (default). If None is handed over,
+            lambda_i is chosen randomly.
+        :param seed: The seed or numpy generator for the random numbers (default is None).
+        :return: A tuple with an array of the states with the shape (chains, steps + 1)
+            and an array of the outputs with the shape (chains, steps).
+        """
+        rng = np.random.default_rng(seed)
+        states = np.full((steps + 1, chains), -1, dtype=np.int64)
+        outputs = np.zeros((steps, chains), dtype=np.int64)
+
+        states[0] = rng.choice(self.initial_states(), chains)
+        previous_states = np.full(chains, -1, dtype=np.int64)
+
+        for i in range(steps):
+            if self.leading:
+                rows = self._leading_rows(previous_states, states[i])
+            elif lambdas is None:
+                rows = states[i] * 3 + rng.integers(1, 3, chains)
+            else:
+                rows = states[i] * 3 + np.asarray(lambdas)[:, i]
+
+            active = (states[i] >= 0) & (self.branch_counts[np.maximum(rows, 0)] > 0)
+            rows = rows[active]
+            branches = (rng.random(rows.size) * self.branch_counts[rows]).astype(np.int64)
+
+            states[i + 1, active] = self.next_states[rows, branches]
+            outputs[i, active] = self.outputs[rows, branches]
+            previous_states = states[i]
+
+        return states.T, outputs.T
+
+    def transitions(self):
+        """
+        This method returns the observed transitions in the format of the attribute
+        *transitions* of the LeadingBitsMachine and the TrailingBitsMachine.
+
+        :return: A dict that maps the combinations of input and state (as strings)
+            to lists of tuples of next state and output.
+        """
+        result = {}
+
+        for row in np.nonzero(self.branch_counts)[0]:
+            if self.leading:
+                previous_state, current_state = divmod(int(row), self.state_count())
+                key = (self.state_name(previous_state)
+                       if previous_state < self.state_count() else None,
+                       self.state_name(current_state))
+            else:
+                current_state, lambda_i = divmod(int(row), 3)
+                key = (self.state_name(current_state), lambda_i)
+
+            result[key] = [
+                (self.state_name(int(next_state)), int(output)) for next_state, output
+                in zip(self.next_states[row, :self.branch_counts[row]],
+                       self.outputs[row, :self.branch_counts[row]])]
+
+        return result
+
+    def _leading_rows(self, previous_states, current_states):
+        """
+        This method returns the rows of a machine of leading bits.
+
+        :param previous_states: An array with the previous states (-1 for None).
+        :param current_states: An array with the current states.
+        :return: An array with the rows or -1 for chains without a current state.
+        """
+        previous_states = np.where(previous_states < 0, self.state_count(), previous_states)
+        rows = previous_states * self.state_count() + current_states
+        return np.where(current_states < 0, -1, rows)
+
+
+def _window_steps(window_bits, start_value, stop_value, max_iterations):
+    """
+    This generator follows the Collatz sequences (3v+1) of all odd start values in the
+    range [start_value, stop_value) until they reach one and yields the odd steps as
+    integer codes. The leading code of a number is the value of its leading *window_bits*
+    bits minus 2**(window_bits - 1), which is its index in LEADING_BITS_STATES for
+    three bits. Numbers with less bits have the leading code -1. The trailing code is
+    the value of the trailing *window_bits* bits divided by two, which is the index
+    in TRAILING_BITS_STATES for three bits.
+
+    The calculations are performed with numpy. Values that would overflow int64 are
+    continued with Python ints.
+
+    :param window_bits: The number of leading and trailing bits.
+    :param start_value: The first value of the block (inclusive).
+    :param stop_value: The last value of the block (exclusive).
+    :param max_iterations: The maximum number of odd steps per sequence or -1.
+    :return: A generator of tuples of int64 arrays: the leading codes of the previous,
+        the current and the next values, the trailing codes of the current and the next
+        values, lambda_i and alpha_i.
+    """
+    values = np.arange(max(start_value | 1, 3), stop_value, 2, dtype=np.int64)
+    previous_codes = np.full(values.size, -1, dtype=np.int64)
+    iterations = 0
+
+    while values.size > 0 and not -1 < max_iterations <= iterations:
+        evens, overflow = tensor.checked_next_even_collatz_numbers(values, backend="numpy")
+
+        if overflow.any():
+            # The remaining budget must not drop below zero, since -1 means unlimited
+            remaining = max(max_iterations - iterations, 0) if max_iterations > -1 else -1
+            for value, previous_code in zip(values[overflow], previous_codes[overflow]):
+                yield _big_int_window_steps(
+                    window_bits, int(value), int(previous_code), remaining)
+            evens, values, previous_codes = _compact_arrays(
+                ~overflow, evens, values, previous_codes)
+
+        alphas = tensor.trailing_zeros(evens, backend="numpy")
+        next_values = np.right_shift(evens, alphas)
+        bits = tensor.bit_length(values)
+        even_bits = tensor.bit_length(evens)
+
+        current_codes = _leading_codes(values, bits, window_bits)
+        yield (previous_codes, current_codes,
+               _leading_codes(next_values, even_bits - alphas, window_bits),
+               _trailing_codes(values, window_bits), _trailing_codes(next_values, window_bits),
+               even_bits - bits, alphas)
+
+        iterations = iterations + 1
+        values, previous_codes = _compact_arrays(
+            next_values != 1, next_values, current_codes)
+
+
+def _big_int_window_steps(window_bits, value, previous_code, max_iterations):
+    """
+    This function calculates the odd steps of a single Collatz sequence with Python ints.
+
+    :param window_bits: The number of leading and trailing bits.
+    :param value: The current odd value as int.
+    :param previous_code: The leading code of the previous value (-1 for None).
+    :param max_iterations: The maximum number of odd steps or -1.
+    :return: A tuple of int64 arrays like the tuples of the function _window_steps.
+    """
+    steps = []
+    iterations = 0
+
+    while value != 1 and not -1 < max_iterations <= iterations:
+        even = 3 * value + 1
+        alpha = commons.trailing_zeros(even)
+        next_value = even >> alpha
+        current_code = _leading_code(value, window_bits)
+
+        steps.append((
+            previous_code, current_code, _leading_code(next_value, window_bits),
+            _trailing_codes(value, window_bits), _trailing_codes(next_value, window_bits),
+            even.bit_length() - value.bit_length(), alpha))
+        previous_code, value = current_code, next_value
+        iterations = iterations + 1
+
+    if not steps:
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(7))
+    return tuple(np.array(column, dtype=np.int64) for column in zip(*steps))
+
+
+def _leading_codes(values, bits, window_bits):
+    """
+    This function returns the leading codes of numbers.
+
+    :param values: An int64 array with the numbers.
+    :param bits: An int64 array with the bit lengths of the numbers.
+    :param window_bits: The number of leading bits.
+    :return: An int64 array with the codes or -1 for numbers with less bits.
+    """
+    codes = np.right_shift(values, np.maximum(bits - window_bits, 0)) - 2**(window_bits - 1)
+    return np.where(bits >= window_bits, codes, -1)
+
+
+def _leading_code(value: int, window_bits: int):
+    """
+    This function returns the leading code of a Python int.
+
+    :param value: The number.
+    :param window_bits: The number of leading bits.
+    :return: The code or -1 if the number has less bits.
+    """
+    bits = value.bit_length()
+    if bits < window_bits:
+        return -1
+    return (value >> (bits - window_bits)) - 2**(window_bits - 1)
+
+
+def _trailing_codes(values, window_bits):
+    """
+    This function returns the trailing codes of odd numbers.
+
+    :param values: The numbers as int64 array or Python int.
+    :param window_bits: The number of trailing bits.
+    :return: The codes.
+    """
+    return (values & (2**window_bits - 1)) >> 1
+
+
+def _compact_arrays(mask, *arrays):
+    """
+    This function removes the elements that are not selected by a mask from arrays.
+
+    :param mask: The boolean mask.
+    :param arrays: The arrays.
+    :return: A tuple with the compacted arrays.
+    """
+    return tuple(array[mask] for array in arrays)
+
+
+def composite_markov_chain():
+    """
+    This function returns the composition of the LeadingBitsMachine and the
+    TrailingBitsMachine as Markov chain. The output lambda_i of the LeadingBitsMachine
+    serves as input of the TrailingBitsMachine. The states of the chain are tuples of the
+    state of the Markov chain of the LeadingBitsMachine and the state of the
+    TrailingBitsMachine. The output of a transition is omega_i.
+
+    :return: The MarkovChain.
+    """
+    leading_transitions = LeadingBitsMachine().transitions
+    trailing_transitions = TrailingBitsMachine().transitions
+
+    transitions = [
+        (((previous_state, current_state), trailing_state),
+         ((current_state, next_state), next_trailing_state),
+         1 / (len(branches) * len(trailing_transitions[(trailing_state, lambda_i)])),
+         omega_i)
+        for (previous_state, current_state), branches in leading_transitions.items()
+        for next_state, lambda_i in branches
+        for trailing_state in TRAILING_BITS_STATES
+        for next_trailing_state, omega_i in trailing_transitions[(trailing_state, lambda_i)]]
+
+    initial_states = [
+        ((None, leading_state), trailing_state)
+        for leading_state in LEADING_BITS_STATES for trailing_state in TRAILING_BITS_STATES]
+
+    return MarkovChain(transitions, initial_states)
+
+
+def _transition_table(machine_type, first_keys, second_keys):
+    """
+    This function converts the transitions of a machine into integer-encoded tables.
+    The row of a transition is the index of the first key element in *first_keys* times
+    the length of *second_keys* plus the index of the second key element. Every row has
+    the same number of columns, namely the least common multiple of the numbers of
+    branches. The branches of a row are repeated to fill the columns, so that choosing
+    a column uniformly chooses a branch uniformly.
+
+    :param machine_type: The class of the machine.
+    :param first_keys: The possible first elements of the transition keys in order.
+    :param second_keys: The possible second elements of the transition keys in order.
+    :return: A tuple with a table of the next state codes and a table of the outputs.
+    """
+    machine = machine_type()
+    transitions = machine.transitions
+    states = sorted(machine.valid_states)
+    column_count = int(np.lcm.reduce([len(branches) for branches in transitions.values()]))
+
+    row_count = len(first_keys) * len(second_keys)
+    next_states = np.zeros((row_count, column_count), dtype=np.int8)
+    outputs = np.zeros((row_count, column_count), dtype=np.int8)
+
+    for (first, second), branches in transitions.items():
+        row = first_keys.index(first) * len(second_keys) + second_keys.index(second)
+
+        for column in range(column_count):
+            next_state, output = branches[column % len(branches)]
+            next_states[row, column] = states.index(next_state)
+            outputs[row, column] = output
+
+    return next_states, outputs
+
+
+def _initial_states(rng, chains, state, states):
+    """
+    This function returns the initial state codes of chains.
+
+    :param rng: The numpy generator.
+    :param chains: The number of chains.
+    :param state: The initial state of all chains or None for random states.
+    :param states: The states in the order of their codes.
+    :return: An array with the state codes.
+    """
+    if state is None:
+        return rng.integers(0, len(states), chains)
+    return np.full(chains, _state_code(state, states))
+
+
+def _state_code(state, states):
+    """
+    This function returns the integer code of a state. The code of None is the number
+    of states.
+
+    :param state: The state or None.
+    :param states: The states in the order of their codes.
+    :return: The code.
+    """
+    if state is None:
+        return len(states)
+    if state not in states:
+        raise TypeError("Illegal state: " + state)
+    return states.index(state)
+
+
+def _random_cells(rng, rows, column_count):
+    """
+    This function chooses a random column per row of a transition table.
+
+    :param rng: The numpy generator.
+    :param rows: An array with the rows of the chains.
+    :param column_count: The number of columns of the table.
+    :return: An array with the indices of the chosen cells in the flattened table.
+    """
+    return rows * column_count + rng.integers(0, column_count, rows.size)
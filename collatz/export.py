@@ -0,0 +1,1418 @@
+"""
+This module provides functions and classes to export Collatz sequences and related
+features into files. It is used by the export scripts of the project.
+
+Besides csv, the data can be exported into the columnar parquet format. Parquet
+files are typed and considerably faster to load. Integers of arbitrary size are
+stored losslessly in two columns: an int64 column holds the values that fit into
+int64 and a binary column with the suffix BYTES_SUFFIX holds the remaining values.
+The parquet format requires the package pyarrow, which is only imported when
+it is actually used.
+
+Csv files can be compressed with gzip, bz2 or xz. The compression runs in a background
+thread, so that it overlaps with the generation and formatting of the data.
+
+Binary representations of large numbers dominate the size of an export. Instead of
+the full binary strings, only the bit lengths and the leading and trailing bits can
+be exported (see *binary_columns*). The function *binary_strings* reconstructs the
+full strings when they are needed.
+
+An index of the sequences can be written alongside a csv export. It maps every sequence
+to the byte offset of its rows, so that single sequences are read without parsing
+the whole file (see *read_sequences*).
+
+The metadata of an export (see *write_metadata*) records its parameters, the version of
+the sources and a hash of its content. It allows the export scripts to skip exports
+that are up to date and to take over the rows of unchanged parts (see *read_part*).
+"""
+
+# Imports
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import logging
+import lzma
+import os
+import queue
+import shutil
+import threading
+import zlib
+from collections import deque
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
+from collatz import commons
+from collatz import tensor
+
+
+# Supported file formats
+CSV_FORMAT = "csv"
+PARQUET_FORMAT = "parquet"
+FILE_FORMATS = (CSV_FORMAT, PARQUET_FORMAT)
+
+# Supported compressions and their file extensions
+COMPRESSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+# Maximum number of data blocks waiting for the compression thread
+DEFAULT_QUEUE_SIZE = 16
+
+# Default number of frames per batch
+DEFAULT_BATCH_SIZE = 1000
+
+# Encodings of binary representations
+BINARY_FULL = "full"
+BINARY_COMPACT = "compact"
+BINARY_BYTES = "bytes"
+BINARY_ENCODINGS = (BINARY_FULL, BINARY_COMPACT, BINARY_BYTES)
+DEFAULT_WINDOW_BITS = 8
+
+# Suffix of the manifest file of a resumable export
+MANIFEST_SUFFIX = ".manifest"
+
+# Suffix of the metadata file of an export
+METADATA_SUFFIX = ".metadata"
+
+# Suffix and position columns of the index file of a csv export
+INDEX_SUFFIX = ".index"
+INDEX_COLUMNS = ("offset", "position", "rows")
+
+# Columns of the parquet format
+BYTES_SUFFIX = "_bytes"
+DICTIONARY_COLUMNS = ("k",)
+
+# Limits of the int64 data type
+_INT64_MIN = -2**63
+_INT64_MAX = 2**63 - 1
+
+# Default number of pending chunks per worker process
+DEFAULT_CHUNKS_PER_WORKER = 2
+
+
+class CsvBatchWriter:
+    """
+    This class writes pandas data frames into a csv file. Instead of opening the file for
+    every frame, the frames are collected and written in batches through a single file
+    handle. The header is written with the first batch. Optionally, the file
+    is compressed (see *CompressionStream*).
+
+    Optionally, an index of the sequences is written into a second csv file with the
+    suffix INDEX_SUFFIX. Every line of the index contains the key columns of a sequence,
+    the byte offset of its first row and its number of rows. Compressed files cannot be
+    read from an arbitrary byte. Hence, the offset refers to the start of the compressed
+    stream that contains the sequence and the position refers to the first row within
+    the decompressed stream. The position is always 0 for uncompressed files. The rows
+    of a sequence must be consecutive (see *read_rows*).
+    """
+    def __init__(self, file_name: str, batch_size=DEFAULT_BATCH_SIZE, offset=0,
+                 compression=None, index_columns=None):
+        """
+        Creates a new CsvBatchWriter and opens the file.
+
+        :param file_name: The path of the csv file.
+        :param batch_size: The number of frames that are collected before they are
+            written (default is DEFAULT_BATCH_SIZE).
+        :param offset: The byte offset at which the writer continues an existing file
+            (default is 0). The file is truncated to the offset, so that incomplete
+            batches are removed. If the offset is 0, an existing file is overwritten.
+        :param compression: One of the keys of COMPRESSIONS or None (default). If None is
+            handed over, the file is not compressed.
+        :param index_columns: The names of the key columns of the sequences (e.g.
+            sequence_id, v_1 and k) or None (default). The first column identifies the
+            sequences. If None is handed over, no index is written.
+        """
+        self.file_name = file_name
+        self.batch_size = batch_size
+        self.index_columns = index_columns
+        self.row_count = 0
+
+        self._frames = []
+        self._header = offset == 0
+        self._index_file = None
+
+        if offset:
+            os.truncate(file_name, offset)
+
+        mode = "ab" if offset else "wb"
+        self._stream = open_stream(file_name, mode, compression)
+        self._file = io.TextIOWrapper(self._stream, encoding="utf-8", newline="")
+
+        # Byte offset of the current compressed stream and position within the stream
+        self._compressed = compression is not None
+        self._stream_offset = offset if self._compressed else 0
+        self._position = 0 if self._compressed else offset
+
+        if index_columns is not None:
+            self._index_file = _open_index(file_name + INDEX_SUFFIX, offset)
+
+    def write(self, frame):
+        """
+        This method adds a frame to the current batch. The batch is written as soon as
+        it contains *batch_size* frames.
+
+        :param frame: The pandas data frame.
+        :return: None.
+        """
+        self._frames.append(frame)
+
+        if len(self._frames) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        This method writes the current batch to the file.
+
+        :return: None.
+        """
+        if not self._frames:
+            return
+
+        batch_frame = concat_frames(self._frames)
+
+        if self._index_file is None:
+            batch_frame.to_csv(self._file, index=False, header=self._header)
+        else:
+            text = batch_frame.to_csv(index=False, header=self._header)
+            data = text.encode("utf-8")
+            self._write_index(batch_frame, data)
+            self._file.write(text)
+            self._position = self._position + len(data)
+
+        self.row_count = self.row_count + len(batch_frame)
+        self._header = False
+        self._frames = []
+
+    def sync(self):
+        """
+        This method writes the current batch and forces the file to disk. A compressed
+        stream is finished, so that the file is complete up to the returned offset.
+
+        :return: The byte offset up to which the file is complete.
+        """
+        self.flush()
+        self._file.flush()
+
+        if isinstance(self._stream, CompressionStream):
+            self._stream.finish()
+
+        os.fsync(self._stream.fileno())
+        offset = self._stream.tell()
+
+        if self._index_file is not None:
+            self._index_file.flush()
+            os.fsync(self._index_file.fileno())
+
+        # The next batch starts a new compressed stream
+        if self._compressed:
+            self._stream_offset = offset
+            self._position = 0
+
+        return offset
+
+    def close(self):
+        """
+        This method writes the remaining frames and closes the file.
+
+        :return: None.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+        if self._index_file is not None:
+            self._index_file.close()
+
+    def _write_index(self, frame, data: bytes):
+        """
+        This method writes the index lines of the sequences of a batch. The byte offsets
+        of the rows are determined from the line breaks of the encoded batch.
+
+        :param frame: The pandas data frame of the batch.
+        :param data: The batch encoded as csv.
+        :return: None.
+        """
+        if frame.empty:
+            return
+
+        line_ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+        row_starts = np.concatenate(([0], line_ends[:-1] + 1))
+
+        if self._header:
+            row_starts = row_starts[1:]
+
+        keys = frame[self.index_columns[0]].to_numpy()
+        first_rows = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        positions = self._position + row_starts[first_rows]
+
+        index_frame = frame[list(self.index_columns)].iloc[first_rows]
+        index_frame = index_frame.reset_index(drop=True)
+
+        if self._compressed:
+            index_frame["offset"] = self._stream_offset
+            index_frame["position"] = positions
+        else:
+            index_frame["offset"] = positions
+            index_frame["position"] = 0
+
+        index_frame["rows"] = np.diff(np.concatenate((first_rows, [len(frame)])))
+        index_frame.to_csv(self._index_file, index=False,
+                           header=self._index_file.tell() == 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ParquetBatchWriter:
+    """
+    This class writes pandas data frames into a parquet file. Like the CsvBatchWriter,
+    the frames are collected and written in batches. Every batch is written as a single
+    row group. The column types are determined by the first batch. Columns that contain
+    ints of arbitrary size are encoded losslessly (see *encode_big_ints*). Only columns
+    with few distinct values (e.g. k) are dictionary encoded.
+    """
+    def __init__(self, file_name: str, batch_size=DEFAULT_BATCH_SIZE,
+                 big_int_columns=(), dictionary_columns=DICTIONARY_COLUMNS):
+        """
+        Creates a new ParquetBatchWriter. An existing file is overwritten.
+
+        :param file_name: The path of the parquet file.
+        :param batch_size: The number of frames that are collected before they are
+            written (default is DEFAULT_BATCH_SIZE).
+        :param big_int_columns: The names of the columns that may contain ints, which
+            do not fit into int64 (default is an empty tuple).
+        :param dictionary_columns: The names of the columns that are dictionary encoded
+            (default is DICTIONARY_COLUMNS).
+        """
+        # pylint: disable=import-outside-toplevel
+        # Pyarrow is an optional dependency
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.file_name = file_name
+        self.batch_size = batch_size
+        self.big_int_columns = tuple(big_int_columns)
+        self.dictionary_columns = tuple(dictionary_columns)
+        self.row_count = 0
+
+        self._pa = pa
+        self._pq = pq
+        self._frames = []
+        self._pending_tables = []
+        self._writer = None
+        self._closed = False
+
+    def write(self, frame):
+        """
+        This method adds a frame to the current batch. The batch is written as soon as
+        it contains *batch_size* frames.
+
+        :param frame: The pandas data frame.
+        :return: None.
+        """
+        self._frames.append(frame)
+
+        if len(self._frames) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        This method writes the current batch to the file as a row group. The types of
+        empty or all-null columns cannot be inferred. Hence, batches with such columns
+        are held back until a batch determines the schema of the file.
+
+        :return: None.
+        """
+        if not self._frames:
+            return
+
+        table = self._to_table(concat_frames(self._frames))
+        self.row_count = self.row_count + table.num_rows
+        self._frames = []
+
+        if self._writer is None:
+            if any(self._pa.types.is_null(field.type) for field in table.schema):
+                self._pending_tables.append(table)
+                return
+
+            self._open(table.schema)
+
+        self._write_table(table)
+
+    def close(self):
+        """
+        This method writes the remaining frames and closes the file. If no frame has been
+        written, a file without columns is created.
+
+        :return: None.
+        """
+        if self._closed:
+            return
+
+        self.flush()
+
+        if self._writer is None and self._pending_tables:
+            self._open(self._pending_tables[0].schema)
+
+        if self._writer is None:
+            self._pq.write_table(self._pa.table({}), self.file_name)
+        else:
+            self._writer.close()
+
+        self._closed = True
+
+    def _open(self, schema):
+        """
+        This method opens the file with a schema and writes the batches that have been
+        held back.
+
+        :param schema: The pyarrow schema of the file.
+        :return: None.
+        """
+        self._writer = self._pq.ParquetWriter(
+            self.file_name, schema, use_dictionary=list(self.dictionary_columns))
+
+        for table in self._pending_tables:
+            self._write_table(table)
+
+        self._pending_tables = []
+
+    def _write_table(self, table):
+        """
+        This method writes a table as a row group. The columns are cast to the schema of
+        the file, which also sets the types of empty or all-null columns.
+
+        :param table: The pyarrow table.
+        :return: None.
+        """
+        table = table.cast(self._writer.schema)
+        self._writer.write_table(table, row_group_size=max(table.num_rows, 1))
+
+    def _to_table(self, frame):
+        """
+        This method converts a data frame into a pyarrow table.
+
+        :param frame: The pandas data frame.
+        :return: The pyarrow table.
+        """
+        pa = self._pa
+        columns = {}
+
+        for name in frame.columns:
+            if name in self.big_int_columns:
+                ints, raw = encode_big_ints(frame[name])
+                columns[name] = pa.array(
+                    ints, type=pa.int64(),
+                    mask=np.array([r is not None for r in raw], dtype=bool))
+                columns[name + BYTES_SUFFIX] = pa.array(raw, type=pa.binary())
+            else:
+                columns[name] = pa.array(frame[name])
+
+        return pa.table(columns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ExportManifest:
+    """
+    This class records the units (e.g. a k factor and a chunk of start values) of an
+    export that are completely written to the export file. Every unit is stored as a
+    json line together with the byte offset of the file after the unit. If an export is
+    interrupted, it can be resumed after the last committed unit, while everything
+    written after this unit is discarded. The first line holds the parameters of the
+    export, so that an export is never resumed with other parameters.
+    """
+    def __init__(self, file_name: str, parameters=None):
+        """
+        Creates a new ExportManifest.
+
+        :param file_name: The path of the manifest file.
+        :param parameters: The parameters of the export as dict of json compatible values
+            or None (default).
+        """
+        self.file_name = file_name
+        self.parameters = parameters
+        self.units = []
+        self.offset = 0
+        self.row_count = 0
+
+    def load(self, units, export_file_name=None):
+        """
+        This method loads the committed units of a previous run. The committed units are
+        only taken over if they equal the first of the planned units, the previous
+        run had the same parameters and the export file still contains them. Otherwise,
+        the manifest is reset and the export starts from the beginning.
+
+        :param units: The list of all planned units of the export.
+        :param export_file_name: The path of the export file or None (default). If None
+            is handed over, the export file is not checked.
+        :return: The number of units that are already committed.
+        """
+        entries = []
+        parameters = None
+
+        if os.path.exists(self.file_name):
+            with open(self.file_name, "r", encoding="utf-8") as manifest_file:
+                for line in manifest_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # The last line is incomplete
+                        break
+
+        if entries and "parameters" in entries[0]:
+            parameters = entries.pop(0)["parameters"]
+
+        planned = [list(unit) for unit in units[:len(entries)]]
+        if [entry["unit"] for entry in entries] != planned or \
+                parameters != self.parameters:
+            entries = []
+
+        # The export file has been deleted or truncated in the meantime
+        if entries and export_file_name is not None and (
+                not os.path.exists(export_file_name)
+                or os.path.getsize(export_file_name) < entries[-1]["offset"]):
+            entries = []
+
+        self.units = [tuple(entry["unit"]) for entry in entries]
+        self.offset = entries[-1]["offset"] if entries else 0
+        self.row_count = sum(entry["rows"] for entry in entries)
+
+        # Rewrite the manifest without incomplete lines
+        with open(self.file_name, "w", encoding="utf-8") as manifest_file:
+            manifest_file.write(json.dumps({"parameters": self.parameters}) + "\n")
+            for entry in entries:
+                manifest_file.write(json.dumps(entry) + "\n")
+
+        return len(entries)
+
+    def commit(self, unit, offset: int, row_count: int):
+        """
+        This method records a unit that is completely written to the export file.
+
+        :param unit: The unit as tuple of ints.
+        :param offset: The byte offset of the export file after the unit.
+        :param row_count: The number of rows of the unit.
+        :return: None.
+        """
+        entry = {"unit": list(unit), "offset": offset, "rows": row_count}
+
+        with open(self.file_name, "a", encoding="utf-8") as manifest_file:
+            manifest_file.write(json.dumps(entry) + "\n")
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+
+        self.units.append(tuple(unit))
+        self.offset = offset
+        self.row_count = self.row_count + row_count
+
+    def remove(self):
+        """
+        This method removes the manifest file after the export has been completed.
+
+        :return: None.
+        """
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+
+
+class CompressionStream(io.BufferedIOBase):
+    """
+    This class is a binary stream that compresses the written data in a background
+    thread. The data is handed over to the thread through a bounded queue, so that the
+    writer blocks if the compression falls behind. The compressed file is a sequence of
+    complete gzip, bz2 or xz streams, which is read like a single stream by the
+    respective Python modules and command line tools.
+    """
+    def __init__(self, file_name: str, mode="wb", compression="gzip",
+                 queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Creates a new CompressionStream and opens the file.
+
+        :param file_name: The path of the file.
+        :param mode: The mode "wb" (default) to overwrite the file or "ab" to append
+            further streams to the file.
+        :param compression: One of the keys of COMPRESSIONS (default is "gzip").
+        :param queue_size: The maximum number of data blocks waiting for the compression
+            (default is DEFAULT_QUEUE_SIZE).
+        """
+        super().__init__()
+
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unsupported compression: " + str(compression))
+
+        self.compression = compression
+        self._compressor = _create_compressor(compression)
+        self._file = open(file_name, mode)  # pylint: disable=consider-using-with
+        self._queue = queue.Queue(queue_size)
+        self._error = None
+        self._stopped = False
+
+        self._thread = threading.Thread(target=self._compress, daemon=True)
+        self._thread.start()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        """
+        This method hands data over to the compression thread.
+
+        :param data: The bytes or another bytes-like object.
+        :return: The number of bytes.
+        """
+        self._check_error()
+        data = bytes(data)
+        self._queue.put(data)
+        return len(data)
+
+    def flush(self):
+        """
+        This method waits until the compression thread has written all data, which
+        has been compressed so far, to the file.
+
+        :return: None.
+        """
+        if self._stopped:
+            return
+
+        self._queue.join()
+        self._check_error()
+        self._file.flush()
+
+    def finish(self):
+        """
+        This method finishes the current compressed stream and writes it completely
+        to the file. Further data is written to a new stream.
+
+        :return: None.
+        """
+        self._queue.put(None)
+        self.flush()
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def tell(self):
+        """
+        This method returns the position in the compressed file.
+
+        :return: The position as int.
+        """
+        self.flush()
+        return self._file.tell()
+
+    def close(self):
+        """
+        This method finishes the compressed stream, stops the thread and closes the file.
+
+        :return: None.
+        """
+        if self._stopped:
+            return
+
+        try:
+            self.finish()
+        finally:
+            self._stopped = True
+            self._queue.put(False)
+            self._thread.join()
+            self._file.close()
+            super().close()
+
+    def _compress(self):
+        """
+        This method is executed by the compression thread. Bytes are compressed, None
+        finishes the current stream and False stops the thread.
+
+        :return: None.
+        """
+        while True:
+            data = self._queue.get()
+
+            try:
+                if data is False:
+                    return
+                if self._error is not None:
+                    continue
+
+                if data is None:
+                    self._file.write(self._compressor.flush())
+                    self._compressor = _create_compressor(self.compression)
+                else:
+                    self._file.write(self._compressor.compress(data))
+
+            # pylint: disable=broad-except
+            # The error is raised in the writing thread
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _check_error(self):
+        """
+        This method raises the error that occurred in the compression thread, if any.
+
+        :return: None.
+        """
+        if self._error is not None:
+            raise self._error
+
+
+def open_stream(file_name: str, mode="wb", compression=None):
+    """
+    This function opens a binary file for writing.
+
+    :param file_name: The path of the file.
+    :param mode: The mode "wb" (default) or "ab".
+    :param compression: One of the keys of COMPRESSIONS or None (default). If None is
+        handed over, the file is not compressed.
+    :return: The file object or the CompressionStream.
+    """
+    if compression is None:
+        return open(file_name, mode)  # pylint: disable=consider-using-with
+
+    return CompressionStream(file_name, mode, compression)
+
+
+def temp_file_name(file_name: str):
+    """
+    This function returns the name of the temporary file, which is written during an
+    export and renamed to the file name afterwards. The suffix _tmp is inserted before
+    the extensions of the file name (e.g. data/export_tmp.csv.gz for data/export.csv.gz).
+
+    :param file_name: The path of the file.
+    :return: The path of the temporary file.
+    """
+    directory, base_name = os.path.split(file_name)
+    name, dot, extensions = base_name.partition(".")
+    return os.path.join(directory, name + "_tmp" + dot + extensions)
+
+
+def _create_compressor(compression: str):
+    """
+    This function creates a compressor object for a compression.
+
+    :param compression: One of the keys of COMPRESSIONS.
+    :return: The compressor object.
+    """
+    if compression == "gzip":
+        return zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == "bz2":
+        return bz2.BZ2Compressor()
+    return lzma.LZMACompressor(lzma.FORMAT_XZ)
+
+
+def create_writer(file_name: str, file_format=CSV_FORMAT,
+                  batch_size=DEFAULT_BATCH_SIZE, big_int_columns=(), offset=0,
+                  compression=None, index_columns=None):
+    """
+    This function creates a batch writer for a file format.
+
+    :param file_name: The path of the file.
+    :param file_format: One of FILE_FORMATS (default is CSV_FORMAT).
+    :param batch_size: The number of frames per batch (default is DEFAULT_BATCH_SIZE).
+    :param big_int_columns: The names of the columns that may contain ints, which do not
+        fit into int64 (default is an empty tuple). Only relevant for parquet files.
+    :param offset: The byte offset at which an existing file is continued (default is 0).
+        Only csv files can be continued.
+    :param compression: One of the keys of COMPRESSIONS or None (default). Only csv
+        files can be compressed this way.
+    :param index_columns: The names of the key columns of the index or None (default).
+        Only relevant for csv files (see *CsvBatchWriter*).
+    :return: The CsvBatchWriter or ParquetBatchWriter.
+    """
+    if file_format == CSV_FORMAT:
+        return CsvBatchWriter(file_name, batch_size, offset, compression, index_columns)
+    if file_format == PARQUET_FORMAT and offset == 0 and compression is None:
+        return ParquetBatchWriter(file_name, batch_size, big_int_columns)
+    if file_format == PARQUET_FORMAT:
+        raise ValueError("Parquet files can neither be continued nor compressed")
+
+    raise ValueError("Unsupported file format: " + str(file_format))
+
+
+def _open_index(file_name: str, offset: int):
+    """
+    This function opens the index file of a csv export for writing. If an export is
+    continued, the lines of all sequences that are stored behind the offset
+    are removed.
+
+    :param file_name: The path of the index file.
+    :param offset: The byte offset at which the export is continued.
+    :return: The file object.
+    """
+    lines = []
+
+    if offset and os.path.exists(file_name):
+        with open(file_name, "r", encoding="utf-8", newline="") as index_file:
+            lines = index_file.readlines()
+
+        # The header and complete lines of sequences before the offset are kept
+        offset_column = lines[0].rstrip("\r\n").split(",").index("offset") if lines else 0
+        lines = lines[:1] + [
+            line for line in lines[1:]
+            if line.endswith("\n") and int(line.split(",")[offset_column]) < offset]
+
+    # pylint: disable=consider-using-with
+    index_file = open(file_name, "w", encoding="utf-8", newline="")
+    index_file.writelines(lines)
+    return index_file
+
+
+def read_index(file_name: str):
+    """
+    This function reads the index of a csv export (see *CsvBatchWriter*).
+
+    :param file_name: The path of the csv file.
+    :return: The index as pandas data frame.
+    """
+    return pd.read_csv(file_name + INDEX_SUFFIX)
+
+
+def read_rows(file_name: str, index_frame, **kwargs):
+    """
+    This function reads the rows of the sequences of an index from a csv export. Instead
+    of parsing the whole file, the reader seeks to the byte offsets of the sequences. For
+    compressed files, only the compressed stream that contains a sequence is decompressed.
+    Consecutive sequences are read without seeking.
+
+    :param file_name: The path of the csv file.
+    :param index_frame: The lines of the index (see *read_index*) of the sequences
+        to read.
+    :param kwargs: Further keyword arguments of *pandas.read_csv* (e.g. dtype).
+    :return: The rows of the sequences as pandas data frame.
+    """
+    extension = os.path.splitext(file_name)[1]
+    compression = {value: key for key, value in COMPRESSIONS.items()}.get(extension)
+    lines = []
+
+    with open(file_name, "rb") as raw_file:
+        lines.append(_open_decompressed(raw_file, compression).readline())
+        stream = None
+        location = None
+
+        for offset, position, row_count in zip(*(index_frame[column].to_numpy()
+                                                 for column in INDEX_COLUMNS)):
+            offset, position = int(offset), int(position)
+
+            if (offset, position) != location:
+                raw_file.seek(offset)
+                stream = _open_decompressed(raw_file, compression)
+
+                if position:
+                    stream.seek(position)
+
+            rows = [stream.readline() for _ in range(int(row_count))]
+            size = sum(len(row) for row in rows)
+            location = (offset, position + size) if compression else (offset + size, 0)
+            lines.extend(rows)
+
+    return pd.read_csv(io.BytesIO(b"".join(lines)), **kwargs)
+
+
+def read_sequences(file_name: str, sequence_ids):
+    """
+    This function reads the rows of some sequences from an indexed csv export (see
+    *read_rows*). The sequences are identified by the first key column of the index
+    (e.g. sequence_id).
+
+    :param file_name: The path of the csv file.
+    :param sequence_ids: The ids of the sequences.
+    :return: The rows of the sequences as pandas data frame.
+    """
+    index_frame = read_index(file_name)
+    key = index_frame.columns[0]
+    return read_rows(file_name, index_frame[index_frame[key].isin(list(sequence_ids))])
+
+
+def _open_decompressed(raw_file, compression):
+    """
+    This function opens a stream that decompresses a file from its current position.
+
+    :param raw_file: The binary file object.
+    :param compression: One of the keys of COMPRESSIONS or None. If None is handed over,
+        the file object itself is returned.
+    :return: The file object.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw_file, mode="rb")
+    if compression == "bz2":
+        return bz2.BZ2File(raw_file, "rb")
+    if compression == "xz":
+        return lzma.LZMAFile(raw_file, "rb")
+    return raw_file
+
+
+def read_part(file_name: str, first_sequence_id: int, sequence_count: int,
+              sequence_id_shift=0):
+    """
+    This function reads the rows of a range of sequences from an indexed csv export, so
+    that they can be taken over into a new export. All columns are read as strings,
+    which are written back unchanged. Only the sequence ids are shifted.
+
+    :param file_name: The path of the csv file.
+    :param first_sequence_id: The id of the first sequence.
+    :param sequence_count: The number of sequences.
+    :param sequence_id_shift: The number that is added to the sequence ids (default is 0).
+    :return: The rows as pandas data frame.
+    """
+    index_frame = read_index(file_name)
+    sequence_ids = index_frame["sequence_id"]
+    index_frame = index_frame[(sequence_ids >= first_sequence_id)
+                              & (sequence_ids < first_sequence_id + sequence_count)]
+
+    frame = read_rows(file_name, index_frame, dtype=str, keep_default_na=False)
+    frame["sequence_id"] = frame["sequence_id"].astype(np.int64) + sequence_id_shift
+    return frame
+
+
+def source_version(*file_names):
+    """
+    This function returns a fingerprint of the sources of the package collatz and
+    further files (e.g. an export script). It replaces a version number of the package,
+    since every change of the sources may change the exported data.
+
+    :param file_names: The paths of the further files.
+    :return: The fingerprint as hex string.
+    """
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    source_names = sorted(os.path.join(package_path, name)
+                          for name in os.listdir(package_path) if name.endswith(".py"))
+    digest = hashlib.sha256()
+
+    for source_name in source_names + list(file_names):
+        with open(source_name, "rb") as source_file:
+            digest.update(os.path.basename(source_name).encode("utf-8"))
+            digest.update(source_file.read())
+
+    return digest.hexdigest()
+
+
+def file_hash(file_name: str, block_size=2**20):
+    """
+    This function calculates the SHA-256 hash of the content of a file.
+
+    :param file_name: The path of the file.
+    :param block_size: The number of bytes that are read at once (default is 2**20).
+    :return: The hash as hex string.
+    """
+    digest = hashlib.sha256()
+
+    with open(file_name, "rb") as data_file:
+        for block in iter(lambda: data_file.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def write_metadata(file_name: str, parameters: dict, version: str, row_count: int):
+    """
+    This function writes the metadata of a completed export into a json file with the
+    suffix METADATA_SUFFIX.
+
+    :param file_name: The path of the export file.
+    :param parameters: The parameters of the export as dict of json compatible values.
+    :param version: The version of the sources (see *source_version*).
+    :param row_count: The number of rows of the export.
+    :return: None.
+    """
+    metadata = {"parameters": parameters, "version": version,
+                "rows": row_count, "sha256": file_hash(file_name)}
+
+    with open(file_name + METADATA_SUFFIX, "w", encoding="utf-8") as metadata_file:
+        json.dump(metadata, metadata_file, indent=2)
+
+
+def read_metadata(file_name: str):
+    """
+    This function reads the metadata of an export (see *write_metadata*). The metadata
+    is only returned if the content of the export file still matches its hash.
+
+    :param file_name: The path of the export file.
+    :return: The metadata as dict or None, if the export or its metadata is missing
+        or the export file has been changed.
+    """
+    if not (os.path.exists(file_name) and os.path.exists(file_name + METADATA_SUFFIX)):
+        return None
+
+    try:
+        with open(file_name + METADATA_SUFFIX, "r", encoding="utf-8") as metadata_file:
+            metadata = json.load(metadata_file)
+    except ValueError:
+        return None
+
+    if metadata.get("sha256") != file_hash(file_name):
+        return None
+
+    return metadata
+
+
+def remove_metadata(file_name: str):
+    """
+    This function removes the metadata of an export, which is about to be replaced.
+
+    :param file_name: The path of the export file.
+    :return: None.
+    """
+    if os.path.exists(file_name + METADATA_SUFFIX):
+        os.remove(file_name + METADATA_SUFFIX)
+
+
+def reusable_parts(metadata, parameters: dict, version: str, key="k"):
+    """
+    This function determines the parts of an existing export (e.g. the k factors),
+    which can be taken over into a new export. This requires that the versions of
+    the sources and all other parameters are equal.
+
+    :param metadata: The metadata of the existing export (see *read_metadata*) or None.
+    :param parameters: The parameters of the new export.
+    :param version: The version of the sources of the new export.
+    :param key: The name of the parameter, which contains the list of parts (default
+        is k).
+    :return: The list of the parts of the existing export in their order or an empty
+        list, if nothing can be taken over.
+    """
+    if metadata is None or metadata.get("version") != version:
+        return []
+
+    old_parameters = dict(metadata["parameters"])
+    new_parameters = dict(parameters)
+    parts = old_parameters.pop(key, [])
+    new_parameters.pop(key, None)
+
+    return list(parts) if old_parameters == new_parameters else []
+
+
+def read_parquet(file_name: str, columns=None):
+    """
+    This function reads a parquet file, which has been written by the ParquetBatchWriter,
+    into a data frame. Encoded big ints are decoded (see *decode_big_ints*).
+
+    :param file_name: The path of the parquet file.
+    :param columns: The names of the columns to read or None (default). If None is handed
+        over, all columns are read.
+    :return: The pandas data frame.
+    """
+    # pylint: disable=import-outside-toplevel
+    # Pyarrow is an optional dependency
+    import pyarrow.parquet as pq
+
+    names = pq.read_schema(file_name).names
+
+    if columns is None:
+        columns = [name for name in names if not (
+            name.endswith(BYTES_SUFFIX) and name[:-len(BYTES_SUFFIX)] in names)]
+
+    byte_columns = [name + BYTES_SUFFIX for name in columns
+                    if name + BYTES_SUFFIX in names]
+    table = pq.read_table(file_name, columns=list(columns) + byte_columns)
+    frame = table.select(list(columns)).to_pandas()
+
+    for byte_column in byte_columns:
+        name = byte_column[:-len(BYTES_SUFFIX)]
+        raw = table.column(byte_column)
+
+        if raw.null_count < len(raw):
+            frame[name] = decode_big_ints(table.column(name).to_pylist(), raw.to_pylist())
+
+    return frame
+
+
+def encode_big_ints(values):
+    """
+    This function encodes ints of arbitrary size losslessly into two arrays. Values that
+    fit into int64 are stored in an int64 array. All other values are stored as signed
+    big-endian bytes.
+
+    :param values: The ints as pandas series, numpy array or list.
+    :return: A tuple with an int64 numpy array and a list of bytes. The int64 array
+        contains zero and the list contains bytes for the values that do not fit into
+        int64. Otherwise, the list contains None.
+    """
+    values = np.asarray(values)
+
+    if values.dtype == np.int64:
+        return values, [None] * len(values)
+
+    ints = np.zeros(len(values), dtype=np.int64)
+    raw = [None] * len(values)
+
+    for i, value in enumerate(values):
+        value = int(value)
+        if _INT64_MIN <= value <= _INT64_MAX:
+            ints[i] = value
+        else:
+            raw[i] = value.to_bytes((value.bit_length() + 8) // 8, "big", signed=True)
+
+    return ints, raw
+
+
+def decode_big_ints(ints, raw):
+    """
+    This function decodes ints that have been encoded with *encode_big_ints*.
+
+    :param ints: The int64 values.
+    :param raw: The bytes, which are None for all values that are stored in *ints*.
+    :return: A numpy array of Python ints with the data type object.
+    """
+    values = [
+        value if value_bytes is None else int.from_bytes(value_bytes, "big", signed=True)
+        for value, value_bytes in zip(ints, raw)]
+    return np.array(values + [None], dtype=object)[:-1]
+
+
+def export_chunks(writer, function, chunks, units, manifest=None, worker_count=None):
+    """
+    This generator generates the frames of chunks in a pool of worker processes (see
+    *generate_chunks*) and writes them in the order of the chunks. Every chunk
+    corresponds to a unit, which is committed to the manifest as soon as the frame
+    is completely written to disk.
+
+    :param writer: The CsvBatchWriter or ParquetBatchWriter.
+    :param function: The function that generates the frame of a chunk.
+    :param chunks: The list of argument tuples of the function.
+    :param units: The list of units, one per chunk.
+    :param manifest: The ExportManifest or None (default). If None is handed over,
+        no units are committed.
+    :param worker_count: The number of worker processes or None (default). If None is
+        handed over, the number of CPUs is used.
+    :return: The units after they have been written.
+    """
+    frames = generate_chunks(function, chunks, worker_count)
+
+    for unit, frame in zip(units, frames):
+        writer.write(frame)
+
+        if manifest is not None:
+            manifest.commit(unit, writer.sync(), len(frame))
+
+        yield unit
+
+
+def export_sequences(file_name: str, function, parameters: dict, version: str,
+                     start_values, batch_size=DEFAULT_BATCH_SIZE, function_args=(),
+                     big_int_columns=(), index_columns=None, worker_count=None):
+    """
+    This function exports the sequences of all k factors and start values into a file.
+    It is the common procedure of the export scripts:
+
+    - An export that is up to date (see *read_metadata*) is skipped.
+    - The sequences of k factors that are already part of an indexed csv export with
+      otherwise equal parameters are taken over (see *read_part*).
+    - The start values are split into batches, which are generated in a pool of
+      worker processes and written to a temporary file (see *export_chunks*).
+    - An interrupted csv export is resumed (see *ExportManifest*).
+    - The temporary file and its index are renamed and the metadata is written.
+
+    :param file_name: The path of the export file.
+    :param function: The function that generates the frame of a batch. It is called
+        with the first sequence id, the start values, the k factor, the maximum number
+        of iterations and *function_args*.
+    :param parameters: The parameters of the export as dict of json compatible values.
+        It must contain the k factors (k), the maximum number of iterations (m),
+        the file format (format) and the compression (compression).
+    :param version: The version of the sources (see *source_version*).
+    :param start_values: The start values as range.
+    :param batch_size: The number of start values per batch (default is
+        DEFAULT_BATCH_SIZE).
+    :param function_args: Further arguments of the function (default is an empty tuple).
+    :param big_int_columns: The names of the columns that may contain ints, which do not
+        fit into int64 (default is an empty tuple).
+    :param index_columns: The names of the key columns of the index of a csv export or
+        None (default).
+    :param worker_count: The number of worker processes or None (default). If None is
+        handed over, the number of CPUs is used.
+    :return: The number of rows of the export or None if the export was up to date.
+    """
+    k_factors = parameters["k"]
+    max_iterations = parameters["m"]
+    file_format = parameters["format"]
+    tmp_file_name = temp_file_name(file_name)
+
+    # Check the options before any file is touched
+    if parameters["compression"] and file_format != CSV_FORMAT:
+        raise ValueError("Compression is only supported for " + CSV_FORMAT)
+
+    # Skip an export that is up to date
+    metadata = read_metadata(file_name)
+
+    if metadata and metadata["version"] == version and metadata["parameters"] == parameters:
+        logging.info("Export %s is up to date", file_name)
+        return None
+
+    # The rows of unchanged k factors are taken over from an indexed csv export
+    reused_k_factors = []
+    if file_format == CSV_FORMAT and os.path.exists(file_name + INDEX_SUFFIX):
+        reused_k_factors = reusable_parts(metadata, parameters, version)
+
+    logging.info("Exporting %d Collatz sequences to file %s",
+                 len(start_values) * len(k_factors), file_name)
+
+    # Every batch is generated independently
+    batches = []
+    units = []
+    sequence_id = 1
+
+    for k in k_factors:
+        if k in reused_k_factors:
+            logging.info("Taking over the sequences for k=%d from the existing export", k)
+            shift = sequence_id - 1 - reused_k_factors.index(k) * len(start_values)
+
+        for i in range(0, len(start_values), batch_size):
+            batch_values = start_values[i:i + batch_size]
+
+            if k in reused_k_factors:
+                batches.append((read_part, file_name, sequence_id - shift,
+                                len(batch_values), shift))
+            else:
+                batches.append((function, sequence_id, batch_values, k, max_iterations)
+                               + tuple(function_args))
+
+            units.append((k, batch_values[0], batch_values[-1]))
+            sequence_id = sequence_id + len(batch_values)
+
+    # Resume an interrupted export
+    manifest = None
+    completed = 0
+
+    if file_format == CSV_FORMAT:
+        manifest = ExportManifest(tmp_file_name + MANIFEST_SUFFIX, parameters)
+        completed = manifest.load(units, tmp_file_name)
+
+    if not completed and os.path.exists(tmp_file_name):
+        logging.info("Discarding the incomplete export %s", tmp_file_name)
+        os.remove(tmp_file_name)
+
+    if completed:
+        logging.info("Resuming export after %d/%d batches (%d rows)",
+                     completed, len(batches), manifest.row_count)
+
+    logging.info("Generating %d batches using %d workers",
+                 len(batches) - completed, worker_count or os.cpu_count())
+
+    offset = manifest.offset if manifest else 0
+    with create_writer(tmp_file_name, file_format, 1, big_int_columns, offset,
+                       parameters["compression"], index_columns) as writer:
+        written = export_chunks(writer, apply_chunk, batches[completed:],
+                                units[completed:], manifest, worker_count)
+
+        for i, unit in enumerate(written, completed + 1):
+            logging.info("Written batch %d/%d for k=%d and start values %d to %d",
+                         i, len(batches), *unit)
+
+    row_count = manifest.row_count if manifest else writer.row_count
+
+    # Moving tmp file to destination file
+    logging.info("Moving temp file to destination file")
+    remove_metadata(file_name)
+    shutil.move(tmp_file_name, file_name)
+
+    if file_format == CSV_FORMAT and index_columns is not None:
+        shutil.move(tmp_file_name + INDEX_SUFFIX, file_name + INDEX_SUFFIX)
+
+    if manifest:
+        manifest.remove()
+
+    write_metadata(file_name, parameters, version, row_count)
+    return row_count
+
+
+def binary_columns(values, name: str, encoding=BINARY_FULL,
+                   window_bits=DEFAULT_WINDOW_BITS):
+    """
+    This function encodes the binary representations of positive ints as columns. With
+    the encoding BINARY_FULL, a single column contains the binary strings. The encoding
+    BINARY_COMPACT creates three columns with the suffixes _len, _lead and _trail, which
+    contain the bit lengths and the leading and trailing *window_bits* bits as ints.
+    The encoding BINARY_BYTES adds a column with the suffix _hex, which contains the
+    hexadecimal representations. The compact columns are calculated with shifts instead
+    of string conversions.
+
+    :param values: The ints as numpy array or list. Int64 arrays are processed
+        vectorised, all other values as Python ints.
+    :param name: The name of the column with the binary strings (e.g. v_i_bin).
+    :param encoding: One of BINARY_ENCODINGS (default is BINARY_FULL).
+    :param window_bits: The number of leading and trailing bits between 1 and 63
+        (default is DEFAULT_WINDOW_BITS).
+    :return: A dict that maps the names of the columns to numpy arrays.
+    """
+    if encoding not in BINARY_ENCODINGS:
+        raise ValueError("Unsupported binary encoding: " + str(encoding))
+
+    if not 0 < window_bits < 64:
+        raise ValueError("The window must have between 1 and 63 bits")
+
+    if encoding == BINARY_FULL:
+        return {name: _object_array([commons.to_binary(int(v)) for v in values])}
+
+    if isinstance(values, np.ndarray) and values.dtype == np.int64:
+        bit_lengths = tensor.bit_length(values)
+        leading = np.right_shift(values, np.maximum(bit_lengths - window_bits, 0))
+        trailing = np.bitwise_and(values, 2**window_bits - 1)
+    else:
+        values = [int(v) for v in values]
+        lengths = [v.bit_length() for v in values]
+        bit_lengths = np.array(lengths, dtype=np.int64)
+        leading = np.array([v >> max(length - window_bits, 0)
+                            for v, length in zip(values, lengths)], dtype=np.int64)
+        trailing = np.array([v & (2**window_bits - 1) for v in values], dtype=np.int64)
+
+    columns = {name + "_len": bit_lengths, name + "_lead": leading,
+               name + "_trail": trailing}
+
+    if encoding == BINARY_BYTES:
+        columns[name + "_hex"] = _object_array([format(int(v), "x") for v in values])
+
+    return columns
+
+
+def binary_strings(frame, name: str, window_bits=DEFAULT_WINDOW_BITS):
+    """
+    This function returns the binary strings of a column regardless of the encoding
+    of the export (see *binary_columns*). The strings are reconstructed from the first
+    available source: the column itself, the hexadecimal column, the column with the
+    values (the name without the suffix _bin) or the compact columns.
+
+    :param frame: The pandas data frame.
+    :param name: The name of the column with the binary strings (e.g. v_i_bin).
+    :param window_bits: The number of leading and trailing bits of the compact columns
+        (default is DEFAULT_WINDOW_BITS).
+    :return: A pandas series with the binary strings.
+    """
+    value_name = name[:-len("_bin")] if name.endswith("_bin") else None
+
+    if name in frame:
+        strings = frame[name]
+    elif name + "_hex" in frame:
+        strings = frame[name + "_hex"].map(lambda h: commons.to_binary(int(h, 16)))
+    elif value_name in frame:
+        strings = frame[value_name].map(lambda v: commons.to_binary(int(v)))
+    else:
+        strings = pd.Series([
+            from_binary_windows(*columns, window_bits) for columns in zip(
+                frame[name + "_len"], frame[name + "_lead"], frame[name + "_trail"])],
+            index=frame.index, dtype=object)
+
+    return strings.rename(name)
+
+
+def from_binary_windows(bit_length: int, leading: int, trailing: int,
+                        window_bits=DEFAULT_WINDOW_BITS):
+    """
+    This function reconstructs a binary string from its bit length and its leading
+    and trailing bits. The reconstruction is only possible if the windows cover all bits.
+
+    :param bit_length: The bit length.
+    :param leading: The leading bits as int.
+    :param trailing: The trailing bits as int.
+    :param window_bits: The number of leading and trailing bits
+        (default is DEFAULT_WINDOW_BITS).
+    :return: The binary string.
+    """
+    bit_length, leading, trailing = int(bit_length), int(leading), int(trailing)
+
+    if bit_length > 2 * window_bits:
+        raise ValueError("The windows do not cover all bits of the number")
+
+    if bit_length <= window_bits:
+        return commons.to_binary(leading)
+
+    low_bits = bit_length - window_bits
+    value = (leading << low_bits) | (trailing & (2**low_bits - 1))
+    return commons.to_binary(value)
+
+
+def _object_array(values):
+    """
+    This function converts a list into a one-dimensional numpy array with the data
+    type object.
+
+    :param values: The list.
+    :return: The numpy array.
+    """
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def apply_chunk(function, *args):
+    """
+    This function calls the function of a chunk. It allows to export chunks, which are
+    generated by different functions (e.g. new and taken over parts), in a single
+    pool (see *export_chunks*).
+
+    :param function: The function, which must be defined at the top level of a module.
+    :param args: The arguments of the function.
+    :return: The result of the function.
+    """
+    return function(*args)
+
+
+def generate_chunks(function, chunks, worker_count=None, max_pending=None):
+    """
+    This generator calls a function for every chunk in a pool of worker processes and
+    yields the results in the order of the chunks. Only *max_pending* chunks are
+    processed or waiting to be written at the same time. Hence, the workers pause
+    if the consumer of the results (e.g. a single file writer) falls behind, and
+    the memory usage is bounded regardless of the number of chunks.
+
+    :param function: The function, which must be picklable (e.g. defined at the top
+        level of a module).
+    :param chunks: An iterable of argument tuples, which are handed over to the function.
+    :param worker_count: The number of worker processes or None (default). If None is
+        handed over, the number of CPUs is used. If the number is 1, the chunks are
+        processed in the current process.
+    :param max_pending: The maximum number of pending chunks or None (default). If None
+        is handed over, DEFAULT_CHUNKS_PER_WORKER chunks per worker are allowed.
+    :return: The results of the function.
+    """
+    if worker_count is None:
+        worker_count = os.cpu_count()
+
+    if worker_count <= 1:
+        for chunk in chunks:
+            yield function(*chunk)
+        return
+
+    if max_pending is None:
+        max_pending = DEFAULT_CHUNKS_PER_WORKER * worker_count
+
+    with Pool(worker_count) as pool:
+        pending = deque()
+
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(function, chunk))
+
+        while pending:
+            yield pending.popleft().get()
+
+
+def concat_frames(frames):
+    """
+    This function concatenates data frames. In contrast to *pd.concat*, columns whose data
+    types differ between the frames are concatenated as objects. Hence, the values are
+    written exactly as if the frames were written separately. Otherwise, a column with
+    int64 and uint64 values (big ints) would, for example, be converted to float64.
+
+    :param frames: The list of data frames.
+    :return: The concatenated data frame.
+    """
+    mixed_columns = [
+        column for column in frames[0].columns
+        if len({frame[column].dtype for frame in frames}) > 1]
+
+    if mixed_columns:
+        frames = [frame.astype({column: "object" for column in mixed_columns})
+                  for frame in frames]
+
+    return pd.concat(frames, ignore_index=True)
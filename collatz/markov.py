@@ -0,0 +1,224 @@
+"""
+This module provides an exact analysis of Markov chains with outputs. The chains describe
+the nondeterministic automata of the module collatz.automata, where every branch of a
+transition is considered as equally likely. In contrast to a simulation of the automata,
+the functions calculate exact probabilities and expected values. Furthermore, the sums
+of the outputs that are reachable over all paths of a certain length are determined
+independently of the probabilities.
+"""
+
+# Imports
+import numpy as np
+
+
+class MarkovChain:
+    """
+    This class represents a finite Markov chain whose transitions produce an integer
+    output (e.g. the growth lambda_i or omega_i of a Collatz number). A transition is
+    a tuple of state, next state, probability and output. Two states may be connected by
+    multiple transitions with different outputs.
+    """
+    def __init__(self, transitions, initial_states=None):
+        """
+        Creates a new MarkovChain.
+
+        :param transitions: A list of tuples (state, next_state, probability, output).
+        :param initial_states: The states in which the chain starts with equal probability
+            or None (default). If None is handed over, all states are initial states.
+        """
+        self.transitions = list(transitions)
+        self.states = list(dict.fromkeys(
+            state for transition in self.transitions for state in transition[:2]))
+
+        if initial_states is None:
+            initial_states = self.states
+        self.initial_states = list(initial_states)
+
+    def transition_matrix(self):
+        """
+        This method returns the transition matrix of the chain. The entry in row i and
+        column j is the probability of moving from the i-th to the j-th state of
+        the attribute *states*.
+
+        :return: The transition matrix as numpy array.
+        """
+        return sum(self._output_matrices().values())
+
+    def initial_distribution(self):
+        """
+        This method returns the distribution of the initial states.
+
+        :return: A numpy array with the probabilities of the states.
+        """
+        distribution = np.zeros(len(self.states))
+        for state in self.initial_states:
+            distribution[self.states.index(state)] += 1 / len(self.initial_states)
+        return distribution
+
+    def stationary_distribution(self):
+        """
+        This method returns the stationary distribution of the chain, i.e. the
+        distribution that does not change with a transition. States that cannot
+        be reentered have a probability of zero.
+
+        :return: A numpy array with the probabilities of the states.
+        """
+        state_count = len(self.states)
+        equations = np.vstack([
+            self.transition_matrix().T - np.identity(state_count),
+            np.ones(state_count)])
+        target = np.zeros(state_count + 1)
+        target[-1] = 1
+
+        distribution = np.linalg.lstsq(equations, target, rcond=None)[0]
+        distribution[np.isclose(distribution, 0)] = 0
+        return distribution / distribution.sum()
+
+    def expected_output(self, distribution=None):
+        """
+        This method returns the expected output of a single transition.
+
+        :param distribution: The distribution of the states before the transition or None
+            (default). If None is handed over, the stationary distribution is used.
+        :return: The expected output as float.
+        """
+        if distribution is None:
+            distribution = self.stationary_distribution()
+
+        expected = 0.0
+        for output, matrix in self._output_matrices().items():
+            expected += output * float(distribution @ matrix.sum(axis=1))
+        return expected
+
+    def output_distribution(self, steps: int, distribution=None):
+        """
+        This method returns the exact distribution of the sum of the outputs after a
+        number of transitions. The distribution is calculated by dynamic programming
+        over the states and all possible sums.
+
+        :param steps: The number of transitions.
+        :param distribution: The distribution of the states before the first transition
+            or None (default). If None is handed over, the initial distribution is used.
+        :return: A tuple with a numpy array of the possible sums in ascending order and
+            a numpy array of their probabilities.
+        """
+        if distribution is None:
+            distribution = self.initial_distribution()
+
+        output_matrices = self._output_matrices()
+        min_output = min(output_matrices)
+        output_range = max(output_matrices) - min_output
+
+        # Every column holds the probabilities of the states for a certain sum
+        probabilities = np.asarray(distribution, dtype=float).reshape(-1, 1)
+        min_sum = 0
+
+        for _ in range(steps):
+            width = probabilities.shape[1]
+            next_probabilities = np.zeros((len(self.states), width + output_range))
+
+            for output, matrix in output_matrices.items():
+                offset = output - min_output
+                next_probabilities[:, offset:offset + width] += matrix.T @ probabilities
+
+            probabilities = next_probabilities
+            min_sum = min_sum + min_output
+
+        sums = np.arange(min_sum, min_sum + probabilities.shape[1])
+        probabilities = probabilities.sum(axis=0)
+        possible = probabilities > 0
+        return sums[possible], probabilities[possible]
+
+    def reachable_sums(self, steps: int, states=None):
+        """
+        This method returns the sums of the outputs that are reachable over all paths
+        with a certain number of transitions. The sets of reachable pairs of state and
+        sum are calculated by dynamic programming, which takes polynomial time
+        in the number of transitions.
+
+        :param steps: The number of transitions.
+        :param states: The states in which the paths start or None (default). If None is
+            handed over, the paths start in the initial states.
+        :return: A dict that maps every state in which a path ends to a numpy array of
+            the reachable sums in ascending order.
+        """
+        if states is None:
+            states = self.initial_states
+
+        adjacency = {output: (matrix > 0).astype(float)
+                     for output, matrix in self._output_matrices().items()}
+        min_output = min(adjacency)
+        output_range = max(adjacency) - min_output
+
+        # Every column marks the states that are reachable with a certain sum
+        reachable = np.zeros((len(self.states), 1))
+        reachable[[self.states.index(state) for state in states]] = 1
+        min_sum = 0
+
+        for _ in range(steps):
+            width = reachable.shape[1]
+            next_reachable = np.zeros((len(self.states), width + output_range))
+
+            for output, matrix in adjacency.items():
+                offset = output - min_output
+                next_reachable[:, offset:offset + width] += matrix.T @ reachable
+
+            reachable = np.minimum(next_reachable, 1)
+            min_sum = min_sum + min_output
+
+        sums = np.arange(min_sum, min_sum + reachable.shape[1])
+        return {state: sums[reachable[i] > 0] for i, state in enumerate(self.states)
+                if reachable[i].any()}
+
+    def output_bounds(self, steps: int, states=None):
+        """
+        This method returns the minimum and the maximum sum of the outputs over all paths
+        with a certain number of transitions. Since only the extreme sums can contribute
+        to the bounds, all other pairs of state and sum are pruned as dominated. Hence,
+        only the minimum and the maximum sum per state are calculated by dynamic
+        programming in the (min, +) and (max, +) semirings. The runtime is linear
+        in the number of transitions.
+
+        :param steps: The number of transitions.
+        :param states: The states in which the paths start or None (default). If None is
+            handed over, the paths start in the initial states.
+        :return: A tuple with the minimum and the maximum sum as ints.
+        """
+        if states is None:
+            states = self.initial_states
+
+        sources = np.array([self.states.index(t[0]) for t in self.transitions])
+        targets = np.array([self.states.index(t[1]) for t in self.transitions])
+        outputs = np.array([t[3] for t in self.transitions], dtype=float)
+
+        # The bounds of states that are not reachable are infinite
+        min_sums = np.full(len(self.states), np.inf)
+        min_sums[[self.states.index(state) for state in states]] = 0
+        max_sums = -min_sums
+
+        for _ in range(steps):
+            next_min_sums = np.full(len(self.states), np.inf)
+            next_max_sums = np.full(len(self.states), -np.inf)
+            np.minimum.at(next_min_sums, targets, min_sums[sources] + outputs)
+            np.maximum.at(next_max_sums, targets, max_sums[sources] + outputs)
+            min_sums, max_sums = next_min_sums, next_max_sums
+
+        return int(min_sums.min()), int(max_sums.max())
+
+    def _output_matrices(self):
+        """
+        This method returns a transition matrix for every output. The entries of
+        the matrices are the probabilities of the transitions with the respective output.
+
+        :return: A dict that maps the outputs to numpy arrays.
+        """
+        state_count = len(self.states)
+        matrices = {}
+
+        for state, next_state, probability, output in self.transitions:
+            if output not in matrices:
+                matrices[output] = np.zeros((state_count, state_count))
+            matrices[output][self.states.index(state),
+                             self.states.index(next_state)] += probability
+
+        return matrices
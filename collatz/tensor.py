@@ -1,59 +1,1302 @@
 """
-This module uses tensorflow to calculate Collatz numbers.
+This module provides vectorised functions to calculate Collatz numbers. The
+calculations are delegated to a backend. By default, a pure numpy backend is used.
+Alternatively, a tensorflow backend can be selected with the function *set_backend*.
+Tensorflow is only imported when the tensorflow backend is actually selected.
 
 CAUTION: The processing of arbitrary large integers is currently not supported
-due to the limitations of tensorflow.
+due to the limitations of the int64 data type. The functions with the prefix *checked_*
+return an overflow mask, which can be used to process the affected values differently.
+For values up to 2**128, the module provides numpy functions with the suffix *_limbs*,
+which represent every number by two uint64 arrays (hi and lo). Even larger values
+must be processed with Python ints.
 """
 
 # Imports
-import tensorflow as tf
-import tensorflow.experimental.numpy as tnp
+from abc import ABC, abstractmethod
+from functools import partial
+import numpy as np
+from collatz import commons
 
 
-# Activate numpy api
-tnp.experimental_enable_numpy_behavior()
+# Limits of the int64 data type
+INT64_MIN = -2**63
+INT64_MAX = 2**63 - 1
+
+# De Bruijn sequence and lookup table to determine the index of the lowest set bit
+_DE_BRUIJN_64 = 0x022FDD63CC95386D
+_DE_BRUIJN_SHIFT = 58
+_DE_BRUIJN_TABLE = np.zeros(64, dtype=np.int64)
+
+for _bit in range(64):
+    _DE_BRUIJN_TABLE[((_DE_BRUIJN_64 << _bit) % 2**64) >> _DE_BRUIJN_SHIFT] = _bit
+
+# Constants for the two limb representation
+_UINT64_MAX = 2**64 - 1
+_LOW_BITS_32 = np.uint64(2**32 - 1)
+_SHIFT_32 = np.uint64(32)
+_SHIFT_63 = np.uint64(63)
+_SHIFT_64 = np.uint64(64)
+
+# Status codes of the function iterate_block
+BLOCK_RETIRED = 0
+BLOCK_OVERFLOW = 1
+BLOCK_EXHAUSTED = 2
+
+# Columns of the statistics returned by the function block_statistics
+STATISTICS_COLUMNS = ("v_1", "odd_steps", "steps", "peak", "peak_bits")
+
+# Classes and columns of the function classify_block
+CLASS_ONE = 0
+CLASS_CYCLE = 1
+CLASS_BOUND = 2
+CLASSIFICATION_COLUMNS = ("v_1", "class", "cycle_min", "cycle_length", "odd_steps")
+
+# Precomputed statistics per process
+_statistics_tables = {}
+
+
+class AbstractBackend(ABC):
+    """
+    This abstract base class represents a backend that performs the vectorised
+    calculations of this module. Every backend derived from this class operates on
+    arrays (or tensors) with int64 values.
+    """
+    name = None
+
+    # pylint: disable=C0103
+    # A single character for k and c is ok
+    @abstractmethod
+    def next_even_collatz_numbers(self, odd_numbers, k=3, c=1):
+        """
+        This method calculates the even Collatz numbers for odd Collatz numbers.
+
+        :param odd_numbers: An array with odd Collatz integers.
+        :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+        :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+        :return: An array with the even Collatz integers.
+        """
+
+    def checked_next_even_collatz_numbers(self, odd_numbers, k=3, c=1):
+        """
+        This method calculates the even Collatz numbers for odd Collatz numbers and
+        additionally returns a mask of the values whose result overflows int64.
+
+        :param odd_numbers: An array with odd Collatz integers.
+        :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+        :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+        :return: A tuple with the array of even Collatz integers and the boolean overflow mask.
+            The even Collatz integers are not valid where the mask is True.
+        """
+        lower, upper = overflow_bounds(k, c)
+        evens = self.next_even_collatz_numbers(odd_numbers, k, c)
+        overflow = self._outside(odd_numbers, lower, upper)
+        return evens, overflow
+
+    @abstractmethod
+    def _outside(self, numbers, lower, upper):
+        """
+        This method returns a boolean mask of the numbers outside of a closed interval.
+
+        :param numbers: An array with integers.
+        :param lower: The lower bound of the interval as int.
+        :param upper: The upper bound of the interval as int.
+        :return: The boolean mask.
+        """
+
+    @abstractmethod
+    def next_odd_collatz_numbers(self, even_numbers):
+        """
+        This method calculates the odd Collatz numbers for even Collatz numbers.
+
+        :param even_numbers: An array with even Collatz integers.
+        :return: An array with the odd Collatz integers.
+        """
+
+    @abstractmethod
+    def trailing_zeros(self, numbers):
+        """
+        This method returns the trailing zeros of the binary representation of integers.
+
+        :param numbers: An array with integers.
+        :return: An array with the trailing zeros of the binary representation of the ints.
+        """
+
+    def iterate_block(self, starts, k=3, c=1, max_iterations=-1):
+        """
+        This method performs odd steps for the Collatz sequences of odd start values until
+        each sequence drops below its start value, reaches one, overflows int64 or exceeds
+        the maximum number of iterations. Sequences that stopped are retired from the
+        calculation.
+
+        :param starts: An array with odd start values.
+        :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+        :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+        :param max_iterations: The maximum number of odd steps or -1 (default).
+        :return: A tuple with three int64 arrays: the last odd values of the sequences, the
+            number of odd steps performed and the status of the sequences (BLOCK_RETIRED,
+            BLOCK_OVERFLOW or BLOCK_EXHAUSTED). For overflowing sequences, the last value is
+            the value whose successor does not fit into int64.
+        """
+        starts = _to_int64_array(starts)
+        last_values = starts.copy()
+        last_iterations = np.zeros(starts.size, dtype=np.int64)
+        status = np.full(starts.size, BLOCK_EXHAUSTED, dtype=np.int64)
+
+        lanes = np.arange(starts.size)
+        values = starts
+        iterations = 0
+
+        while lanes.size > 0:
+            if -1 < max_iterations <= iterations:
+                last_values[lanes] = values
+                last_iterations[lanes] = iterations
+                break
+
+            evens, overflow = self.checked_next_even_collatz_numbers(values, k, c)
+            evens, overflow = np.asarray(evens), np.asarray(overflow)
+
+            if overflow.any():
+                last_values[lanes[overflow]] = values[overflow]
+                last_iterations[lanes[overflow]] = iterations
+                status[lanes[overflow]] = BLOCK_OVERFLOW
+                evens, lanes = _compact(~overflow, evens, lanes)
+
+            values = np.asarray(self.next_odd_collatz_numbers(evens))
+            iterations = iterations + 1
+
+            # Retire the sequences that dropped below their start value or reached one
+            active = (values >= starts[lanes]) & (values != 1)
+
+            if not active.all():
+                retired = lanes[~active]
+                last_values[retired] = values[~active]
+                last_iterations[retired] = iterations
+                status[retired] = BLOCK_RETIRED
+                values, lanes = _compact(active, values, lanes)
+
+        return last_values, last_iterations, status
+
+    def __str__(self):
+        return str(self.name)
+
+
+class NumpyBackend(AbstractBackend):
+    """
+    This backend uses numpy to calculate Collatz numbers. It is the default backend
+    of this module and runs on the CPU only.
+    """
+    name = "numpy"
+
+    def next_even_collatz_numbers(self, odd_numbers, k=3, c=1):
+        odd_numbers = _to_int64_array(odd_numbers)
+        return odd_numbers * k + c
+
+    def next_odd_collatz_numbers(self, even_numbers):
+        even_numbers = _to_int64_array(even_numbers)
+        tz = self.trailing_zeros(even_numbers)
+        return np.right_shift(even_numbers, tz)
+
+    def trailing_zeros(self, numbers):
+        numbers = _to_int64_array(numbers)
+
+        # Isolate the lowest set bit and look up its index with a de Bruijn sequence
+        lowest = np.bitwise_and(numbers, np.negative(numbers)).view(np.uint64)
+        index = np.right_shift(
+            lowest * np.uint64(_DE_BRUIJN_64), np.uint64(_DE_BRUIJN_SHIFT))
+
+        tz = _DE_BRUIJN_TABLE[index.astype(np.int64)]
+        return np.where(lowest == 0, 64, tz)
+
+    def _outside(self, numbers, lower, upper):
+        numbers = _to_int64_array(numbers)
+        return (numbers < lower) | (numbers > upper)
+
+
+class TensorflowBackend(AbstractBackend):
+    """
+    This backend uses tensorflow to calculate Collatz numbers. Tensorflow is imported
+    when the backend is created, which may take several seconds.
+
+    By default, all operations are executed eagerly. In compiled mode, the method
+    *iterate_block* runs as a single tensorflow graph (tf.function with tf.while_loop),
+    which avoids the overhead of Python and of dispatching every operation. The graph can
+    optionally be compiled with XLA.
+    """
+    name = "tensorflow"
+
+    def __init__(self, compiled=False, jit_compile=False, steps_per_call=32):
+        """
+        Creates a new TensorflowBackend.
+
+        :param compiled: If True, the method iterate_block is executed as compiled
+            graph (default is False).
+        :param jit_compile: If True, the compiled graph is additionally compiled
+            with XLA (default is False). Implies compiled mode.
+        :param steps_per_call: The number of odd steps performed per execution of the
+            compiled graph (default is 32). Finished sequences are removed in between.
+        """
+        # pylint: disable=import-outside-toplevel
+        # Tensorflow is imported lazily, because importing it is expensive
+        import tensorflow as tf
+        self._tf = tf
+        self._compiled_iteration = None
+        self.steps_per_call = steps_per_call
+
+        if compiled or jit_compile:
+            self.name = "tensorflow_xla" if jit_compile else "tensorflow_compiled"
+            vector_spec = tf.TensorSpec([None], tf.int64)
+            scalar_spec = tf.TensorSpec([], tf.int64)
+            self._compiled_iteration = tf.function(
+                self._iterate_graph, jit_compile=jit_compile,
+                input_signature=[vector_spec] * 2 + [scalar_spec] * 5)
+
+    def next_even_collatz_numbers(self, odd_numbers, k=3, c=1):
+        odd_numbers = self._to_int64_tensor(odd_numbers)
+        return self._tf.add(self._tf.multiply(odd_numbers, k), c)
+
+    def next_odd_collatz_numbers(self, even_numbers):
+        even_numbers = self._to_int64_tensor(even_numbers)
+        tz = self.trailing_zeros(even_numbers)
+        return self._tf.bitwise.right_shift(even_numbers, tz)
+
+    def trailing_zeros(self, numbers):
+        tf = self._tf
+        numbers = self._to_int64_tensor(numbers)
+
+        # The bits below the lowest set bit are counted exactly
+        lowest = tf.bitwise.bitwise_and(numbers, tf.multiply(numbers, -1))
+        tz = tf.raw_ops.PopulationCount(x=tf.subtract(lowest, 1))
+        return tf.cast(tz, tf.int64)
+
+    def _outside(self, numbers, lower, upper):
+        tf = self._tf
+        numbers = self._to_int64_tensor(numbers)
+        return tf.logical_or(tf.less(numbers, lower), tf.greater(numbers, upper))
+
+    def iterate_block(self, starts, k=3, c=1, max_iterations=-1):
+        if self._compiled_iteration is None:
+            return super().iterate_block(starts, k, c, max_iterations)
+
+        tf = self._tf
+        lower, upper = overflow_bounds(k, c)
+        arguments = [tf.constant(value, dtype=tf.int64) for value in (k, c, lower, upper)]
+
+        starts = _to_int64_array(starts)
+        last_values = starts.copy()
+        last_iterations = np.zeros(starts.size, dtype=np.int64)
+        status = np.full(starts.size, BLOCK_EXHAUSTED, dtype=np.int64)
+
+        lanes = np.arange(starts.size)
+        iterations = 0
+
+        # The graph is executed for a limited number of steps, so that finished
+        # sequences can be removed from the tensors in between
+        while lanes.size > 0 and not -1 < max_iterations <= iterations:
+            steps = self.steps_per_call
+
+            if max_iterations > -1:
+                steps = min(steps, max_iterations - iterations)
+
+            values, steps_done, lane_status = (tensor.numpy() for tensor in (
+                self._compiled_iteration(
+                    tf.constant(last_values[lanes]), tf.constant(starts[lanes]),
+                    *arguments, tf.constant(steps, dtype=tf.int64))))
+
+            last_values[lanes] = values
+            last_iterations[lanes] += steps_done
+            status[lanes] = lane_status
+
+            lanes = lanes[lane_status == BLOCK_EXHAUSTED]
+            iterations = iterations + steps
+
+        return last_values, last_iterations, status
+
+    # pylint: disable=too-many-arguments
+    # All arguments are tensors of the graph
+    def _iterate_graph(self, values, starts, k, c, lower, upper, steps):
+        """
+        This method builds the graph for the compiled mode of the method iterate_block.
+        The graph performs a certain number of odd steps. In contrast to the eager mode,
+        the sequences are not removed from the tensors, but masked, so that the shapes
+        of the tensors remain constant.
+
+        :param values: A tensor with the current odd values.
+        :param starts: A tensor with the odd start values.
+        :param k: The factor by which odd numbers are multiplied in the sequence.
+        :param c: The summand by which odd numbers in the sequence are increased.
+        :param lower: The lowest value whose successor fits into int64.
+        :param upper: The highest value whose successor fits into int64.
+        :param steps: The maximum number of odd steps to perform.
+        :return: The last values, the number of odd steps performed and the status
+            of the sequences as tensors.
+        """
+        tf = self._tf
+
+        def condition(iteration, _values, _iterations, _status, active):
+            return tf.logical_and(iteration < steps, tf.reduce_any(active))
+
+        def body(iteration, values, iterations, status, active):
+            overflow = tf.logical_and(
+                active, tf.logical_or(values < lower, values > upper))
+            stepping = tf.logical_and(active, tf.logical_not(overflow))
+
+            evens = values * k + c
+            odds = tf.bitwise.right_shift(evens, self.trailing_zeros(evens))
+            retired = tf.logical_and(
+                stepping, tf.logical_or(odds < starts, tf.equal(odds, 1)))
+
+            values = tf.where(stepping, odds, values)
+            iterations = iterations + tf.cast(stepping, tf.int64)
+            status = tf.where(overflow, tf.constant(BLOCK_OVERFLOW, tf.int64), status)
+            status = tf.where(retired, tf.constant(BLOCK_RETIRED, tf.int64), status)
+            active = tf.logical_and(stepping, tf.logical_not(retired))
+
+            return iteration + 1, values, iterations, status, active
+
+        loop_vars = (
+            tf.constant(0, tf.int64),
+            values,
+            tf.zeros_like(values),
+            tf.fill(tf.shape(values), tf.constant(BLOCK_EXHAUSTED, tf.int64)),
+            tf.ones_like(values, dtype=tf.bool))
+
+        _, values, iterations, status, _ = tf.while_loop(condition, body, loop_vars)
+        return values, iterations, status
+
+    def _to_int64_tensor(self, numbers):
+        """
+        This method converts a sequence of integers into a tensor with int64 values.
+
+        :param numbers: The integers as tensor, array or list.
+        :return: The integers as int64 tensor.
+        """
+        if isinstance(numbers, self._tf.Tensor):
+            return self._tf.cast(numbers, self._tf.int64)
+        return self._tf.constant(np.asarray(numbers, dtype=np.int64))
+
+
+# Available backends
+_BACKEND_TYPES = {
+    NumpyBackend.name: NumpyBackend,
+    TensorflowBackend.name: TensorflowBackend,
+    "tensorflow_compiled": partial(TensorflowBackend, compiled=True),
+    "tensorflow_xla": partial(TensorflowBackend, jit_compile=True)
+}
+
+_backend_cache = {}
+_current_backend = None
+
+
+def get_backend(backend=None):
+    """
+    This function returns a backend of this module.
+
+    :param backend: The name of the backend ("numpy", "tensorflow", "tensorflow_compiled"
+        or "tensorflow_xla"), a backend object or None. If None is handed over, the
+        currently selected backend is returned.
+    :return: The backend as an instance of AbstractBackend.
+    """
+    if backend is None:
+        backend = _current_backend or NumpyBackend.name
+
+    if isinstance(backend, AbstractBackend):
+        return backend
+
+    if backend not in _BACKEND_TYPES:
+        raise ValueError("Unknown backend: " + str(backend))
+
+    if backend not in _backend_cache:
+        _backend_cache[backend] = _BACKEND_TYPES[backend]()
+
+    return _backend_cache[backend]
+
+
+def set_backend(backend):
+    """
+    This function selects the backend that is used by default for all functions
+    of this module.
+
+    :param backend: The name of the backend ("numpy" or "tensorflow") or a backend object.
+    :return: The selected backend.
+    """
+    # pylint: disable=global-statement
+    # The backend is a module wide setting
+    global _current_backend
+    _current_backend = get_backend(backend)
+    return _current_backend
 
 
 # pylint: disable=C0103
 # A single character for k and c is ok
-def next_even_collatz_numbers(odd_numbers, k=3, c=1):
+def next_even_collatz_numbers(odd_numbers, k=3, c=1, backend=None):
     """
-    This function calculates a tensor with even Collatz numbers from
-    a tensor with odd Collatz numbers.
+    This function calculates an array with even Collatz numbers from
+    an array with odd Collatz numbers.
 
-    :param odd_numbers: A tensor with odd Collatz integers.
+    :param odd_numbers: An array (or tensor) with odd Collatz integers.
     :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
     :param c: The summand by which odd numbers in the sequence are increased (default is 1).
-    :return: A tensor with the even Collatz integers.
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: An array (or tensor) with the even Collatz integers.
     """
-    return tf.add(tf.multiply(odd_numbers, k), c)
+    return get_backend(backend).next_even_collatz_numbers(odd_numbers, k, c)
 
 
-def next_odd_collatz_numbers(even_numbers):
+def checked_next_even_collatz_numbers(odd_numbers, k=3, c=1, backend=None):
     """
-    This function calculates a tensor with odd Collatz numbers from
-    a tensor with even Collatz numbers.
+    This function calculates an array with even Collatz numbers from
+    an array with odd Collatz numbers. In contrast to *next_even_collatz_numbers*, a
+    boolean mask is returned in addition, which marks the values where *kv+c* overflows
+    int64. These values must be processed with Python ints instead.
 
-    :param even_numbers: A tensor with even Collatz integers.
-    :return: A tensor with the odd Collatz integers.
+    :param odd_numbers: An array (or tensor) with odd Collatz integers.
+    :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+    :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: A tuple with the array (or tensor) of even Collatz integers and the
+        overflow mask.
     """
-    tz = trailing_zeros(even_numbers)
-    next_odd = tf.math.floordiv(even_numbers, tf.pow(2, tz))
-    return next_odd
+    return get_backend(backend).checked_next_even_collatz_numbers(odd_numbers, k, c)
 
 
-def trailing_zeros(numbers):
+def overflow_bounds(k=3, c=1):
     """
-    This function returns a tensor with the trailing zeros
-    of the binary representation of a tensor with integers.
+    This function returns the range of values v for which *kv+c* fits into int64.
 
-    :param numbers: The tensor with integers.
-    :return: A tensor with the trailing zeros of the binary representation of the ints.
+    :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+    :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+    :return: A tuple with the lowest and the highest value as int. Both bounds
+        are inclusive.
     """
-    if tf.size(numbers) > 0:
-        tz = tf.bitwise.bitwise_and(numbers, tf.multiply(numbers, -1))
-        tz = tf.cast(tf.experimental.numpy.log2(tz), tf.int64)
+    if k > 0:
+        lower, upper = -((c - INT64_MIN) // k), (INT64_MAX - c) // k
+    elif k < 0:
+        lower, upper = -((INT64_MAX - c) // -k), (c - INT64_MIN) // -k
+    elif INT64_MIN <= c <= INT64_MAX:
+        lower, upper = INT64_MIN, INT64_MAX
     else:
-        tz = numbers
+        lower, upper = INT64_MAX, INT64_MIN
+
+    return max(lower, INT64_MIN), min(upper, INT64_MAX)
+
+
+def next_odd_collatz_numbers(even_numbers, backend=None):
+    """
+    This function calculates an array with odd Collatz numbers from
+    an array with even Collatz numbers.
+
+    :param even_numbers: An array (or tensor) with even Collatz integers.
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: An array (or tensor) with the odd Collatz integers.
+    """
+    return get_backend(backend).next_odd_collatz_numbers(even_numbers)
+
+
+def trailing_zeros(numbers, backend=None):
+    """
+    This function returns an array with the trailing zeros
+    of the binary representation of an array with integers.
+
+    :param numbers: The array (or tensor) with integers.
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: An array (or tensor) with the trailing zeros of the binary representation
+        of the ints.
+    """
+    return get_backend(backend).trailing_zeros(numbers)
+
+
+def bit_length(numbers):
+    """
+    This function returns the number of bits that are required to represent
+    non-negative integers in binary. The calculation is exact and does not use
+    floating point numbers.
+
+    :param numbers: An array with non-negative integers.
+    :return: An array with the bit lengths. The bit length of zero is zero.
+    """
+    numbers = _to_int64_array(numbers)
+    result = np.zeros(numbers.shape, dtype=np.int64)
+
+    # Binary search for the highest set bit
+    for shift in (32, 16, 8, 4, 2, 1):
+        higher = np.right_shift(numbers, result + shift) > 0
+        result = result + np.where(higher, shift, 0)
+
+    return result + (numbers > 0)
+
+
+def to_limbs(numbers):
+    """
+    This function converts non-negative integers into the two limb representation,
+    which consists of an array with the upper and an array with the lower 64 bits.
+
+    :param numbers: The integers as array or list. The values must be in the
+        range [0, 2**128).
+    :return: A tuple with the upper and the lower limbs as uint64 arrays.
+    """
+    if isinstance(numbers, np.ndarray) and numbers.dtype.kind in "iu":
+        lo = numbers.astype(np.uint64)
+        return np.zeros(lo.shape, dtype=np.uint64), lo
+
+    numbers = [int(n) for n in numbers]
+    hi = np.array([n >> 64 for n in numbers], dtype=np.uint64)
+    lo = np.array([n & _UINT64_MAX for n in numbers], dtype=np.uint64)
+    return hi, lo
+
+
+def from_limbs(hi, lo):
+    """
+    This function converts numbers in the two limb representation into Python ints.
+
+    :param hi: An array with the upper 64 bits.
+    :param lo: An array with the lower 64 bits.
+    :return: The numbers as list of ints.
+    """
+    return [(int(h) << 64) | int(l) for h, l in zip(hi, lo)]
+
+
+# pylint: disable=C0103
+# A single character for k and c is ok
+def next_even_collatz_limbs(hi, lo, k=3, c=1):
+    """
+    This function calculates the even Collatz numbers *kv+c* for odd Collatz numbers in
+    the two limb representation. The carry of the lower limb is propagated to the
+    upper limb.
+
+    :param hi: An array with the upper 64 bits of the odd Collatz numbers.
+    :param lo: An array with the lower 64 bits of the odd Collatz numbers.
+    :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+        The factor must be in the range [1, 2**32).
+    :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+        The summand must be in the range [0, 2**64).
+    :return: A tuple with the upper limbs, the lower limbs and a boolean mask of the
+        values that overflow 128 bits. The limbs are not valid where the mask is True.
+    """
+    if not 0 < k < 2**32 or not 0 <= c <= _UINT64_MAX:
+        raise ValueError("Unsupported values for k and c: " + str((k, c)))
+
+    hi, lo = np.asarray(hi, dtype=np.uint64), np.asarray(lo, dtype=np.uint64)
+    factor = np.uint64(k)
+
+    # Multiply the lower limb in two halves of 32 bits to keep all carries
+    low_product = np.bitwise_and(lo, _LOW_BITS_32) * factor
+    high_product = np.right_shift(lo, _SHIFT_32) * factor
+
+    new_lo = low_product + np.left_shift(high_product, _SHIFT_32)
+    carry = (new_lo < low_product).astype(np.uint64)
+
+    summed_lo = new_lo + np.uint64(c)
+    carry = carry + (summed_lo < new_lo)
+
+    # Multiply the upper limb and add the carry
+    overflow = hi > np.uint64(_UINT64_MAX // k)
+    product_hi = hi * factor
+    new_hi = product_hi + np.right_shift(high_product, _SHIFT_32) + carry
+    overflow = overflow | (new_hi < product_hi)
+
+    return new_hi, summed_lo, overflow
+
+
+def next_odd_collatz_limbs(hi, lo):
+    """
+    This function calculates the odd Collatz numbers for even Collatz numbers in the
+    two limb representation.
+
+    :param hi: An array with the upper 64 bits of the even Collatz numbers.
+    :param lo: An array with the lower 64 bits of the even Collatz numbers.
+    :return: A tuple with the upper and the lower limbs of the odd Collatz numbers.
+    """
+    return right_shift_limbs(hi, lo, trailing_zeros_limbs(hi, lo))
+
+
+def trailing_zeros_limbs(hi, lo):
+    """
+    This function returns the trailing zeros of the binary representation of integers
+    in the two limb representation.
+
+    :param hi: An array with the upper 64 bits.
+    :param lo: An array with the lower 64 bits.
+    :return: An array with the trailing zeros. The trailing zeros of zero are 128.
+    """
+    hi, lo = np.asarray(hi, dtype=np.uint64), np.asarray(lo, dtype=np.uint64)
+    numpy_backend = get_backend(NumpyBackend.name)
+
+    tz_lo = numpy_backend.trailing_zeros(lo.view(np.int64))
+    tz_hi = numpy_backend.trailing_zeros(hi.view(np.int64))
+    return np.where(lo != 0, tz_lo, 64 + tz_hi)
+
+
+def right_shift_limbs(hi, lo, shift):
+    """
+    This function shifts integers in the two limb representation to the right. The
+    bits that are shifted out of the upper limb are moved into the lower limb.
+
+    :param hi: An array with the upper 64 bits.
+    :param lo: An array with the lower 64 bits.
+    :param shift: An array with the number of bits to shift in the range [0, 128].
+    :return: A tuple with the upper and the lower limbs of the shifted numbers.
+    """
+    hi, lo = np.asarray(hi, dtype=np.uint64), np.asarray(lo, dtype=np.uint64)
+    shift = np.asarray(shift).astype(np.uint64)
+
+    # Shifts by 64 bits or more are not defined for uint64
+    small = shift < _SHIFT_64
+    small_shift = np.where(small, shift, 0).astype(np.uint64)
+    large_shift = np.where(small, 0, np.minimum(shift - _SHIFT_64, _SHIFT_63)).astype(np.uint64)
+
+    moved_bits = np.left_shift(hi, (_SHIFT_64 - small_shift) % _SHIFT_64)
+    moved_bits = np.where(small_shift == 0, np.uint64(0), moved_bits)
+
+    new_lo = np.where(
+        small, np.right_shift(lo, small_shift) | moved_bits, np.right_shift(hi, large_shift))
+    new_hi = np.where(small, np.right_shift(hi, small_shift), np.uint64(0))
+    new_lo = np.where(shift >= 2 * _SHIFT_64, np.uint64(0), new_lo)
+
+    return new_hi, new_lo
+
+
+def bit_length_limbs(hi, lo):
+    """
+    This function returns the number of bits that are required to represent
+    integers in the two limb representation.
+
+    :param hi: An array with the upper 64 bits.
+    :param lo: An array with the lower 64 bits.
+    :return: An array with the bit lengths.
+    """
+    hi, lo = np.asarray(hi, dtype=np.uint64), np.asarray(lo, dtype=np.uint64)
+    return np.where(hi != 0, 64 + _bit_length_uint64(hi), _bit_length_uint64(lo))
+
+
+def _bit_length_uint64(numbers):
+    """
+    This function returns the bit lengths of uint64 values.
+
+    :param numbers: An array with uint64 values.
+    :return: An array with the bit lengths.
+    """
+    top_bit = np.right_shift(numbers, _SHIFT_63) != 0
+    lower_bits = np.bitwise_and(numbers, np.uint64(INT64_MAX)).view(np.int64)
+    return np.where(top_bit, 64, bit_length(lower_bits))
+
+
+def _to_int64_array(numbers):
+    """
+    This function converts a sequence of integers into a numpy array with int64 values.
+
+    :param numbers: The integers as array, tensor or list.
+    :return: The integers as int64 array.
+    """
+    return np.asarray(numbers, dtype=np.int64)
+
+
+def validate_block(start_value, stop_value, k=3, c=1, max_iterations=-1, backend=None):
+    """
+    This function validates the Collatz sequences of all odd start values in the range
+    [start_value, stop_value). A sequence is considered valid as soon as it drops below
+    its start value or reaches one. Hence, if all blocks up to a certain value have been
+    validated, all sequences up to this value end with one. Even start values are not
+    processed, because they drop below their start value with the first step.
+
+    The values of a sequence are retired from the calculation as soon as the sequence
+    is valid. Values that would overflow int64 are continued in the two limb
+    representation. Only values that would also overflow 128 bits are validated with
+    Python ints.
+
+    :param start_value: The first value of the block (inclusive).
+    :param stop_value: The last value of the block (exclusive).
+    :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+    :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+    :param max_iterations: The maximum number of odd steps performed for a sequence before
+        it is considered as failed. Default is -1, which means that the number of
+        iterations is not limited.
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: A tuple with the maximum number of odd steps of a sequence, the number
+        of sequences that have been validated with Python ints and an array with the
+        start values of the failed sequences.
+    """
+    backend = get_backend(backend)
+
+    starts = np.arange(start_value | 1, stop_value, 2, dtype=np.int64)
+    values, iterations, status = backend.iterate_block(starts, k, c, max_iterations)
+
+    max_steps = int(iterations[status == BLOCK_RETIRED].max(initial=0))
+    failed = list(starts[status == BLOCK_EXHAUSTED])
+    big_int_count = 0
+
+    # Overflowing sequences are continued with two limbs
+    overflow = status == BLOCK_OVERFLOW
+
+    if overflow.any():
+        limb_steps, big_int_count, limb_failed = _validate_limbs(
+            values[overflow], starts[overflow], iterations[overflow], k, c, max_iterations)
+        max_steps = max(max_steps, limb_steps)
+        failed.extend(limb_failed)
+
+    return max_steps, big_int_count, np.array(sorted(failed), dtype=np.int64)
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+# The state of the sequences is handed over explicitly
+def _validate_limbs(values, starts, iterations, k, c, max_iterations):
+    """
+    This function continues the validation of Collatz sequences in the two limb
+    representation. Sequences that overflow 128 bits are validated with Python ints.
+
+    :param values: An array with the current odd values of the sequences.
+    :param starts: An array with the start values of the sequences.
+    :param iterations: An array with the number of odd steps already performed.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :return: A tuple with the maximum number of odd steps, the number of sequences
+        validated with Python ints and a list with the start values of the failed sequences.
+    """
+    max_steps = 0
+    big_int_count = 0
+    failed = []
+
+    # Two limbs are only supported for certain factors and summands
+    if not _limbs_supported(k, c):
+        for value, start, iteration in zip(values, starts, iterations):
+            steps = _validate_big_int(
+                int(value), int(start), k, c, max_iterations, int(iteration))
+            big_int_count = big_int_count + 1
+
+            if steps is None:
+                failed.append(start)
+            else:
+                max_steps = max(max_steps, steps)
+
+        return max_steps, big_int_count, failed
+
+    hi, lo = to_limbs(values)
+    limits = starts.astype(np.uint64)
+
+    while lo.size > 0:
+        if max_iterations > -1:
+            exhausted = iterations >= max_iterations
+            failed.extend(starts[exhausted])
+            hi, lo, limits, starts, iterations = _compact(
+                ~exhausted, hi, lo, limits, starts, iterations)
+
+        next_hi, next_lo, overflow = next_even_collatz_limbs(hi, lo, k, c)
+
+        # Continue sequences that overflow 128 bits with Python ints
+        if overflow.any():
+            big_values = from_limbs(hi[overflow], lo[overflow])
+
+            for value, start, iteration in zip(
+                    big_values, starts[overflow], iterations[overflow]):
+                steps = _validate_big_int(
+                    value, int(start), k, c, max_iterations, int(iteration))
+                big_int_count = big_int_count + 1
+
+                if steps is None:
+                    failed.append(start)
+                else:
+                    max_steps = max(max_steps, steps)
+
+            next_hi, next_lo, limits, starts, iterations = _compact(
+                ~overflow, next_hi, next_lo, limits, starts, iterations)
+
+        hi, lo = next_odd_collatz_limbs(next_hi, next_lo)
+        iterations = iterations + 1
+
+        # Retire the valid sequences
+        active = (hi != 0) | ((lo >= limits) & (lo != 1))
+
+        if not active.all():
+            max_steps = max(max_steps, int(iterations[~active].max()))
+            hi, lo, limits, starts, iterations = _compact(
+                active, hi, lo, limits, starts, iterations)
+
+    return max_steps, big_int_count, failed
+
+
+def _limbs_supported(k, c):
+    """
+    This function checks if the two limb representation supports a factor and a summand.
+
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :return: True if the two limb representation supports k and c.
+    """
+    return 0 < k < 2**32 and 0 <= c <= _UINT64_MAX
+
+
+def _compact(mask, *arrays):
+    """
+    This function removes the elements that are not selected by a mask from arrays.
+
+    :param mask: The boolean mask.
+    :param arrays: The arrays.
+    :return: A tuple with the compacted arrays.
+    """
+    return tuple(array[mask] for array in arrays)
+
+
+def _validate_big_int(odd_number, start_value, k, c, max_iterations, iterations):
+    """
+    This function continues the validation of a single Collatz sequence with Python ints.
+
+    :param odd_number: The current odd number of the sequence as int.
+    :param start_value: The start value of the sequence as int.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :param iterations: The number of odd steps that have already been performed.
+    :return: The total number of odd steps or None if the sequence is not valid
+        after the maximum number of iterations.
+    """
+    while True:
+        if -1 < max_iterations <= iterations:
+            return None
+
+        odd_number = commons.next_odd_collatz_number(odd_number, k, c)
+        iterations = iterations + 1
+
+        if odd_number < start_value or odd_number == 1:
+            return iterations
+
+
+def block_statistics(start_value, stop_value, k=3, c=1, max_iterations=-1,
+                     table_size=2**20, backend=None):
+    """
+    This function calculates statistics on the Collatz sequences of all odd start values
+    in the range [start_value, stop_value). In contrast to *validate_block*, every sequence
+    is followed until it reaches one. To keep this fast, the statistics of all odd values
+    below *table_size* are precomputed once per process. As soon as a sequence drops below
+    this limit, the remaining statistics are looked up.
+
+    The following statistics are returned for every start value *v_1*:
+
+    - odd_steps: The number of odd steps (kv+c) until the sequence reaches one.
+    - steps: The total number of steps, including the divisions by two.
+    - peak: The highest value of the sequence or -1 if it does not fit into int64.
+    - peak_bits: The bit length of the highest value.
+
+    Like in *validate_block*, sequences that overflow int64 are continued in the
+    two limb representation and only sequences that overflow 128 bits with Python ints.
+
+    All statistics of a sequence that does not reach one within *max_iterations* odd
+    steps are set to -1.
+
+    :param start_value: The first value of the block (inclusive).
+    :param stop_value: The last value of the block (exclusive).
+    :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+    :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+    :param max_iterations: The maximum number of odd steps performed for a sequence
+        before it is considered as failed. Default is -1, which means that the number
+        of iterations is not limited.
+    :param table_size: The limit below which the statistics are precomputed
+        (default is 2**20).
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: A dict with the columns in STATISTICS_COLUMNS as int64 arrays.
+    """
+    backend = get_backend(backend)
+    table = _statistics_table(table_size, k, c, max_iterations, backend)
+
+    starts = np.arange(start_value | 1, stop_value, 2, dtype=np.int64)
+    return _trajectory_statistics(starts, k, c, max_iterations, backend, table)
+
+
+def _statistics_table(table_size, k, c, max_iterations, backend):
+    """
+    This function returns the statistics of all odd values below a certain limit. The
+    table is calculated in chunks of increasing size, each of which looks up the
+    statistics of the previous chunks. The result is cached per process.
+
+    :param table_size: The limit below which the statistics are calculated.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :param backend: The backend to use.
+    :return: The statistics as dict or None if the table is empty. The statistics of
+        the odd value v are stored at index v // 2.
+    """
+    key = (table_size, k, c, max_iterations)
+
+    if key not in _statistics_tables:
+        table = None
+        limit = 1
+
+        while limit < table_size:
+            stop = min(max(2 * limit, 2**10), table_size)
+            starts = np.arange(limit | 1, stop, 2, dtype=np.int64)
+            chunk = _trajectory_statistics(starts, k, c, max_iterations, backend, table)
+
+            if table is None:
+                table = chunk
+            else:
+                table = {name: np.concatenate((table[name], chunk[name])) for name in table}
+            limit = stop
+
+        _statistics_tables[key] = table
+
+    return _statistics_tables[key]
+
+
+def _trajectory_statistics(starts, k, c, max_iterations, backend, table):
+    """
+    This function calculates the statistics of the Collatz sequences of odd start values.
+    A sequence is followed until it reaches one or a value that is stored in the table.
+
+    :param starts: An array with odd start values.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :param backend: The backend to use.
+    :param table: The precomputed statistics or None.
+    :return: The statistics as dict.
+    """
+    stats = {
+        "v_1": starts,
+        "odd_steps": np.zeros(starts.size, dtype=np.int64),
+        "steps": np.zeros(starts.size, dtype=np.int64),
+        "peak": starts.copy(),
+        # The bit lengths are only tracked for peaks that do not fit into int64
+        "peak_bits": np.zeros(starts.size, dtype=np.int64)
+    }
+
+    limit = 0 if table is None else 2 * table["v_1"].size
+    lanes = np.arange(starts.size)
+    values = starts
+    iterations = 0
+    overflows = []
+
+    while True:
+        # Retire the sequences that reached one or the table
+        finished = (values == 1) | (values < limit)
+
+        if finished.any():
+            _merge_statistics(
+                stats, lanes[finished], values[finished], max_iterations, table, limit)
+            values = values[~finished]
+            lanes = lanes[~finished]
+
+        if values.size == 0:
+            break
+
+        if -1 < max_iterations <= iterations:
+            _fail_statistics(stats, lanes)
+            break
+
+        evens, overflow = backend.checked_next_even_collatz_numbers(values, k, c)
+        evens, overflow = np.asarray(evens), np.asarray(overflow)
+
+        # Overflowing sequences are continued separately
+        if overflow.any():
+            overflows.append((values[overflow], lanes[overflow], iterations))
+            evens = evens[~overflow]
+            lanes = lanes[~overflow]
+
+        tz = np.asarray(backend.trailing_zeros(evens))
+        stats["peak"][lanes] = np.maximum(stats["peak"][lanes], evens)
+        stats["odd_steps"][lanes] += 1
+        stats["steps"][lanes] += 1 + tz
+
+        values = np.right_shift(evens, tz)
+        iterations = iterations + 1
+
+    if len(overflows) > 0:
+        values = np.concatenate([item[0] for item in overflows])
+        lanes = np.concatenate([item[1] for item in overflows])
+        iterations = np.concatenate(
+            [np.full(item[0].size, item[2], dtype=np.int64) for item in overflows])
+        _limb_statistics(stats, lanes, values, iterations, k, c, max_iterations, table, limit)
+
+    peak = stats["peak"]
+    stats["peak_bits"] = np.where(peak >= 0, bit_length(np.maximum(peak, 0)), stats["peak_bits"])
+    return stats
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+# The state of the sequences is handed over explicitly
+def _limb_statistics(stats, lanes, values, iterations, k, c, max_iterations, table, limit):
+    """
+    This function continues the statistics of Collatz sequences in the two limb
+    representation. Sequences that overflow 128 bits are continued with Python ints.
+
+    :param stats: The statistics of the sequences as dict.
+    :param lanes: An array with the indices of the sequences.
+    :param values: An array with the current odd values of the sequences.
+    :param iterations: An array with the number of odd steps already performed.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :param table: The precomputed statistics or None.
+    :param limit: The limit below which the values are stored in the table.
+    :return: None.
+    """
+    # Two limbs are only supported for certain factors and summands
+    if not _limbs_supported(k, c):
+        for value, lane, iteration in zip(values, lanes, iterations):
+            _big_int_statistics(
+                stats, int(lane), int(value), k, c, max_iterations, int(iteration),
+                table, limit, int(stats["peak"][lane]))
+        return
+
+    hi, lo = to_limbs(values)
+    peak_hi, peak_lo = to_limbs(stats["peak"][lanes])
+    limit = np.uint64(limit)
+
+    while lo.size > 0:
+        if max_iterations > -1:
+            exhausted = iterations >= max_iterations
+            _fail_statistics(stats, lanes[exhausted])
+            hi, lo, peak_hi, peak_lo, lanes, iterations = _compact(
+                ~exhausted, hi, lo, peak_hi, peak_lo, lanes, iterations)
+
+        next_hi, next_lo, overflow = next_even_collatz_limbs(hi, lo, k, c)
+
+        # Continue sequences that overflow 128 bits with Python ints
+        if overflow.any():
+            big_values = from_limbs(hi[overflow], lo[overflow])
+            big_peaks = from_limbs(peak_hi[overflow], peak_lo[overflow])
+
+            for value, peak, lane, iteration in zip(
+                    big_values, big_peaks, lanes[overflow], iterations[overflow]):
+                _big_int_statistics(
+                    stats, int(lane), value, k, c, max_iterations, int(iteration),
+                    table, int(limit), peak)
+
+            next_hi, next_lo, peak_hi, peak_lo, lanes, iterations = _compact(
+                ~overflow, next_hi, next_lo, peak_hi, peak_lo, lanes, iterations)
+
+        higher = (next_hi > peak_hi) | ((next_hi == peak_hi) & (next_lo > peak_lo))
+        peak_hi = np.where(higher, next_hi, peak_hi)
+        peak_lo = np.where(higher, next_lo, peak_lo)
+
+        tz = trailing_zeros_limbs(next_hi, next_lo)
+        stats["odd_steps"][lanes] += 1
+        stats["steps"][lanes] += 1 + tz
+
+        hi, lo = right_shift_limbs(next_hi, next_lo, tz)
+        iterations = iterations + 1
+
+        # Retire the sequences that reached one or the table
+        finished = (hi == 0) & ((lo == 1) | (lo < limit))
+
+        if finished.any():
+            finished_lanes = lanes[finished]
+            stats["peak"][finished_lanes] = -1
+            stats["peak_bits"][finished_lanes] = bit_length_limbs(
+                peak_hi[finished], peak_lo[finished])
+            _merge_statistics(stats, finished_lanes, lo[finished].astype(np.int64),
+                              max_iterations, table, int(limit))
+
+            hi, lo, peak_hi, peak_lo, lanes, iterations = _compact(
+                ~finished, hi, lo, peak_hi, peak_lo, lanes, iterations)
+
+
+def _merge_statistics(stats, lanes, values, max_iterations, table, limit):
+    """
+    This function adds the precomputed statistics of the current values to the
+    statistics of the sequences. Sequences whose odd steps exceed *max_iterations* in
+    total are marked as failed.
+
+    :param stats: The statistics of the sequences as dict.
+    :param lanes: The indices of the sequences.
+    :param values: The current odd values of the sequences.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :param table: The precomputed statistics or None.
+    :param limit: The limit below which the values are stored in the table.
+    :return: None.
+    """
+    in_table = values < limit
+    lanes = lanes[in_table]
+    index = values[in_table] // 2
+
+    if lanes.size == 0:
+        return
+
+    failed = table["odd_steps"][index] < 0
+    stats["odd_steps"][lanes] += table["odd_steps"][index]
+    stats["steps"][lanes] += table["steps"][index]
+
+    # The looked up steps count towards the budget of the sequence
+    if max_iterations > -1:
+        failed = failed | (stats["odd_steps"][lanes] > max_iterations)
+
+    # Peaks that do not fit into int64 are marked with -1
+    table_peak = table["peak"][index]
+    huge = (table_peak < 0) | (stats["peak"][lanes] < 0)
+    stats["peak_bits"][lanes] = np.maximum(
+        stats["peak_bits"][lanes], np.where(table_peak < 0, table["peak_bits"][index], 0))
+    stats["peak"][lanes] = np.where(
+        huge, -1, np.maximum(stats["peak"][lanes], table_peak))
+
+    _fail_statistics(stats, lanes[failed])
+
+
+def _fail_statistics(stats, lanes):
+    """
+    This function marks the statistics of failed sequences with -1.
+
+    :param stats: The statistics of the sequences as dict.
+    :param lanes: The indices of the failed sequences.
+    :return: None.
+    """
+    for name in STATISTICS_COLUMNS[1:]:
+        stats[name][lanes] = -1
+
+
+# pylint: disable=too-many-arguments
+# The state of the sequence is handed over explicitly
+def _big_int_statistics(stats, lane, odd_number, k, c, max_iterations, iterations,
+                        table, limit, peak):
+    """
+    This function continues the statistics of a single Collatz sequence with Python ints.
+
+    :param stats: The statistics of the sequences as dict.
+    :param lane: The index of the sequence.
+    :param odd_number: The current odd number of the sequence as int.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param max_iterations: The maximum number of odd steps or -1.
+    :param iterations: The number of odd steps that have already been performed.
+    :param table: The precomputed statistics or None.
+    :param limit: The limit below which the values are stored in the table.
+    :param peak: The highest value of the sequence so far as int.
+    :return: None.
+    """
+    while True:
+        if -1 < max_iterations <= iterations:
+            _fail_statistics(stats, [lane])
+            return
+
+        even_number = odd_number * k + c
+        tz = commons.trailing_zeros(even_number)
+        peak = max(peak, even_number)
+        odd_number = even_number >> tz
+
+        stats["odd_steps"][lane] += 1
+        stats["steps"][lane] += 1 + tz
+        iterations = iterations + 1
+
+        if odd_number == 1 or odd_number < limit:
+            break
+
+    if peak > INT64_MAX:
+        stats["peak"][lane] = -1
+        stats["peak_bits"][lane] = peak.bit_length()
+    else:
+        stats["peak"][lane] = peak
+
+    _merge_statistics(
+        stats, np.array([lane]), np.array([odd_number]), max_iterations, table, limit)
+
+
+def classify_block(start_value, stop_value, k=3, c=1, max_iterations=-1,
+                   max_value=None, backend=None):
+    """
+    This function classifies the Collatz sequences of all odd start values in the range
+    [start_value, stop_value) for the generalised variant kv+c. Every sequence either
+    reaches one (CLASS_ONE), enters a cycle that does not contain one (CLASS_CYCLE) or
+    exceeds a bound (CLASS_BOUND) before one of the former happens. A sequence exceeds
+    the bound if a value is greater than *max_value*, if the successor of a value does
+    not fit into int64 or if the sequence does not terminate within *max_iterations*
+    odd steps.
+
+    Cycles are detected with the algorithm of Brent. The tortoise and the hare of
+    every sequence are held in parallel arrays, so that all sequences are processed
+    together. Terminated sequences are retired from the calculation. A cycle is
+    identified by its smallest odd number. For *k=5* and *c=1*, the start value 7 enters,
+    for example, the cycle 13, 33, 83.
+
+    The following columns are returned for every start value *v_1*:
+
+    - class: The class of the sequence (CLASS_ONE, CLASS_CYCLE or CLASS_BOUND).
+    - cycle_min: The smallest odd number of the cycle or -1.
+    - cycle_length: The number of odd numbers in the cycle or -1.
+    - odd_steps: The number of odd steps performed until the sequence was classified.
+      For sequences that reach one, this is the number of odd steps until one.
+
+    :param start_value: The first value of the block (inclusive).
+    :param stop_value: The last value of the block (exclusive).
+    :param k: The factor by which odd numbers are multiplied in the sequence (default is 3).
+    :param c: The summand by which odd numbers in the sequence are increased (default is 1).
+    :param max_iterations: The maximum number of odd steps performed for a sequence.
+        Default is -1, which means that the number of iterations is not limited.
+    :param max_value: The highest value a sequence may reach or None (default), which means
+        that the values are only limited by the int64 data type.
+    :param backend: The backend to use or None for the currently selected backend.
+    :return: A dict with the columns in CLASSIFICATION_COLUMNS as int64 arrays.
+    """
+    backend = get_backend(backend)
+
+    starts = np.arange(start_value | 1, stop_value, 2, dtype=np.int64)
+    result = {
+        "v_1": starts,
+        "class": np.full(starts.size, CLASS_ONE, dtype=np.int64),
+        "cycle_min": np.full(starts.size, -1, dtype=np.int64),
+        "cycle_length": np.full(starts.size, -1, dtype=np.int64),
+        "odd_steps": np.zeros(starts.size, dtype=np.int64)
+    }
+
+    # State of the algorithm of Brent: the tortoise waits at the hare whenever the
+    # number of steps since the last jump reaches the next power of two
+    active = starts != 1
+    lanes, tortoise, hare = _compact(active, np.arange(starts.size), starts, starts)
+    power = np.ones(lanes.size, dtype=np.int64)
+    distance = np.zeros(lanes.size, dtype=np.int64)
+    iterations = 0
+
+    while lanes.size > 0:
+        if -1 < max_iterations <= iterations:
+            result["class"][lanes] = CLASS_BOUND
+            result["odd_steps"][lanes] = iterations
+            break
+
+        evens, overflow = backend.checked_next_even_collatz_numbers(hare, k, c)
+        evens, overflow = np.asarray(evens), np.asarray(overflow)
+        hare = np.where(overflow, hare, np.asarray(backend.next_odd_collatz_numbers(evens)))
+        iterations = iterations + 1
+        distance = distance + 1
+
+        bound = overflow if max_value is None else overflow | (hare > max_value)
+        one = ~bound & (hare == 1)
+        cycle = ~bound & ~one & (hare == tortoise)
+        done = bound | one | cycle
+
+        result["class"][lanes[bound]] = CLASS_BOUND
+        result["class"][lanes[cycle]] = CLASS_CYCLE
+        result["cycle_length"][lanes[cycle]] = distance[cycle]
+        result["cycle_min"][lanes[cycle]] = _cycle_min(
+            hare[cycle], distance[cycle], k, c, backend)
+        result["odd_steps"][lanes[done]] = iterations - overflow[done]
+
+        jump = distance == power
+        tortoise = np.where(jump, hare, tortoise)
+        power = np.where(jump, power * 2, power)
+        distance = np.where(jump, 0, distance)
+
+        lanes, tortoise, hare, power, distance = _compact(
+            ~done, lanes, tortoise, hare, power, distance)
+
+    return result
+
+
+def _cycle_min(values, lengths, k, c, backend):
+    """
+    This function determines the smallest odd number of cycles.
+
+    :param values: An array with an odd number of every cycle.
+    :param lengths: An array with the number of odd numbers in every cycle.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :param backend: The backend to use.
+    :return: An int64 array with the smallest odd number of every cycle.
+    """
+    minimum = values.copy()
+    lanes = np.arange(values.size)
+
+    for step in range(1, int(lengths.max(initial=0))):
+        values, lanes = _compact(lengths[lanes] > step, values, lanes)
+        values = np.asarray(backend.next_odd_collatz_numbers(
+            backend.next_even_collatz_numbers(values, k, c)))
+        minimum[lanes] = np.minimum(minimum[lanes], values)
 
-    return tz
+    return minimum
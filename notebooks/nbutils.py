@@ -1,16 +1,60 @@
 """
 This module provides utility functions for the notebooks of
 the Collatz library.
+
+The function *load_export* loads the csv exports of the project with explicit
+data types. The typed data frame is cached in a pickle file next to the csv file,
+so that later loads do not need to parse the csv file again.
 """
 
 # Imports
+import os
 import sys
 import random as rnd
+import numpy as np
 import pandas as pd
 
 # Fix possible import problems
 sys.path.append("..")
 
+# Data type of columns that may contain ints of arbitrary size
+BIG_INT = "bigint"
+
+# Data types of the columns of the exports
+BASIC_SCHEMA = {
+    "sequence_id": "int64", "sequence_len": "int64", "n": "int64", "k": "int64",
+    "x_1": BIG_INT, "x_i": BIG_INT, "x_i_odd": "bool", "x_i+": BIG_INT,
+    "x_i_log2": "float64", "x_i+_log2": "float64", "x_1_log2": "float64",
+    "terminal": "bool", "cycle": "bool"}
+
+ALPHA_SCHEMA = {
+    "sequence_id": "int64", "sequence_len": "int64", "n": "int64", "k": "int64",
+    "v_1": BIG_INT, "v_i": BIG_INT, "kv_i+1": BIG_INT, "v_i+": BIG_INT,
+    "v_max": BIG_INT, "v_n": BIG_INT,
+    "v_i_log2": "float64", "v_i+_log2": "float64", "kv_i+1_log2": "float64",
+    "v_i_mod4": "int64", "kv_i+1_mod4": "int64", "v_i+_mod4": "int64",
+    "v_1_bin": "str", "v_1_bin_len": "int64", "v_1_bin_lead": "int64",
+    "v_1_bin_trail": "int64", "v_1_bin_hex": "str",
+    "v_i_bin": "str", "v_i_bin_len": "int64", "v_i_bin_lead": "int64",
+    "v_i_bin_trail": "int64", "v_i_bin_hex": "str",
+    "terminal": "bool", "cycle": "bool",
+    "a_i": "int64", "a_i_max": "float64", "a": "int64", "a_cycle": "int64",
+    "a_max": "int64", "b_i": "float64", "b": "float64",
+    "bin_len": "int64", "next_bin_len": "int64",
+    "l_i": "int64", "l_i_min": "int64", "l_i_max": "int64", "l": "int64",
+    "l_min": "int64", "l_max": "int64",
+    "o_i": "int64", "o_i_max": "int64", "o": "int64", "o_max": "int64"}
+
+CYCLE_SCHEMA = {
+    "k": "int64", "c": "int64", "length": "int64", "v_1": BIG_INT, "values": "str"}
+
+# The schemas are chosen by the beginning of the file name
+SCHEMAS = {"basic_export": BASIC_SCHEMA, "alpha_export": ALPHA_SCHEMA,
+           "cycles": CYCLE_SCHEMA}
+
+# Suffix of the cache file
+CACHE_SUFFIX = ".pkl"
+
 
 def set_default_pd_options():
     """
@@ -58,3 +102,98 @@ def swap_column_names(column_names: tuple, data_frame: pd.DataFrame):
 
     data_frame[column_names[1]] = first_column
     data_frame[column_names[0]] = second_column
+
+
+def load_export(file_name: str, schema=None, columns=None, downcast=False, cache=True):
+    """
+    This function loads a csv export with explicit data types. Columns that may contain
+    ints of arbitrary size are converted to int64 if all values fit into int64 and to
+    Python ints otherwise. The typed data frame is cached in a pickle file with
+    the suffix CACHE_SUFFIX next to the csv file, together with the schema and the
+    downcast option. The cache is renewed as soon as the csv file is newer than the
+    cache or the frame is loaded with another schema or downcast option.
+
+    :param file_name: The path of the csv file.
+    :param schema: A dict that maps column names to data types, one of the keys of
+        SCHEMAS or None (default). If None is handed over, the schema is chosen by the
+        file name. Columns without a data type are inferred by pandas.
+    :param columns: The names of the columns to load or None (default). If None is
+        handed over, all columns are loaded.
+    :param downcast: If this parameter is True, int columns are downcast to the smallest
+        int type that holds their values (default is False). Arithmetic on downcast
+        columns may overflow silently, so it should only be used for columns that are
+        compared or plotted. Float columns are never downcast, since the theorems
+        compare them with a precision of nine decimals.
+    :param cache: If this parameter is True (default), the cache file is used.
+    :return: The pandas data frame.
+    """
+    schema = _get_schema(file_name, schema)
+    cache_file_name = file_name + CACHE_SUFFIX
+    cache_key = {"schema": schema, "downcast": downcast}
+    frame = None
+
+    if cache and os.path.exists(cache_file_name) and \
+            os.path.getmtime(cache_file_name) >= os.path.getmtime(file_name):
+        cached = pd.read_pickle(cache_file_name)
+        if cached["key"] == cache_key:
+            frame = cached["frame"]
+
+    if frame is None:
+        # Without cache, only the requested columns are parsed
+        use_columns = None if cache else columns
+        header = pd.read_csv(file_name, nrows=0, usecols=use_columns).columns
+        dtypes = {name: "str" if schema[name] == BIG_INT else schema[name]
+                  for name in header if name in schema}
+
+        frame = pd.read_csv(file_name, usecols=use_columns, dtype=dtypes)
+
+        for name in header:
+            if schema.get(name) == BIG_INT:
+                frame[name] = _to_ints(frame[name])
+
+            if downcast and frame[name].dtype == np.int64:
+                frame[name] = pd.to_numeric(frame[name], downcast="integer")
+
+        if cache:
+            pd.to_pickle({"key": cache_key, "frame": frame}, cache_file_name)
+
+    if columns is not None:
+        frame = frame[list(columns)]
+
+    return frame
+
+
+def _get_schema(file_name: str, schema):
+    """
+    This function returns the schema of an export.
+
+    :param file_name: The path of the csv file.
+    :param schema: A dict, a key of SCHEMAS or None (see *load_export*).
+    :return: The schema as dict.
+    """
+    if isinstance(schema, dict):
+        return schema
+
+    if schema is None:
+        base_name = os.path.basename(file_name)
+        schema = next((name for name in SCHEMAS if base_name.startswith(name)), None)
+
+        if schema is None:
+            return {}
+
+    return SCHEMAS[schema]
+
+
+def _to_ints(values):
+    """
+    This function converts a column of decimal strings into ints.
+
+    :param values: The strings as pandas series.
+    :return: An int64 numpy array, if all values fit into int64, and a numpy array
+        of Python ints with the data type object otherwise.
+    """
+    try:
+        return values.astype(np.int64).to_numpy()
+    except OverflowError:
+        ints = [int(value) for value in values]
+        return np.array(ints + [None], dtype=object)[:-1]
@@ -3,12 +3,97 @@ This program exports data on the alphas of Collatz sequences and related feature
 into a csv file. Only odd Collatz numbers are included. The sample is used
 to validate mathematical theorems and for the training of machine learning
 models.
+
+The sequences are generated in batches by a pool of worker processes. The features
+of all sequences of a batch are calculated at once. A single writer appends the
+batches to the file in the order of their sequence ids. The number of sequences
+per batch is defined by the option --b.
+
+The data is exported into a csv file or, if the option --format is set to parquet,
+into a parquet file with typed columns and one row group per batch. The parquet format
+requires the package pyarrow.
+
+Csv exports are resumable. Every batch is committed to a manifest next to the
+temp file as soon as it is written to disk. If the program is interrupted, the next
+run continues after the last committed batch. Csv files can be compressed
+with gzip, bz2 or xz, while the compression runs in a background thread.
+
+Next to a csv export, an index with the byte offset and the number of rows of every
+sequence is written to a file with the suffix .index. The function
+*collatz.export.read_sequences* uses the index to read single sequences without
+parsing the whole file.
+
+The parameters, a fingerprint of the sources, the number of rows and a hash of the
+content are written to a metadata file with the suffix .metadata. If the export is up
+to date, it is skipped. If only the k factors have changed, the sequences of the
+remaining k factors are taken over from an existing csv export.
+
+The binary representations of v_1 and v_i can be replaced by a compact encoding with
+the option --bin (see the function *collatz.export.binary_columns*), which is
+considerably smaller and faster for large start values.
+
+With the option --summary, a single row is exported per sequence. It contains the
+length, the total alpha, lambda and omega, the maximum and the final value and the
+terminal and cycle flags of the sequence.
+
+With the option --validate, the invariants of the theorem notebooks (e.g.
+a_i <= a_i_max, a <= a_max and l_min <= l <= l_max) are validated while the sequences
+are generated. Only the steps that violate an invariant are exported, and the
+number of violations per invariant is logged. Hence, ranges can be validated that
+are far too large to be exported.
+
+Examples
+--------
+>>> python run_alpha_export.py --k 3 5 --stop 99999 --m 200 --w 8
+>>> python run_alpha_export.py --format parquet --f "data/alpha_export.parquet"
+>>> python run_alpha_export.py --start 1000001 --stop 9999999 --bin compact --window 16
+>>> python run_alpha_export.py --k 3 --stop 99999999 --m -1 --summary
+>>> python run_alpha_export.py --k 1 3 5 7 --stop 9999999 --validate
 """
-import shutil
+import argparse
+import os
 import logging
 from math import log2
+import numpy as np
 import pandas as pd
 from collatz import commons
+from collatz import tensor
+from collatz.export import COMPRESSIONS, FILE_FORMATS, CSV_FORMAT
+from collatz.export import BINARY_COMPACT, BINARY_ENCODINGS, BINARY_FULL, DEFAULT_WINDOW_BITS
+from collatz.export import binary_columns, export_sequences, read_parquet, source_version
+
+
+# Global settings
+DATA_PATH = "data/"
+EXPORT_NAME = "alpha_export"
+DEFAULT_K_FACTORS = [1, 3, 5, 7, 9]
+DEFAULT_START_VALUE = 1
+DEFAULT_STOP_VALUE = 3999
+DEFAULT_STEP = 2
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_BATCH_SIZE = 1000
+
+# Key columns of the sequences in the index of a csv export
+INDEX_KEY_COLUMNS = ("sequence_id", "v_1", "k")
+
+# Columns that may contain ints, which do not fit into int64
+BIG_INT_COLUMNS = ("v_1", "v_i", "kv_i+1", "v_i+")
+SUMMARY_BIG_INT_COLUMNS = ("v_1", "v_max", "v_n")
+
+# Invariants that are validated with the option --validate
+INVARIANTS = {
+    "a_i_min": "a_i >= 1",
+    "a_i_max": "a_i <= a_i_max",
+    "a_min": "a >= n",
+    "a_max": "a <= a_max",
+    "a_max_bound": "a_max <= int(log2(v_1)) + l_max",
+    "l_i_min": "l_i >= l_i_min",
+    "l_i_max": "l_i <= l_i_max",
+    "l_min": "l >= l_min",
+    "l_max": "l <= l_max",
+    "o_i_max": "o_i <= o_i_max",
+    "o_max": "o <= o_max"}
+INVARIANT_PREFIX = "invalid_"
 
 
 def _generate_odd_sequence(sequence_id: int, start_value: int,
@@ -25,62 +110,113 @@ def _generate_odd_sequence(sequence_id: int, start_value: int,
         before the method exits.
     :return: The Collatz sequence as a pandas data frame.
     """
-    odds = commons.odd_collatz_sequence(start_value, k_factor, max_iterations=max_iterations)
-    next_odds = odds[1:]
-    odds.pop()
+    return _generate_odd_sequences(sequence_id, [start_value], k_factor, max_iterations)
+
 
-    collatz_frame = pd.DataFrame({"v_i": odds})
-    collatz_frame["sequence_id"] = sequence_id
-    collatz_frame["sequence_len"] = len(collatz_frame)
-    collatz_frame["n"] = collatz_frame.index + 1
+# pylint: disable=too-many-locals,too-many-statements,too-many-arguments
+# The features are calculated step by step
+def _generate_odd_sequences(first_sequence_id: int, start_values,
+                            k_factor: int, max_iterations: int,
+                            binary_encoding=BINARY_FULL, window_bits=DEFAULT_WINDOW_BITS):
+    """
+    This method generates a batch of Collatz sequences containing only odd numbers. The
+    sequences are concatenated into a single frame, so that the features of all sequences
+    are calculated at once. Cumulative features are calculated per sequence.
+
+    :param first_sequence_id: ID of the first sequence. The IDs of the following
+        sequences are consecutive.
+    :param start_values: The integer values to start with. The values must be
+        natural numbers > 0. If an even number is handed over, the next odd number will
+        be used as start value.
+    :param k_factor: The factor by which odd numbers are multiplied in the sequence.
+    :param max_iterations: The maximum number of iterations performed
+        before the method exits.
+    :param binary_encoding: The encoding of the binary representations of v_1 and v_i
+        (default is BINARY_FULL). See the function *collatz.export.binary_columns*.
+    :param window_bits: The number of leading and trailing bits of the compact binary
+        encodings (default is DEFAULT_WINDOW_BITS).
+    :return: The Collatz sequences as a pandas data frame.
+    """
+    odds = []
+    next_odds = []
+    lengths = []
+
+    for start_value in start_values:
+        sequence = commons.odd_collatz_sequence(
+            start_value, k_factor, max_iterations=max_iterations)
+        odds.extend(sequence[:-1])
+        next_odds.extend(sequence[1:])
+        lengths.append(len(sequence) - 1)
+
+    lengths = np.array(lengths, dtype=np.int64)
+    sequence_ids = np.arange(first_sequence_id, first_sequence_id + len(lengths))
+    offsets = np.cumsum(lengths) - lengths
+
+    collatz_frame = pd.DataFrame({"v_i": _to_int_array(odds, k_factor)})
+    collatz_frame["sequence_id"] = np.repeat(sequence_ids, lengths)
+    collatz_frame["sequence_len"] = np.repeat(lengths, lengths)
+    collatz_frame["n"] = np.arange(len(odds)) - np.repeat(offsets, lengths) + 1
     collatz_frame["k_factor"] = k_factor
 
-    collatz_frame["v_1"] = start_value
-    collatz_frame["kv_i+1"] = collatz_frame["v_i"].apply(
-        commons.next_collatz_number, args=(k_factor,))
-    collatz_frame["v_i+"] = next_odds
+    collatz_frame["v_1"] = np.repeat(_to_int_array(list(start_values)), lengths)
+    collatz_frame["kv_i+1"] = collatz_frame["v_i"] * k_factor + 1
+    collatz_frame["v_i+"] = _to_int_array(next_odds)
 
     collatz_frame["terminal"] = collatz_frame["v_i+"] == 1
     collatz_frame["cycle"] = collatz_frame["v_i+"] == collatz_frame["v_1"]
 
     # Logs
-    collatz_frame["v_i_log2"] = collatz_frame["v_i"].apply(log2)
-    collatz_frame["kv_i+1_log2"] = collatz_frame["kv_i+1"].apply(log2)
-    collatz_frame["v_i+_log2"] = collatz_frame["v_i+"].apply(log2)
+    collatz_frame["v_i_log2"] = _log2(collatz_frame["v_i"])
+    collatz_frame["kv_i+1_log2"] = _log2(collatz_frame["kv_i+1"])
+    collatz_frame["v_i+_log2"] = _log2(collatz_frame["v_i+"])
 
     # Binary strings
-    collatz_frame["v_1_bin"] = collatz_frame["v_1"].apply(commons.to_binary)
-    collatz_frame["v_i_bin"] = collatz_frame["v_i"].apply(commons.to_binary)
+    binary_names = []
+
+    for name, column in binary_columns(
+            _to_int_array(list(start_values)), "v_1_bin", binary_encoding,
+            window_bits).items():
+        collatz_frame[name] = np.repeat(column, lengths)
+        binary_names.append(name)
+
+    for name, column in binary_columns(
+            collatz_frame["v_i"].to_numpy(), "v_i_bin", binary_encoding,
+            window_bits).items():
+        collatz_frame[name] = column
+        binary_names.append(name)
 
     # Mods
     collatz_frame["v_i_mod4"] = collatz_frame["v_i"] % 4
     collatz_frame["kv_i+1_mod4"] = collatz_frame["kv_i+1"] % 4
     collatz_frame["v_i+_mod4"] = collatz_frame["v_i+"] % 4
 
+    sequences = collatz_frame.groupby("sequence_id", sort=False)
+
     # Alpha
-    collatz_frame["alpha_i"] = collatz_frame["kv_i+1"].apply(commons.trailing_zeros)
-    collatz_frame["alpha_i"] = collatz_frame["alpha_i"].astype('int64')
-    collatz_frame["alpha_i_max"] = log2(k_factor) + collatz_frame["v_i"].apply(log2)
-    collatz_frame["alpha_i_max"] += (1 + 1 / (k_factor * collatz_frame["v_i"])).apply(log2)
+    collatz_frame["alpha_i"] = _trailing_zeros(collatz_frame["kv_i+1"])
+    collatz_frame["alpha_i_max"] = log2(k_factor) + collatz_frame["v_i_log2"]
+    collatz_frame["alpha_i_max"] += _log2(1 + 1 / (k_factor * collatz_frame["v_i"]))
     # Round result here to avoid loss of precision errors
     collatz_frame["alpha_i_max"] = collatz_frame["alpha_i_max"].round(9)
-    collatz_frame["alpha"] = collatz_frame["alpha_i"].cumsum()
+    collatz_frame["alpha"] = sequences["alpha_i"].cumsum()
     collatz_frame["alpha_cycle"] = (log2(k_factor) * collatz_frame["n"]).astype('int64') + 1
-    collatz_frame["alpha_max"] = log2(start_value) + (collatz_frame["n"] * log2(k_factor))
+    collatz_frame["alpha_max"] = _log2(collatz_frame["v_1"]) + (
+        collatz_frame["n"] * log2(k_factor))
     collatz_frame["alpha_max"] = collatz_frame["alpha_max"].astype('int64') + 1
 
     # Beta
     collatz_frame["beta_i"] = 1 + 1 / (k_factor * collatz_frame["v_i"])
-    collatz_frame["beta"] = collatz_frame["beta_i"].cumprod()
+    collatz_frame["beta_i"] = collatz_frame["beta_i"].astype("float64")
+    collatz_frame["beta"] = sequences["beta_i"].cumprod()
 
     # Lambda
-    collatz_frame["bin_len"] = collatz_frame["v_i_log2"].astype('int64') + 1
-    collatz_frame["next_bin_len"] = collatz_frame["kv_i+1_log2"].astype('int64') + 1
+    collatz_frame["bin_len"] = _bit_length(collatz_frame["v_i"])
+    collatz_frame["next_bin_len"] = _bit_length(collatz_frame["kv_i+1"])
 
     collatz_frame["bin_diff"] = collatz_frame["next_bin_len"] - collatz_frame["bin_len"]
     collatz_frame["lambda_i"] = collatz_frame["bin_diff"]
     collatz_frame.loc[collatz_frame["lambda_i"] < 0, "lambda_i"] = 0
-    collatz_frame["lambda"] = collatz_frame["lambda_i"].cumsum()
+    collatz_frame["lambda"] = sequences["lambda_i"].cumsum()
 
     collatz_frame["lambda_i_min"] = int(log2(k_factor))
     collatz_frame["lambda_i_max"] = int(log2(k_factor) + 1)
@@ -100,7 +236,7 @@ def _generate_odd_sequence(sequence_id: int, start_value: int,
         "sequence_id", "sequence_len", "n", "k_factor", "v_1",
         "v_i", "kv_i+1", "v_i+", "v_i_log2", "v_i+_log2", "kv_i+1_log2",
         "v_i_mod4", "kv_i+1_mod4", "v_i+_mod4",
-        "v_1_bin", "v_i_bin", "terminal", "cycle",
+        *binary_names, "terminal", "cycle",
         "alpha_i", "alpha_i_max", "alpha", "alpha_cycle", "alpha_max",
         "beta_i", "beta", "bin_len", "next_bin_len",
         "lambda_i", "lambda_i_min", "lambda_i_max",
@@ -111,7 +247,7 @@ def _generate_odd_sequence(sequence_id: int, start_value: int,
         "sequence_id", "sequence_len", "n", "k", "v_1",
         "v_i", "kv_i+1", "v_i+", "v_i_log2", "v_i+_log2", "kv_i+1_log2",
         "v_i_mod4", "kv_i+1_mod4", "v_i+_mod4",
-        "v_1_bin", "v_i_bin", "terminal", "cycle",
+        *binary_names, "terminal", "cycle",
         "a_i", "a_i_max", "a", "a_cycle", "a_max",
         "b_i", "b", "bin_len", "next_bin_len",
         "l_i", "l_i_min", "l_i_max",
@@ -121,45 +257,362 @@ def _generate_odd_sequence(sequence_id: int, start_value: int,
     return result_frame
 
 
-def _main():
+def _summarise_odd_sequences(first_sequence_id: int, start_values,
+                             k_factor: int, max_iterations: int):
     """
-    This method executes the program.
-    :return: None.
+    This method summarises a batch of Collatz sequences containing only odd numbers.
+    In contrast to the method *_generate_odd_sequences*, a single row is created per
+    sequence. The aggregates are calculated while iterating the sequence, without
+    storing its values. The sequences end as in the function
+    *collatz.commons.odd_collatz_sequence*.
+
+    :param first_sequence_id: ID of the first sequence. The IDs of the following
+        sequences are consecutive.
+    :param start_values: The integer values to start with. The values must be
+        natural numbers > 0. If an even number is handed over, the next odd number will
+        be used as start value.
+    :param k_factor: The factor by which odd numbers are multiplied in the sequence.
+    :param max_iterations: The maximum number of iterations performed
+        before the method exits.
+    :return: The summaries as a pandas data frame.
     """
-    k_factors = [1, 3, 5, 7, 9]
-    max_start_value = 3999
-    v_1_range = range(1, max_start_value + 1, 2)
-    max_iterations = 100
-    sequence_count = ((max_start_value + 1) / 2) * len(k_factors)
+    summaries = []
 
-    export_name = "alpha_export"
-    dest_file_name = "./data/" + export_name + ".csv"
-    tmp_file_name = "./data/" + export_name + "_tmp" + ".csv"
+    for start_value in start_values:
+        odd = start_value
+        if odd % 2 == 0:
+            odd = commons.next_odd_collatz_number(odd, k_factor)
+
+        visited = {odd}
+        odd_max = odd
+        alpha = 0
+        lambda_sum = 0
+        steps = 0
+
+        while True:
+            next_value = k_factor * odd + 1
+            alpha_i = (next_value & -next_value).bit_length() - 1
+            next_odd = next_value >> alpha_i
+
+            steps = steps + 1
+            alpha = alpha + alpha_i
+            lambda_sum = lambda_sum + max(next_value.bit_length() - odd.bit_length(), 0)
+            odd_max = max(odd_max, next_odd)
+
+            if next_odd == 1 or next_odd in visited or -1 < max_iterations <= steps:
+                break
+
+            visited.add(next_odd)
+            odd = next_odd
+
+        summaries.append((start_value, steps, odd_max, next_odd, alpha, lambda_sum))
+
+    summary_frame = pd.DataFrame(
+        summaries, columns=["v_1", "sequence_len", "v_max", "v_n", "a", "l"])
+
+    summary_frame.insert(0, "sequence_id", np.arange(
+        first_sequence_id, first_sequence_id + len(summary_frame)))
+    summary_frame.insert(2, "k", k_factor)
+
+    summary_frame["o"] = summary_frame["l"] - summary_frame["a"]
+    summary_frame["terminal"] = summary_frame["v_n"] == 1
+    summary_frame["cycle"] = summary_frame["v_n"] == summary_frame["v_1"]
+
+    return summary_frame
+
+
+def _validate_odd_sequences(first_sequence_id: int, start_values,
+                            k_factor: int, max_iterations: int):
+    """
+    This method generates a batch of Collatz sequences containing only odd numbers and
+    validates the INVARIANTS for every step. Only the steps that violate at least one
+    invariant are returned. For every invariant, a column with the prefix
+    INVARIANT_PREFIX indicates whether it is violated.
+
+    :param first_sequence_id: ID of the first sequence. The IDs of the following
+        sequences are consecutive.
+    :param start_values: The integer values to start with. The values must be
+        natural numbers > 0. If an even number is handed over, the next odd number will
+        be used as start value.
+    :param k_factor: The factor by which odd numbers are multiplied in the sequence.
+    :param max_iterations: The maximum number of iterations performed
+        before the method exits.
+    :return: The counterexamples as a pandas data frame.
+    """
+    # The binary strings are not required to validate the invariants
+    sequence_frame = _generate_odd_sequences(
+        first_sequence_id, start_values, k_factor, max_iterations, BINARY_COMPACT)
+
+    violation_frame = _invariant_violations(sequence_frame)
+    violations = violation_frame.any(axis=1)
+
+    return pd.concat([sequence_frame[violations], violation_frame[violations]], axis=1)
+
+
+def _invariant_violations(sequence_frame):
+    """
+    This method evaluates the INVARIANTS for the steps of Collatz sequences.
+
+    :param sequence_frame: The data frame created by the method *_generate_odd_sequences*.
+    :return: A data frame with a boolean column per invariant, which is True if the
+        invariant is violated. The names of the columns have the prefix INVARIANT_PREFIX.
+    """
+    frame = sequence_frame
+    v_1_log2 = _log2(frame["v_1"]).astype("int64")
+
+    violations = {
+        "a_i_min": frame["a_i"] < 1,
+        "a_i_max": frame["a_i"] > frame["a_i_max"],
+        "a_min": frame["a"] < frame["n"],
+        "a_max": frame["a"] > frame["a_max"],
+        "a_max_bound": frame["a_max"] > v_1_log2 + frame["l_max"],
+        "l_i_min": frame["l_i"] < frame["l_i_min"],
+        "l_i_max": frame["l_i"] > frame["l_i_max"],
+        "l_min": frame["l"] < frame["l_min"],
+        "l_max": frame["l"] > frame["l_max"],
+        "o_i_max": frame["o_i"] > frame["o_i_max"],
+        "o_max": frame["o"] > frame["o_max"]}
+
+    return pd.DataFrame(
+        {INVARIANT_PREFIX + name: violations[name] for name in INVARIANTS},
+        index=frame.index)
+
+
+def _to_int_array(values, factor=1):
+    """
+    This function converts a list of ints into an int64 array if the values multiplied
+    by a factor plus one fit into int64. Otherwise, an object array of Python ints
+    is returned.
+
+    :param values: The list of ints.
+    :param factor: The factor (default is 1).
+    :return: The array.
+    """
+    if not values or max(values) < (tensor.INT64_MAX - 1) // factor:
+        return np.array(values, dtype=np.int64)
+    return np.array(values + [None], dtype=object)[:-1]
 
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
-    logging.info("Exporting %d Collatz sequences to file %s", sequence_count, dest_file_name)
 
-    sequence_id = 0
-    write_mode = True
+def _log2(values):
+    """
+    This function calculates the binary logarithm of a series of ints or floats. In
+    contrast to numpy, the calculation is exact for arbitrary big ints.
+
+    :param values: The pandas series.
+    :return: A float64 array with the binary logarithms.
+    """
+    return np.fromiter(map(log2, values), dtype=np.float64, count=len(values))
 
-    for k in k_factors:
-        logging.info("Generating sequences for k=%d", k)
 
-        for v_1 in v_1_range:
-            # Create the sequence
-            sequence_id = sequence_id + 1
-            current_frame = _generate_odd_sequence(
-                sequence_id, v_1, k, max_iterations)
+def _bit_length(values):
+    """
+    This function returns the number of bits of a series of positive ints. The calculation
+    is based on shifts instead of floating point logarithms.
+
+    :param values: The pandas series.
+    :return: An int64 array with the bit lengths.
+    """
+    if values.dtype == np.int64:
+        return tensor.bit_length(values.to_numpy())
+    return np.array([int(v).bit_length() for v in values], dtype=np.int64)
+
+
+def _trailing_zeros(values):
+    """
+    This function returns the trailing zeros of a series of positive ints.
+
+    :param values: The pandas series.
+    :return: An int64 array with the trailing zeros.
+    """
+    if values.dtype == np.int64:
+        return tensor.trailing_zeros(values.to_numpy(), backend="numpy")
+    return np.array([commons.trailing_zeros(int(v)) for v in values], dtype=np.int64)
+
 
-            # Write the frame to file
-            mode_flag = "w" if write_mode else "a"
-            current_frame.to_csv(
-                tmp_file_name, mode=mode_flag, index=False, header=write_mode)
-            write_mode = False
+def _parse_cmd_args():
+    """
+    This function parses the command line arguments of the program.
+
+    :return: The parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Run alpha export.')
+    parser.add_argument(
+        "--k", nargs="+", help=("k factors. Default is "
+                                + " ".join(map(str, DEFAULT_K_FACTORS))),
+        default=DEFAULT_K_FACTORS
+    )
+
+    parser.add_argument(
+        "--start", help=("first start value. Default is "
+                         + str(DEFAULT_START_VALUE)),
+        default=DEFAULT_START_VALUE
+    )
+
+    parser.add_argument(
+        "--stop", help=("last start value. Default is "
+                        + str(DEFAULT_STOP_VALUE)),
+        default=DEFAULT_STOP_VALUE
+    )
+
+    parser.add_argument(
+        "--step", help=("difference between consecutive start values. Default is "
+                        + str(DEFAULT_STEP)),
+        default=DEFAULT_STEP
+    )
+
+    parser.add_argument(
+        "--m", help=("maximum number of iterations per sequence. Default is "
+                     + str(DEFAULT_MAX_ITERATIONS)),
+        default=DEFAULT_MAX_ITERATIONS
+    )
+
+    parser.add_argument(
+        "--format", help=("format of the export file. Default is " + CSV_FORMAT),
+        choices=FILE_FORMATS, default=CSV_FORMAT
+    )
+
+    parser.add_argument(
+        "--compression", help="compression of csv files. Default is no compression",
+        choices=list(COMPRESSIONS), default=None
+    )
+
+    # The summary and the counterexamples are different exports
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument(
+        "--summary", help="export a single row per sequence instead of a row per step",
+        action="store_true"
+    )
+
+    mode_group.add_argument(
+        "--validate", help=("validate the invariants of the steps and export only "
+                            "the counterexamples"),
+        action="store_true"
+    )
+
+    parser.add_argument(
+        "--bin", help=("encoding of the binary representations of v_1 and v_i. The "
+                       "compact encodings only contain the bit length and the leading "
+                       "and trailing bits. Default is " + BINARY_FULL),
+        choices=BINARY_ENCODINGS, default=BINARY_FULL
+    )
+
+    parser.add_argument(
+        "--window", help=("number of leading and trailing bits of the compact binary "
+                          "encodings. Default is " + str(DEFAULT_WINDOW_BITS)),
+        default=DEFAULT_WINDOW_BITS
+    )
+
+    parser.add_argument(
+        "--b", help=("number of sequences per batch. Default is "
+                     + str(DEFAULT_BATCH_SIZE)),
+        default=DEFAULT_BATCH_SIZE
+    )
+
+    parser.add_argument(
+        "--w", help="number of worker processes. Default is the number of CPUs",
+        default=os.cpu_count()
+    )
+
+    parser.add_argument(
+        "--f", help=("path of destination file. Default is '" + DATA_PATH
+                     + EXPORT_NAME + "[_summary|_counterexamples].FORMAT' plus the "
+                     "extension of "
+                     "the compression"),
+        default=None
+    )
+
+    args = parser.parse_args()
+
+    if args.compression and args.format != CSV_FORMAT:
+        parser.error("--compression is only supported for " + CSV_FORMAT)
+
+    return args
+
+
+def _log_violations(file_name: str, file_format: str):
+    """
+    This method logs the number of violations per invariant, which are counted in the
+    exported counterexamples.
+
+    :param file_name: The path of the file with the counterexamples.
+    :param file_format: The format of the file.
+    :return: None.
+    """
+    columns = [INVARIANT_PREFIX + name for name in INVARIANTS]
+
+    if file_format == CSV_FORMAT:
+        violation_frame = pd.read_csv(file_name, usecols=columns)
+    else:
+        violation_frame = read_parquet(file_name, columns)
+
+    logging.info("%d steps violate at least one invariant", len(violation_frame))
+
+    for name, invariant in INVARIANTS.items():
+        count = int(violation_frame[INVARIANT_PREFIX + name].sum())
+        log_level = logging.WARNING if count else logging.INFO
+        logging.log(log_level, "Violations of %s: %d", invariant, count)
+
+
+# pylint: disable=too-many-locals,too-many-statements
+# The options are read step by step
+def _main():
+    """
+    This method executes the program.
+    :return: None.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
-    # Moving tmp file to destination file
-    logging.info("Moving temp file to destination file")
-    shutil.move(tmp_file_name, dest_file_name)
+    args = _parse_cmd_args()
+    logging.debug("Command line args: %s", args)
+
+    k_factors = [int(k) for k in args.k]
+    v_1_range = range(int(args.start), int(args.stop) + 1, int(args.step))
+    max_iterations = int(args.m)
+    file_format = args.format
+    compression = args.compression
+    binary_encoding = args.bin
+    window_bits = int(args.window)
+    batch_size = int(args.b)
+    worker_count = int(args.w)
+
+    # Rows per sequence or per step
+    if args.validate:
+        export_name = EXPORT_NAME + "_counterexamples"
+        generate_function = _validate_odd_sequences
+        big_int_columns = BIG_INT_COLUMNS
+        encoding_args = ()
+    elif args.summary:
+        export_name = EXPORT_NAME + "_summary"
+        generate_function = _summarise_odd_sequences
+        big_int_columns = SUMMARY_BIG_INT_COLUMNS
+        encoding_args = ()
+    else:
+        export_name = EXPORT_NAME
+        generate_function = _generate_odd_sequences
+        big_int_columns = BIG_INT_COLUMNS
+        encoding_args = (binary_encoding, window_bits)
+
+    dest_file_name = args.f
+    if dest_file_name is None:
+        dest_file_name = DATA_PATH + export_name + "." + file_format
+        if compression:
+            dest_file_name = dest_file_name + COMPRESSIONS[compression]
+
+    # Parameters that determine the content of the export
+    parameters = {
+        "k": k_factors, "start": int(args.start), "stop": int(args.stop),
+        "step": int(args.step), "m": max_iterations, "format": file_format,
+        "compression": compression, "summary": args.summary, "validate": args.validate,
+        "bin": binary_encoding, "window": window_bits}
+
+    version = source_version(os.path.abspath(__file__))
+    if export_sequences(dest_file_name, generate_function, parameters, version, v_1_range,
+                        batch_size, encoding_args, big_int_columns, INDEX_KEY_COLUMNS,
+                        worker_count) is None:
+        return
+
+    if args.validate:
+        _log_violations(dest_file_name, file_format)
 
     # Export finished
     logging.info("Export finished successfully!")
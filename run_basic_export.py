@@ -2,13 +2,61 @@
 This program exports basic data on Collatz sequences into a csv file.
 Both even and odd Collatz numbers are included. The sample is used
 for the training of machine learning models.
+
+The sequences are generated in batches by a pool of worker processes. A single
+writer appends the batches to the file in the order of their sequence ids. The
+number of sequences per batch is defined by the option --b.
+
+The data is exported into a csv file or, if the option --format is set to parquet,
+into a parquet file with typed columns and one row group per batch. The parquet format
+requires the package pyarrow.
+
+Csv exports are resumable. Every batch is committed to a manifest next to the
+temp file as soon as it is written to disk. If the program is interrupted, the next
+run continues after the last committed batch. Csv files can be compressed
+with gzip, bz2 or xz, while the compression runs in a background thread.
+
+Next to a csv export, an index with the byte offset and the number of rows of every
+sequence is written to a file with the suffix .index. The function
+*collatz.export.read_sequences* uses the index to read single sequences without
+parsing the whole file.
+
+The parameters, a fingerprint of the sources, the number of rows and a hash of the
+content are written to a metadata file with the suffix .metadata. If the export is up
+to date, it is skipped. If only the k factors have changed, the sequences of the
+remaining k factors are taken over from an existing csv export.
+
+Examples
+--------
+>>> python run_basic_export.py --k 3 --start 1001 --stop 2000 --step 2
+>>> python run_basic_export.py --format parquet --b 500 --w 4
 """
 
-import shutil
+import argparse
+import os
 import logging
 from math import log2
 import pandas as pd
 from collatz import commons
+from collatz.export import COMPRESSIONS, FILE_FORMATS, CSV_FORMAT
+from collatz.export import concat_frames, export_sequences, source_version
+
+
+# Global settings
+DATA_PATH = "data/"
+EXPORT_NAME = "basic_export"
+DEFAULT_K_FACTORS = [1, 3, 5, 7, 9]
+DEFAULT_START_VALUE = 1
+DEFAULT_STOP_VALUE = 2000
+DEFAULT_STEP = 1
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_BATCH_SIZE = 1000
+
+# Key columns of the sequences in the index of a csv export
+INDEX_KEY_COLUMNS = ("sequence_id", "x_1", "k")
+
+# Columns that may contain ints, which do not fit into int64
+BIG_INT_COLUMNS = ("x_1", "x_i", "x_i+")
 
 
 def _generate_full_sequence(sequence_id: int, start_value: int,
@@ -60,45 +108,133 @@ def _generate_full_sequence(sequence_id: int, start_value: int,
     return result_frame
 
 
-def _main():
+def _generate_full_sequences(first_sequence_id: int, start_values,
+                             k_factor: int, max_iterations: int):
     """
-    This method executes the program.
-    :return: None.
-    """
-    k_factors = [1, 3, 5, 7, 9]
-    max_start_value = 2000
-    x_1_range = range(1, max_start_value + 1)
-    max_iterations = 100
-    sequence_count = max_start_value * len(k_factors)
+    This method generates a batch of full Collatz sequences containing odd and even
+    numbers. The sequences are concatenated into a single frame.
 
-    export_name = "basic_export"
-    dest_file_name = "./data/" + export_name + ".csv"
-    tmp_file_name = "./data/" + export_name + "_tmp" + ".csv"
+    :param first_sequence_id: ID of the first sequence. The IDs of the following
+        sequences are consecutive.
+    :param start_values: The integer values to start with. The values must be
+        natural numbers > 0.
+    :param k_factor: The factor by which odd numbers are multiplied in the sequence.
+    :param max_iterations: The maximum number of iterations performed
+        before the method exits.
+    :return: The Collatz sequences as a pandas data frame.
+    """
+    return concat_frames([
+        _generate_full_sequence(first_sequence_id + i, start_value, k_factor, max_iterations)
+        for i, start_value in enumerate(start_values)])
 
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
-    logging.info("Exporting %d Collatz sequences to file %s", sequence_count, dest_file_name)
 
-    sequence_id = 0
-    write_mode = True
+def _parse_cmd_args():
+    """
+    This function parses the command line arguments of the program.
 
-    for k in k_factors:
-        logging.info("Generating sequences for k=%d", k)
+    :return: The parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Run basic export.')
+    parser.add_argument(
+        "--k", nargs="+", help=("k factors. Default is "
+                                + " ".join(map(str, DEFAULT_K_FACTORS))),
+        default=DEFAULT_K_FACTORS
+    )
+
+    parser.add_argument(
+        "--start", help=("first start value. Default is "
+                         + str(DEFAULT_START_VALUE)),
+        default=DEFAULT_START_VALUE
+    )
+
+    parser.add_argument(
+        "--stop", help=("last start value. Default is "
+                        + str(DEFAULT_STOP_VALUE)),
+        default=DEFAULT_STOP_VALUE
+    )
+
+    parser.add_argument(
+        "--step", help=("difference between consecutive start values. Default is "
+                        + str(DEFAULT_STEP)),
+        default=DEFAULT_STEP
+    )
+
+    parser.add_argument(
+        "--m", help=("maximum number of iterations per sequence. Default is "
+                     + str(DEFAULT_MAX_ITERATIONS)),
+        default=DEFAULT_MAX_ITERATIONS
+    )
+
+    parser.add_argument(
+        "--format", help=("format of the export file. Default is " + CSV_FORMAT),
+        choices=FILE_FORMATS, default=CSV_FORMAT
+    )
+
+    parser.add_argument(
+        "--compression", help="compression of csv files. Default is no compression",
+        choices=list(COMPRESSIONS), default=None
+    )
+
+    parser.add_argument(
+        "--b", help=("number of sequences per batch. Default is "
+                     + str(DEFAULT_BATCH_SIZE)),
+        default=DEFAULT_BATCH_SIZE
+    )
+
+    parser.add_argument(
+        "--w", help="number of worker processes. Default is the number of CPUs",
+        default=os.cpu_count()
+    )
+
+    parser.add_argument(
+        "--f", help=("path of destination file. Default is '" + DATA_PATH
+                     + EXPORT_NAME + ".FORMAT' plus the extension of the compression"),
+        default=None
+    )
+
+    args = parser.parse_args()
+
+    if args.compression and args.format != CSV_FORMAT:
+        parser.error("--compression is only supported for " + CSV_FORMAT)
+
+    return args
 
-        for x_1 in x_1_range:
-            # Create the sequence
-            sequence_id = sequence_id + 1
-            current_frame = _generate_full_sequence(
-                sequence_id, x_1, k, max_iterations)
 
-            # Write the frame to file
-            mode_char = "w" if write_mode else "a"
-            current_frame.to_csv(
-                tmp_file_name, mode=mode_char, index=False, header=write_mode)
-            write_mode = False
+def _main():
+    """
+    This method executes the program.
+    :return: None.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
-    # Moving tmp file to destination file
-    logging.info("Moving temp file to destination file")
-    shutil.move(tmp_file_name, dest_file_name)
+    args = _parse_cmd_args()
+    logging.debug("Command line args: %s", args)
+
+    k_factors = [int(k) for k in args.k]
+    x_1_range = range(int(args.start), int(args.stop) + 1, int(args.step))
+    max_iterations = int(args.m)
+    file_format = args.format
+    compression = args.compression
+    batch_size = int(args.b)
+    worker_count = int(args.w)
+
+    dest_file_name = args.f
+    if dest_file_name is None:
+        dest_file_name = DATA_PATH + EXPORT_NAME + "." + file_format
+        if compression:
+            dest_file_name = dest_file_name + COMPRESSIONS[compression]
+
+    # Parameters that determine the content of the export
+    parameters = {
+        "k": k_factors, "start": int(args.start), "stop": int(args.stop),
+        "step": int(args.step), "m": max_iterations, "format": file_format,
+        "compression": compression}
+
+    version = source_version(os.path.abspath(__file__))
+    if export_sequences(dest_file_name, _generate_full_sequences, parameters, version,
+                        x_1_range, batch_size, (), BIG_INT_COLUMNS, INDEX_KEY_COLUMNS,
+                        worker_count) is None:
+        return
 
     # Export finished
     logging.info("Export finished successfully!")
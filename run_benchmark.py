@@ -0,0 +1,117 @@
+"""
+This script compares the runtime of the backends of the module collatz.tensor. Every
+backend validates the same range of Collatz numbers several times. The first run is
+not measured, so that the time for tracing and compiling the tensorflow graphs is
+excluded. The results of all backends are compared with the results of the first
+backend.
+
+Backends that are not available (e.g. because tensorflow is not installed) are skipped.
+
+Examples
+--------
+>>> python run_benchmark.py --start 16777216 --stop 17825792
+>>> python run_benchmark.py --backends numpy tensorflow_xla --r 10
+"""
+
+# Imports
+import argparse
+import logging
+import time
+from collatz import tensor as tc
+
+
+# Global settings
+DEFAULT_START_NUMBER = 2**24
+DEFAULT_MAX_NUMBER = 2**24 + 2**20
+DEFAULT_REPETITIONS = 3
+DEFAULT_BACKENDS = ["numpy", "tensorflow", "tensorflow_compiled", "tensorflow_xla"]
+
+
+def _parse_cmd_args():
+    """
+    This function parses the command line arguments of the program.
+
+    :return: The parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Run benchmark of collatz.tensor.')
+    parser.add_argument(
+        "--start", help=("first number to validate. Default is "
+                         + str(DEFAULT_START_NUMBER)),
+        default=DEFAULT_START_NUMBER
+    )
+
+    parser.add_argument(
+        "--stop", help=("last number to validate. Default is "
+                        + str(DEFAULT_MAX_NUMBER)),
+        default=DEFAULT_MAX_NUMBER
+    )
+
+    parser.add_argument(
+        "--r", help=("number of measured runs per backend. Default is "
+                     + str(DEFAULT_REPETITIONS)),
+        default=DEFAULT_REPETITIONS
+    )
+
+    parser.add_argument(
+        "--backends", nargs="+", help=("backends to compare. Default is "
+                                       + " ".join(DEFAULT_BACKENDS)),
+        default=DEFAULT_BACKENDS
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+def _main():
+    """
+    This function executes the program.
+
+    :return: None.
+    """
+    # Setup
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    args = _parse_cmd_args()
+    logging.debug("Command line args: %s", args)
+
+    start_number = int(args.start)
+    max_number = int(args.stop)
+    repetitions = int(args.r)
+
+    logging.info("Validating %d Collatz numbers %d times per backend",
+                 max_number - start_number + 1, repetitions)
+
+    expected = None
+
+    for backend_name in args.backends:
+        try:
+            backend = tc.get_backend(backend_name)
+        except ImportError:
+            logging.warning("Skipping backend %s, which is not available", backend_name)
+            continue
+
+        # The first run includes tracing and compilation and is not measured
+        warmup_start = time.time()
+        result = tc.validate_block(start_number, max_number + 1, backend=backend)
+        warmup_time = time.time() - warmup_start
+
+        start_time = time.time()
+        for _ in range(repetitions):
+            result = tc.validate_block(start_number, max_number + 1, backend=backend)
+        elapsed = (time.time() - start_time) / repetitions
+
+        result = (result[0], result[1], list(result[2]))
+
+        if expected is None:
+            expected = result
+        elif result != expected:
+            logging.error("Backend %s returned %s instead of %s",
+                          backend_name, result, expected)
+
+        logging.info("%s: %.3fs per run (first run %.3fs)",
+                     backend_name, elapsed, warmup_time)
+
+
+# Main block to start the program
+if __name__ == '__main__':
+    _main()
@@ -2,9 +2,13 @@
 This script runs a program that tries to find cycles in Collatz
 sequences and writes the results to disk.
 
+The results can be compressed with gzip, bz2 or xz. The compression runs in a
+background thread while the cycles are searched.
+
 Examples
 --------
 >>> python run_cycle_finder.py --k 201 --c 15 --v 1001 --f "data/cycles_c_15.csv"
+>>> python run_cycle_finder.py --compression gzip --f "data/cycles.csv.gz"
 """
 
 # Imports
@@ -12,6 +16,7 @@ import logging
 import argparse
 import shutil
 from collatz.cycles import find_cycles
+from collatz.export import COMPRESSIONS, CsvBatchWriter
 
 
 # Global variables
@@ -48,8 +53,13 @@ def _parse_cmd_args():
 
     parser.add_argument(
         "--f", help=("path of destination file. Default is '"
-                     + str(DEFAULT_FILE_PATH) + "'"),
-        default=DEFAULT_FILE_PATH
+                     + str(DEFAULT_FILE_PATH) + "' with the extension of the compression"),
+        default=None
+    )
+
+    parser.add_argument(
+        "--compression", help="compression of the destination file. Default is none",
+        choices=list(COMPRESSIONS), default=None
     )
 
     args = parser.parse_args()
@@ -74,29 +84,31 @@ def _main():
     max_c = int(args.c)
     max_value = int(args.v)
     export_file_name = args.f
+    if export_file_name is None:
+        export_file_name = DEFAULT_FILE_PATH
+        if args.compression:
+            export_file_name = export_file_name + COMPRESSIONS[args.compression]
+
     dest_file_name = export_file_name
     tmp_file_name = export_file_name + "_tmp"
 
     cycle_count = 0
-    write_mode = True
 
     # Find cycles
     logging.info("Running cycle finder...")
 
-    for k_factor in k_factors:
-        logging.info("Finding cycles for k=%d", k_factor)
+    with CsvBatchWriter(tmp_file_name, 1, compression=args.compression) as writer:
+        for k_factor in k_factors:
+            logging.info("Finding cycles for k=%d", k_factor)
 
-        cycle_frame = find_cycles(
-            k_factor, max_c=max_c, max_value=max_value,
-            max_iterations=DEFAULT_MAX_ITERATIONS)
+            cycle_frame = find_cycles(
+                k_factor, max_c=max_c, max_value=max_value,
+                max_iterations=DEFAULT_MAX_ITERATIONS)
 
-        cycle_count = cycle_count + len(cycle_frame)
+            cycle_count = cycle_count + len(cycle_frame)
 
-        # Write the frame to file
-        mode_flag = "w" if write_mode else "a"
-        cycle_frame.to_csv(
-            tmp_file_name, mode=mode_flag, index=False, header=write_mode)
-        write_mode = False
+            # Write the frame to file
+            writer.write(cycle_frame)
 
     # Moving tmp file to destination file
     logging.info("Moving temp file to destination file")
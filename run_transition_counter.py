@@ -0,0 +1,144 @@
+"""
+This script counts the transitions of the leading and the trailing three bits of odd
+Collatz numbers in order to validate the automata of the module collatz.automata against
+real data. The sequences of all odd start values in a range are followed until they
+reach one. The range is split into blocks, which are counted independently on all
+available CPU cores. The counts of the blocks are merged and written to two csv files.
+Transitions that the machines are not able to perform are logged.
+
+Examples
+--------
+>>> python run_transition_counter.py --start 1 --stop 10000000 --b 1048576 --w 8
+"""
+
+# Imports
+import argparse
+import logging
+import os
+import time
+from multiprocessing import Pool
+from collatz.automata import TransitionCounter
+
+
+# Global settings
+DATA_PATH = "data/"
+DEFAULT_START_NUMBER = 1
+DEFAULT_MAX_NUMBER = 2**20
+DEFAULT_BLOCK_SIZE = 2**16
+DEFAULT_MAX_ITERATIONS = -1
+
+
+def _parse_cmd_args():
+    """
+    This function parses the command line arguments of the program.
+
+    :return: The parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Run Collatz transition counter.')
+    parser.add_argument(
+        "--start", help=("first start value. Default is "
+                         + str(DEFAULT_START_NUMBER)),
+        default=DEFAULT_START_NUMBER
+    )
+
+    parser.add_argument(
+        "--stop", help=("last start value. Default is "
+                        + str(DEFAULT_MAX_NUMBER)),
+        default=DEFAULT_MAX_NUMBER
+    )
+
+    parser.add_argument(
+        "--b", help=("number of start values per block. Default is "
+                     + str(DEFAULT_BLOCK_SIZE)),
+        default=DEFAULT_BLOCK_SIZE
+    )
+
+    parser.add_argument(
+        "--w", help="number of worker processes. Default is the number of CPUs",
+        default=os.cpu_count()
+    )
+
+    parser.add_argument(
+        "--m", help=("maximum number of odd steps per sequence. Default is "
+                     + str(DEFAULT_MAX_ITERATIONS) + ", which means no limit"),
+        default=DEFAULT_MAX_ITERATIONS
+    )
+
+    parser.add_argument(
+        "--f", help=("directory of the csv files. Default is '" + DATA_PATH + "'"),
+        default=DATA_PATH
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+def _count_block(block: tuple):
+    """
+    This function counts the transitions of a single block. It is executed by
+    the worker processes.
+
+    :param block: The block as tuple of the first value, the stop value (exclusive)
+        and the maximum number of iterations.
+    :return: The TransitionCounter of the block.
+    """
+    start_value, stop_value, max_iterations = block
+    return TransitionCounter().count_block(start_value, stop_value, max_iterations)
+
+
+def _main():
+    """
+    This function executes the program.
+
+    :return: None.
+    """
+    # Setup
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    args = _parse_cmd_args()
+    logging.debug("Command line args: %s", args)
+
+    start_number = int(args.start)
+    max_number = int(args.stop)
+    block_size = int(args.b)
+    worker_count = int(args.w)
+    max_iterations = int(args.m)
+
+    blocks = [
+        (block_start, min(block_start + block_size, max_number + 1), max_iterations)
+        for block_start in range(start_number, max_number + 1, block_size)]
+
+    logging.info("Counting transitions of %d Collatz sequences in %d blocks using %d workers",
+                 max_number - start_number + 1, len(blocks), worker_count)
+
+    # Count and merge the transitions
+    counter = TransitionCounter()
+    start_time = time.time()
+
+    with Pool(worker_count) as pool:
+        for i, block_counter in enumerate(pool.imap_unordered(_count_block, blocks)):
+            counter.merge(block_counter)
+            logging.info("Counted %d odd steps (%d/%d blocks, %.0f steps/s)",
+                         counter.step_count, i + 1, len(blocks),
+                         counter.step_count / (time.time() - start_time))
+
+    # Write the results
+    os.makedirs(args.f, exist_ok=True)
+
+    for name, frame in (("leading", counter.leading_frame()),
+                        ("trailing", counter.trailing_frame())):
+        file_name = os.path.join(args.f, name + "_transitions.csv")
+        frame.to_csv(file_name, index=False)
+
+        impossible = frame[~frame["possible"]]
+        logging.info("Transitions of the %s bits written to %s", name, file_name)
+        logging.info("Impossible transitions of the %s bits: %d (%d odd steps)",
+                     name, len(impossible), impossible["count"].sum())
+
+        for row in impossible.to_dict("records"):
+            logging.warning("Impossible %s transition: %s", name, row)
+
+
+# Main block to start the program
+if __name__ == '__main__':
+    _main()
@@ -1,48 +1,319 @@
 """
-This script uses tensorflow to validate a batch of Collatz numbers. The validation
-checks if the numbers end with one as expected by Lothar Collatz.
+This script uses the module collatz.tensor to validate a range of Collatz numbers. The
+validation checks if the numbers end with one as expected by Lothar Collatz.
 
-In order to run the script in an acceptable amount of time a GPU is required. Due to
-limitations of tensorflow no arbitrary big integers are supported.
+The range is split into blocks of a fixed size, which are validated independently
+on all available CPU cores. A sequence is retired as soon as it drops below its
+start value. After each block, the last verified number is written to a checkpoint
+file, so that an interrupted validation can be resumed. The calculations are performed
+with numpy by default. Values that would overflow the int64 data type are continued
+with 128 bit numbers consisting of two uint64 limbs. Only values that would also overflow
+128 bits are validated with Python ints.
+
+The generalised variant kv+c can be selected with the factor k and the summand c. Since
+such variants may have further cycles, their sequences are classified with a cycle
+detection instead. The validation fails for all start values that enter a cycle
+without one or exceed int64. The cycles are reported by their smallest odd number.
+Statistics of such variants are only calculated for blocks without failures and
+require a maximum number of odd steps (--m).
+
+Optionally, statistics on every odd start value (odd steps, total steps, peak value
+and bit length of the peak) are written to a directory. Every block is stored as
+a numpy file (npz) with one array per column, which can be loaded with *numpy.load*.
+
+Examples
+--------
+>>> python run_validator.py --start 1 --stop 1000000000 --b 1048576 --w 8
+>>> python run_validator.py --stop 100000000 --s "data/validator_statistics"
+>>> python run_validator.py --stop 100000 --k 5 --c 1 --m 1000
 """
 
 # Imports
+import argparse
+import json
 import logging
-import tensorflow as tf
+import os
+import time
+from multiprocessing import Pool
+import numpy as np
 from collatz import tensor as tc
 
 
 # Global settings
-START_NUMBER = 1
-MAX_NUMBER = 2**25
+DATA_PATH = "data/"
+DEFAULT_CHECKPOINT_PATH = DATA_PATH + "validator_checkpoint.json"
+DEFAULT_START_NUMBER = 1
+DEFAULT_MAX_NUMBER = 2**25
+DEFAULT_BLOCK_SIZE = 2**20
+DEFAULT_BACKEND = "numpy"
+DEFAULT_TABLE_SIZE = 2**20
+DEFAULT_K = 3
+DEFAULT_C = 1
+DEFAULT_MAX_ITERATIONS = -1
+
+
+def _parse_cmd_args():
+    """
+    This function parses the command line arguments of the program.
+
+    :return: The parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Run Collatz validator.')
+    parser.add_argument(
+        "--start", help=("first number to validate. Default is "
+                         + str(DEFAULT_START_NUMBER)),
+        default=DEFAULT_START_NUMBER
+    )
+
+    parser.add_argument(
+        "--stop", help=("last number to validate. Default is "
+                        + str(DEFAULT_MAX_NUMBER)),
+        default=DEFAULT_MAX_NUMBER
+    )
+
+    parser.add_argument(
+        "--b", help=("number of values per block. Default is "
+                     + str(DEFAULT_BLOCK_SIZE)),
+        default=DEFAULT_BLOCK_SIZE
+    )
+
+    parser.add_argument(
+        "--w", help="number of worker processes. Default is the number of CPUs",
+        default=os.cpu_count()
+    )
+
+    parser.add_argument(
+        "--backend", help=("backend of the module collatz.tensor (numpy, tensorflow, "
+                           "tensorflow_compiled or tensorflow_xla). Default is '"
+                           + DEFAULT_BACKEND + "'"),
+        default=DEFAULT_BACKEND
+    )
+
+    parser.add_argument(
+        "--f", help=("path of the checkpoint file. Default is '"
+                     + DEFAULT_CHECKPOINT_PATH + "'"),
+        default=DEFAULT_CHECKPOINT_PATH
+    )
+
+    parser.add_argument(
+        "--s", help=("directory for the statistics of the start values. "
+                     "Default is None, which means that no statistics are written"),
+        default=None
+    )
+
+    parser.add_argument(
+        "--t", help=("limit below which the statistics are precomputed. Default is "
+                     + str(DEFAULT_TABLE_SIZE)),
+        default=DEFAULT_TABLE_SIZE
+    )
+
+    parser.add_argument(
+        "--k", help=("factor by which odd numbers are multiplied. Default is "
+                     + str(DEFAULT_K)),
+        default=DEFAULT_K
+    )
+
+    parser.add_argument(
+        "--c", help=("summand by which odd numbers are increased. Default is "
+                     + str(DEFAULT_C)),
+        default=DEFAULT_C
+    )
+
+    parser.add_argument(
+        "--m", help=("maximum number of odd steps per sequence. Default is "
+                     + str(DEFAULT_MAX_ITERATIONS) + ", which means no limit"),
+        default=DEFAULT_MAX_ITERATIONS
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+def _read_checkpoint(file_name: str, parameters: dict):
+    """
+    This function reads the last verified number from a checkpoint file. The checkpoint
+    is only used if it has been written with the same parameters (range, k, c, maximum
+    number of iterations and statistics directory).
+
+    :param file_name: The path of the checkpoint file.
+    :param parameters: The parameters of the validation as dict.
+    :return: The last verified number or None if no suitable checkpoint exists.
+    """
+    if not os.path.exists(file_name):
+        return None
+
+    with open(file_name, "r", encoding="utf-8") as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+
+    if {key: checkpoint.get(key) for key in parameters} != parameters:
+        logging.info("Ignoring checkpoint for different parameters")
+        return None
+
+    return checkpoint["verified"]
+
+
+def _write_checkpoint(file_name: str, parameters: dict, verified: int):
+    """
+    This function writes the last verified number to a checkpoint file. The file is
+    replaced atomically, so that an interrupted write never corrupts the checkpoint.
+
+    :param file_name: The path of the checkpoint file.
+    :param parameters: The parameters of the validation as dict.
+    :param verified: The last verified number.
+    :return: None.
+    """
+    tmp_file_name = file_name + "_tmp"
+
+    with open(tmp_file_name, "w", encoding="utf-8") as checkpoint_file:
+        json.dump(dict(parameters, verified=verified), checkpoint_file)
+
+    os.replace(tmp_file_name, file_name)
+
+
+def _validate_block(block: tuple):
+    """
+    This function validates a single block. It is executed by the worker processes. If
+    a statistics directory is specified, the statistics of the block are written to
+    this directory.
+
+    For the generalised variant kv+c, the sequences are classified instead. In this
+    case, the failed start values are additionally counted per cycle.
+
+    :param block: The block as tuple of the first value, the stop value (exclusive),
+        the name of the backend, the statistics directory or None, the table size,
+        k, c and the maximum number of iterations.
+    :return: The block and a tuple with the maximum number of odd steps, the number of
+        sequences validated with Python ints, an array with the failed start values and
+        a dict with the number of failed start values per cycle (smallest odd number).
+    """
+    start_value, stop_value, backend, statistics_path, table_size, k, c, \
+        max_iterations = block
+
+    # Variants with further cycles are classified before any statistics are calculated
+    if (k, c) != (DEFAULT_K, DEFAULT_C):
+        result = tc.classify_block(
+            start_value, stop_value, k, c, max_iterations, backend=backend)
+
+        reached_one = result["class"] == tc.CLASS_ONE
+        cycle_mins, counts = np.unique(
+            result["cycle_min"][result["class"] == tc.CLASS_CYCLE], return_counts=True)
+
+        max_steps = int(result["odd_steps"][reached_one].max(initial=0))
+        failed = result["v_1"][~reached_one]
+
+        if statistics_path is None or len(failed) > 0:
+            cycles = dict(zip(cycle_mins.tolist(), counts.tolist()))
+            return block, (max_steps, 0, failed, cycles)
+
+    elif statistics_path is None:
+        max_steps, big_int_count, failed = tc.validate_block(
+            start_value, stop_value, k, c, max_iterations, backend=backend)
+        return block, (max_steps, big_int_count, failed, {})
+
+    stats = tc.block_statistics(
+        start_value, stop_value, k, c, max_iterations, table_size=table_size,
+        backend=backend)
+
+    file_name = os.path.join(statistics_path, "block_%020d.npz" % start_value)
+    np.savez(file_name, **stats)
+
+    failed = stats["v_1"][stats["odd_steps"] < 0]
+    max_steps = int(stats["odd_steps"].max(initial=0))
+    big_int_count = int(np.count_nonzero(stats["peak_bits"] > 128))
+    return block, (max_steps, big_int_count, failed, {})
 
 
 def _main():
+    """
+    This function executes the program.
+
+    :return: None.
+    """
     # Setup
     logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
-    logging.info("Num GPUs available %s", len(tf.config.list_physical_devices('GPU')))
 
-    # Perform validation
-    odds_rng = range(START_NUMBER, MAX_NUMBER + 1)
-    odds = tf.constant(odds_rng, dtype=tf.int64)
+    args = _parse_cmd_args()
+    logging.debug("Command line args: %s", args)
+
+    start_number = int(args.start)
+    max_number = int(args.stop)
+    block_size = int(args.b)
+    worker_count = int(args.w)
+    checkpoint_file_name = args.f
+    statistics_path = args.s
+    table_size = int(args.t)
+    k_factor = int(args.k)
+    c_summand = int(args.c)
+    max_iterations = int(args.m)
+
+    # The statistics of the start values below the table size may enter further cycles
+    if statistics_path is not None and (k_factor, c_summand) != (DEFAULT_K, DEFAULT_C) \
+            and max_iterations < 0:
+        logging.error("Statistics of the variant %dv+%d require a maximum number of "
+                      "iterations (--m)", k_factor, c_summand)
+        return
+
+    if statistics_path is not None:
+        os.makedirs(statistics_path, exist_ok=True)
+
+    # Resume from the checkpoint
+    parameters = {"start": start_number, "stop": max_number, "k": k_factor,
+                  "c": c_summand, "m": max_iterations, "statistics": statistics_path}
+
+    first_number = start_number
+    verified = _read_checkpoint(checkpoint_file_name, parameters)
+
+    if verified is not None:
+        logging.info("Resuming validation after %d", verified)
+        first_number = verified + 1
+
+    blocks = [
+        (block_start, min(block_start + block_size, max_number + 1), args.backend,
+         statistics_path, table_size, k_factor, c_summand, max_iterations)
+        for block_start in range(first_number, max_number + 1, block_size)]
 
     logging.info(
-        "Validating %d Collatz sequences", len(odds))
+        "Validating %d Collatz sequences (%dv+%d) in %d blocks using backend %s "
+        "and %d workers", max_number - first_number + 1, k_factor, c_summand,
+        len(blocks), args.backend, worker_count)
 
-    counter = 0
+    # Perform validation
+    max_length = 0
+    big_int_count = 0
+    start_time = time.time()
+
+    with Pool(worker_count) as pool:
+        results = pool.imap(_validate_block, blocks)
+
+        for i, ((_, stop_value, *_), (steps, big_ints, failed, cycles)) \
+                in enumerate(results):
+            if len(failed) > 0:
+                logging.error("Validation failed for: %s", [int(value) for value in failed])
 
-    while tf.reduce_sum(odds) > tf.size(odds):
-        # Filter ones
-        ones = tf.not_equal(odds, 1)
-        odds = tf.boolean_mask(odds, ones)
+                for cycle_min, count in cycles.items():
+                    logging.error("Start values entering the cycle of %d: %d",
+                                  cycle_min, count)
+                return
 
-        # Calculate predecessors
-        evens = tc.next_even_collatz_numbers(odds)
-        odds = tc.next_odd_collatz_numbers(evens)
-        counter = counter + 1
+            max_length = max(max_length, steps)
+            big_int_count = big_int_count + big_ints
+
+            # The blocks are returned in order, so the checkpoint is always contiguous
+            _write_checkpoint(checkpoint_file_name, parameters, stop_value - 1)
+
+            elapsed = time.time() - start_time
+            eta = elapsed / (i + 1) * (len(blocks) - i - 1)
+            logging.info("Verified up to %d (%d/%d blocks, ETA %.0fs)",
+                         stop_value - 1, i + 1, len(blocks), eta)
 
     logging.info("Validation successful!")
-    logging.info("Max length: %d", counter)
+    logging.info("Sequences validated with Python ints: %d", big_int_count)
+
+    if statistics_path is None:
+        logging.info("Max stopping time (odd steps): %d", max_length)
+    else:
+        logging.info("Max total stopping time (odd steps): %d", max_length)
+        logging.info("Statistics written to %s", statistics_path)
 
 
 # Main block to start the program
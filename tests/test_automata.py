@@ -3,7 +3,9 @@ This module contains test cases for the module collatz.automata.
 """
 
 # Imports
+import numpy as np
 import pytest
+from collatz import automata, commons
 from collatz.automata import LeadingBitsMachine, TrailingBitsMachine
 
 
@@ -138,3 +140,282 @@ def test_trailing_bits_machine():
 
     with pytest.raises(TypeError):
         LeadingBitsMachine("101", "ABC")
+
+
+def test_transitions():
+    """
+    Testcase for the transitions of the machines.
+
+    :return: None.
+    """
+    # Leading
+    transitions = LeadingBitsMachine().transitions
+    assert len(transitions) == 20
+    assert transitions[("111", "101")] == [("100", 2)]
+    assert transitions[(None, "101")] == [("100", 2), ("111", 1)]
+
+    # Trailing
+    transitions = TrailingBitsMachine().transitions
+    assert len(transitions) == 8
+    assert transitions[("111", 2)] == [("011", 1), ("111", 1)]
+    assert len(transitions[("101", 1)]) == 8
+    assert {omega_i for _, omega_i in transitions[("101", 1)]} == {-2, -3}
+
+
+def test_simulate_leading_bits():
+    """
+    Testcase for the function simulate_leading_bits.
+
+    :return: None.
+    """
+    transitions = LeadingBitsMachine().transitions
+    states, lambdas = automata.simulate_leading_bits(50, 20, seed=42)
+    assert states.shape == (50, 21)
+    assert lambdas.shape == (50, 20)
+
+    # Every step is a valid transition
+    for chain in range(50):
+        previous_state = None
+        for i in range(20):
+            current_state = automata.LEADING_BITS_STATES[states[chain, i]]
+            next_state = automata.LEADING_BITS_STATES[states[chain, i + 1]]
+            assert (next_state, lambdas[chain, i]) in transitions[
+                (previous_state, current_state)]
+            previous_state = current_state
+
+    # Seed
+    other_states, other_lambdas = automata.simulate_leading_bits(50, 20, seed=42)
+    assert np.array_equal(states, other_states)
+    assert np.array_equal(lambdas, other_lambdas)
+
+    # Deterministic start
+    states, lambdas = automata.simulate_leading_bits(
+        10, 2, current_state="101", previous_state="111", seed=1)
+    assert (states[:, 1] == automata.LEADING_BITS_STATES.index("100")).all()
+    assert (states[:, 2] == automata.LEADING_BITS_STATES.index("110")).all()
+    assert (lambdas == [2, 1]).all()
+
+    # Test validation
+    with pytest.raises(TypeError):
+        automata.simulate_leading_bits(10, 2, current_state="ABC")
+
+
+def test_simulate_trailing_bits():
+    """
+    Testcase for the function simulate_trailing_bits.
+
+    :return: None.
+    """
+    transitions = TrailingBitsMachine().transitions
+    lambdas = np.random.default_rng(1).integers(1, 3, (50, 20))
+    states, omegas = automata.simulate_trailing_bits(50, 20, lambdas=lambdas, seed=42)
+    assert states.shape == (50, 21)
+    assert omegas.shape == (50, 20)
+
+    # Every step is a valid transition
+    for chain in range(50):
+        for i in range(20):
+            current_state = automata.TRAILING_BITS_STATES[states[chain, i]]
+            next_state = automata.TRAILING_BITS_STATES[states[chain, i + 1]]
+            assert (next_state, omegas[chain, i]) in transitions[
+                (current_state, lambdas[chain, i])]
+
+    # Random inputs
+    states, omegas = automata.simulate_trailing_bits(10, 1, current_state="111", seed=1)
+    assert set(states[:, 1]) <= {1, 3}
+    assert set(omegas[:, 0]) <= {0, 1}
+
+
+def test_simulate_bits():
+    """
+    Testcase for the function simulate_bits.
+
+    :return: None.
+    """
+    leading_states, trailing_states, lambdas, omegas = automata.simulate_bits(
+        1000, 50, seed=42)
+    assert leading_states.shape == trailing_states.shape == (1000, 51)
+    assert lambdas.shape == omegas.shape == (1000, 50)
+    assert set(np.unique(lambdas)) <= {1, 2}
+    assert set(np.unique(omegas)) <= {-3, -2, -1, 0, 1}
+
+    # The net growth is on average negative
+    assert omegas.mean() < 0
+
+    other = automata.simulate_bits(1000, 50, seed=42)
+    assert np.array_equal(omegas, other[3])
+
+
+def test_markov_chains():
+    """
+    Testcase for the Markov chains of the machines.
+
+    :return: None.
+    """
+    # Leading
+    machine = LeadingBitsMachine()
+    chain = machine.markov_chain()
+    matrix = machine.transition_matrix()
+    assert matrix.shape == (20, 20)
+    assert np.allclose(matrix.sum(axis=1), 1)
+    assert matrix[chain.states.index(("111", "101")),
+                  chain.states.index(("101", "100"))] == 1
+    assert chain.expected_output() == pytest.approx(27 / 17)
+
+    # Trailing
+    machine = TrailingBitsMachine()
+    chain = machine.markov_chain()
+    assert np.allclose(machine.transition_matrix().sum(axis=1), 1)
+    assert np.allclose(chain.stationary_distribution(), 0.25)
+    assert chain.expected_output() == pytest.approx(-0.375)
+
+    # Composition
+    chain = automata.composite_markov_chain()
+    assert len(chain.states) == 80
+    assert np.allclose(chain.transition_matrix().sum(axis=1), 1)
+    assert chain.expected_output() < 0
+
+    # The exact distribution agrees with the simulation
+    sums, probabilities = chain.output_distribution(10)
+    assert probabilities.sum() == pytest.approx(1)
+
+    _, _, _, omegas = automata.simulate_bits(100000, 10, seed=42)
+    assert omegas.sum(axis=1).mean() == pytest.approx(sums @ probabilities, abs=0.05)
+
+
+def test_composite_bounds():
+    """
+    Testcase for the path-sum bounds of the composite Markov chain.
+
+    :return: None.
+    """
+    chain = automata.composite_markov_chain()
+
+    # Enumeration of all paths
+    successors = {}
+    for state, next_state, _, omega_i in chain.transitions:
+        successors.setdefault(state, []).append((next_state, omega_i))
+
+    paths = {(state, 0) for state in chain.initial_states}
+    for _ in range(4):
+        paths = {(next_state, omega + omega_i) for state, omega in paths
+                 for next_state, omega_i in successors[state]}
+
+    reachable = chain.reachable_sums(4)
+    assert paths == {(state, omega) for state, sums in reachable.items() for omega in sums}
+
+    omegas = [omega for _, omega in paths]
+    assert chain.output_bounds(4) == (min(omegas), max(omegas))
+    assert chain.output_bounds(1000)[1] < 0.7 * 1000
+
+
+def test_transition_counter():
+    """
+    Testcase for the class TransitionCounter.
+
+    :return: None.
+    """
+    # Sequence of 7: 7, 11, 17, 13, 5, 1
+    counter = automata.TransitionCounter().count_block(7, 8)
+    assert counter.step_count == 5
+
+    leading_frame = counter.leading_frame()
+    assert list(leading_frame["count"]) == [1, 1, 1, 1]
+    assert set(zip(leading_frame["previous"], leading_frame["current"],
+                   leading_frame["next"], leading_frame["lambda_i"])) == {
+        (None, "111", "101", 2), ("111", "101", "100", 2), ("101", "100", "110", 1),
+        ("100", "110", "101", 2)}
+    assert leading_frame["possible"].all()
+
+    trailing_frame = counter.trailing_frame()
+    assert trailing_frame["count"].sum() == 5
+    assert set(trailing_frame[trailing_frame["current"] == "101"]["omega_i"]) == {-1, -2}
+
+    # Merging blocks
+    counter = automata.TransitionCounter().count_block(1, 501)
+    other = automata.TransitionCounter().count_block(501, 1001)
+    merged = automata.TransitionCounter().count_block(1, 1001)
+    counter.merge(other)
+    assert counter.step_count == merged.step_count
+    assert np.array_equal(counter.leading_counts, merged.leading_counts)
+    assert np.array_equal(counter.trailing_counts, merged.trailing_counts)
+
+    # 21 is a counterexample for the TrailingBitsMachine: 3 * 21 + 1 = 2**6
+    trailing_frame = automata.TransitionCounter().count_block(21, 22).trailing_frame()
+    assert list(trailing_frame["omega_i"]) == [-4]
+    assert not trailing_frame["possible"].any()
+
+    # Values that overflow int64 are continued with Python ints
+    counter = automata.TransitionCounter().count_block(2**62 + 1, 2**62 + 3)
+    assert counter.step_count == len(commons.odd_collatz_sequence(2**62 + 1)) - 1
+
+    # Maximum number of iterations
+    assert automata.TransitionCounter().count_block(27, 28, 10).step_count == 10
+    assert automata.TransitionCounter().count_block(
+        2**62 + 1, 2**62 + 3, 10).step_count == 10
+
+
+def test_bit_window_machine():
+    """
+    Testcase for the class BitWindowMachine.
+
+    :return: None.
+    """
+    # The sequence of 7 (7, 11, 17, 13, 5, 1) leads to a single path
+    machine = automata.BitWindowMachine.from_trajectories(3, True, 7, 8, seed=1)
+    assert machine.state_count() == 4
+    assert list(machine.initial_states()) == [3]
+    assert machine.state_name(machine.current_state) == "111"
+    assert machine.previous_state is None
+
+    assert [machine.next_state() for _ in range(4)] == [(1, 2), (0, 2), (2, 1), (1, 2)]
+    assert machine.state_name(machine.previous_state) == "110"
+
+    with pytest.raises(ValueError):
+        machine.next_state()
+
+    # Three leading bits agree with the TransitionCounter
+    machine = automata.BitWindowMachine.from_trajectories(3, True, 1, 2**12)
+    frame = automata.TransitionCounter().count_block(1, 2**12).leading_frame()
+    transitions = machine.transitions()
+    assert sum(len(branches) for branches in transitions.values()) == len(frame)
+
+    for row in frame.itertuples():
+        assert (row.next, row.lambda_i) in transitions[(row.previous, row.current)]
+
+    # Three trailing bits
+    machine = automata.BitWindowMachine.from_trajectories(3, False, 1, 2**12)
+    transitions = machine.transitions()
+    assert transitions[("001", 1)] == [("001", -1), ("011", -1), ("101", -1), ("111", -1)]
+    assert machine.state_name(0) == "001"
+    assert machine.next_state(lambda_i=2)[0] in range(4)
+
+    # More bits
+    machine = automata.BitWindowMachine.from_trajectories(6, False, 1, 2**12)
+    assert machine.state_count() == 32
+    assert machine.state_name(31) == "111111"
+    assert len(machine.initial_states()) == 32
+
+    machine = automata.BitWindowMachine.from_trajectories(6, True, 1, 2**12, seed=1)
+    assert machine.state_name(0) == "100000"
+    states, lambdas = machine.simulate(100, 20, seed=42)
+    assert states.shape == (100, 21)
+    assert lambdas.shape == (100, 20)
+    assert set(np.unique(lambdas)) <= {0, 1, 2}
+
+    transitions = machine.transitions()
+    for chain in range(100):
+        for i in range(20):
+            if states[chain, i + 1] < 0:
+                break
+
+            key = (machine.state_name(states[chain, i - 1]) if i > 0 else None,
+                   machine.state_name(states[chain, i]))
+            assert (machine.state_name(states[chain, i + 1]),
+                    lambdas[chain, i]) in transitions[key]
+
+    # Trailing bits with given inputs
+    machine = automata.BitWindowMachine.from_trajectories(6, False, 1, 2**12)
+    states, omegas = machine.simulate(10, 5, lambdas=np.full((10, 5), 2), seed=1)
+    assert states.shape == (10, 6)
+    assert (omegas <= 1).all()
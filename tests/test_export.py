@@ -0,0 +1,497 @@
+"""
+This module contains test cases for the module collatz.export.
+"""
+
+# Imports
+import bz2
+import gzip
+import lzma
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from collatz import commons
+from collatz import export
+from collatz.export import CsvBatchWriter, ExportManifest
+from collatz.export import export_chunks, generate_chunks
+
+
+def test_csv_batch_writer(tmp_path):
+    """
+    Testcase for the class CsvBatchWriter.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    file_name = str(tmp_path / "export.csv")
+    frames = [pd.DataFrame({"n": [i, i + 1], "v": [2**i, 2**(i + 60)]}) for i in range(5)]
+
+    # Batches are written as soon as they are complete
+    with CsvBatchWriter(file_name, batch_size=2) as writer:
+        writer.write(frames[0])
+        assert writer.row_count == 0
+        writer.write(frames[1])
+        assert writer.row_count == 4
+
+        for frame in frames[2:]:
+            writer.write(frame)
+
+    assert writer.row_count == 10
+
+    # The file equals the frames written separately
+    expected = "".join(
+        frame.to_csv(index=False, header=i == 0) for i, frame in enumerate(frames))
+
+    with open(file_name, "r", encoding="utf-8") as csv_file:
+        assert csv_file.read() == expected
+
+    # Empty export
+    with CsvBatchWriter(file_name) as writer:
+        pass
+
+    with open(file_name, "r", encoding="utf-8") as csv_file:
+        assert csv_file.read() == ""
+
+
+def test_compression_stream(tmp_path):
+    """
+    Testcase for the class CompressionStream and compressed csv files.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    frames = [pd.DataFrame({"n": [i, i + 1], "v": [2**i, 2**(i + 60)]}) for i in range(5)]
+    expected = "".join(
+        frame.to_csv(index=False, header=i == 0) for i, frame in enumerate(frames))
+
+    for compression, module in (("gzip", gzip), ("bz2", bz2), ("xz", lzma)):
+        file_name = str(tmp_path / ("export.csv" + export.COMPRESSIONS[compression]))
+
+        with CsvBatchWriter(file_name, 1, compression=compression) as writer:
+            for frame in frames[:3]:
+                writer.write(frame)
+            offset = writer.sync()
+
+            # The file is complete up to the offset
+            with module.open(file_name, "rt", encoding="utf-8") as csv_file:
+                assert expected.startswith(csv_file.read())
+            assert os.path.getsize(file_name) == offset
+
+            writer.write(frames[0])
+
+        # Continue after the offset
+        with CsvBatchWriter(file_name, 1, offset, compression) as writer:
+            for frame in frames[3:]:
+                writer.write(frame)
+
+        with module.open(file_name, "rt", encoding="utf-8") as csv_file:
+            assert csv_file.read() == expected
+
+    # Unsupported compression
+    with pytest.raises(ValueError):
+        export.CompressionStream(str(tmp_path / "export.csv.zip"), compression="zip")
+
+
+def test_temp_file_name():
+    """
+    Testcase for the function temp_file_name.
+
+    :return: None.
+    """
+    assert export.temp_file_name("data/export.csv") == os.path.join("data", "export_tmp.csv")
+    assert export.temp_file_name("export.csv.gz") == "export_tmp.csv.gz"
+    assert export.temp_file_name("export") == "export_tmp"
+
+
+def test_parquet_batch_writer(tmp_path):
+    """
+    Testcase for the class ParquetBatchWriter and the function read_parquet.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    pytest.importorskip("pyarrow")
+    file_name = str(tmp_path / "export.parquet")
+
+    # The first batch fits into int64, the second one does not
+    frames = [pd.DataFrame({"k": [3, 3], "v": [2**i, 2**(i + 60)], "f": [0.5, 1.5]})
+              for i in range(5)]
+
+    with export.create_writer(file_name, export.PARQUET_FORMAT, batch_size=2,
+                              big_int_columns=["v"]) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+    assert writer.row_count == 10
+
+    result = export.read_parquet(file_name)
+    assert list(result.columns) == ["k", "v", "f"]
+    assert list(result["v"]) == [v for frame in frames for v in frame["v"]]
+    assert list(result["k"]) == [3] * 10
+    assert result["f"].dtype == np.float64
+
+    # Column projection
+    result = export.read_parquet(file_name, ["v"])
+    assert list(result.columns) == ["v"]
+    assert result["v"][9] == 2**64
+
+    # Unknown format
+    with pytest.raises(ValueError):
+        export.create_writer(file_name, "xls")
+
+
+def test_parquet_batch_writer_empty_batch(tmp_path):
+    """
+    Testcase for the class ParquetBatchWriter with an empty first batch, whose column
+    types cannot be inferred.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    pytest.importorskip("pyarrow")
+    file_name = str(tmp_path / "export.parquet")
+
+    empty_frame = pd.DataFrame({"k": pd.Series([], dtype=np.int64),
+                                "v": pd.Series([], dtype=object),
+                                "b": pd.Series([], dtype=object)})
+    frame = pd.DataFrame({"k": [3, 3], "v": [1, 2**64], "b": ["1", "10"]})
+
+    with export.create_writer(file_name, export.PARQUET_FORMAT, batch_size=1,
+                              big_int_columns=["v"]) as writer:
+        writer.write(empty_frame)
+        writer.write(frame)
+        writer.write(empty_frame)
+
+    assert writer.row_count == 2
+
+    result = export.read_parquet(file_name)
+    assert list(result.columns) == ["k", "v", "b"]
+    assert list(result["v"]) == [1, 2**64]
+    assert list(result["b"]) == ["1", "10"]
+
+    # Only empty batches
+    with export.create_writer(file_name, export.PARQUET_FORMAT, batch_size=1) as writer:
+        writer.write(empty_frame)
+
+    result = export.read_parquet(file_name)
+    assert list(result.columns) == ["k", "v", "b"]
+    assert len(result) == 0
+
+
+def test_encode_big_ints():
+    """
+    Testcase for the functions encode_big_ints and decode_big_ints.
+
+    :return: None.
+    """
+    values = [0, 1, -5, 2**63 - 1, 2**63, -2**63, -2**63 - 1, 3**100]
+    ints, raw = export.encode_big_ints(values)
+
+    assert ints.dtype == np.int64
+    assert list(ints[:4]) == values[:4]
+    assert raw[:4] == [None] * 4
+    assert raw[5] is None
+    assert raw[4] == b"\x00\x80" + b"\x00" * 7
+
+    decoded = export.decode_big_ints(ints, raw)
+    assert decoded.dtype == object
+    assert list(decoded) == values
+
+    # Int64 arrays are not converted
+    ints, raw = export.encode_big_ints(np.array([7, 9]))
+    assert list(ints) == [7, 9]
+    assert raw == [None, None]
+
+
+def test_binary_columns():
+    """
+    Testcase for the function binary_columns.
+
+    :return: None.
+    """
+    values = [1, 5, 2**9 + 3, 2**70 + 2**68 + 6]
+
+    # Full binary strings
+    columns = export.binary_columns(values, "v_bin")
+    assert list(columns) == ["v_bin"]
+    assert list(columns["v_bin"]) == [commons.to_binary(v) for v in values]
+
+    # Compact encodings of Python ints and int64 arrays
+    columns = export.binary_columns(values, "v_bin", export.BINARY_BYTES, 4)
+    assert list(columns) == ["v_bin_len", "v_bin_lead", "v_bin_trail", "v_bin_hex"]
+    assert list(columns["v_bin_len"]) == [1, 3, 10, 71]
+    assert list(columns["v_bin_lead"]) == [1, 5, 8, 10]
+    assert list(columns["v_bin_trail"]) == [1, 5, 3, 6]
+    assert list(columns["v_bin_hex"]) == ["1", "5", "203", "500000000000000006"]
+
+    int_columns = export.binary_columns(
+        np.array(values[:3]), "v_bin", export.BINARY_COMPACT, 4)
+    assert list(int_columns) == ["v_bin_len", "v_bin_lead", "v_bin_trail"]
+    for name, column in int_columns.items():
+        assert list(column) == list(columns[name][:3])
+
+    with pytest.raises(ValueError):
+        export.binary_columns(values, "v_bin", "octal")
+
+    with pytest.raises(ValueError):
+        export.binary_columns(values, "v_bin", export.BINARY_COMPACT, 64)
+
+
+def test_binary_strings():
+    """
+    Testcase for the functions binary_strings and from_binary_windows.
+
+    :return: None.
+    """
+    values = [1, 5, 2**9 + 3, 2**15 + 1, 2**70 + 6]
+    expected = [commons.to_binary(v) for v in values]
+
+    frame = pd.DataFrame(export.binary_columns(values, "v_bin", export.BINARY_BYTES))
+    frame["v"] = values
+
+    # Reconstruction from the values, the hexadecimal strings and the windows
+    assert list(export.binary_strings(frame, "v_bin")) == expected
+    assert list(export.binary_strings(frame.drop(columns=["v"]), "v_bin")) == expected
+
+    compact_frame = frame.drop(columns=["v", "v_bin_hex"])[:4]
+    assert list(export.binary_strings(compact_frame, "v_bin")) == expected[:4]
+
+    with pytest.raises(ValueError):
+        export.binary_strings(frame.drop(columns=["v", "v_bin_hex"]), "v_bin")
+
+    assert export.from_binary_windows(5, 15, 14, 4) == "11110"
+
+
+def _sequence_frame(sequence_id, start_value):
+    """
+    This function creates the frame of a chunk for the test of the function
+    generate_chunks. It must be defined at the top level to be picklable.
+
+    :param sequence_id: The sequence id.
+    :param start_value: The start value.
+    :return: The data frame.
+    """
+    sequence = commons.odd_collatz_sequence(start_value)
+    return pd.DataFrame({"sequence_id": sequence_id, "v_i": sequence})
+
+
+def test_generate_chunks():
+    """
+    Testcase for the function generate_chunks.
+
+    :return: None.
+    """
+    chunks = [(i + 1, 2 * i + 1) for i in range(20)]
+    expected = [_sequence_frame(*chunk) for chunk in chunks]
+
+    # The results are returned in the order of the chunks
+    for worker_count, max_pending in ((1, None), (3, None), (2, 1), (4, 7)):
+        frames = list(generate_chunks(
+            _sequence_frame, chunks, worker_count, max_pending))
+
+        assert len(frames) == len(chunks)
+        for frame, expected_frame in zip(frames, expected):
+            pd.testing.assert_frame_equal(frame, expected_frame)
+
+    # No chunks
+    assert not list(generate_chunks(_sequence_frame, [], 2))
+
+
+def test_resumable_export(tmp_path):
+    """
+    Testcase for the class ExportManifest and the function export_chunks.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    file_name = str(tmp_path / "export.csv")
+    manifest_file_name = file_name + export.MANIFEST_SUFFIX
+    chunks = [(i + 1, 2 * i + 1) for i in range(6)]
+    units = [(3, 2 * i + 1) for i in range(6)]
+
+    # Uninterrupted export
+    with CsvBatchWriter(file_name, 1) as writer:
+        for frame in [_sequence_frame(*chunk) for chunk in chunks]:
+            writer.write(frame)
+
+    with open(file_name, "r", encoding="utf-8") as csv_file:
+        expected = csv_file.read()
+
+    # Export of the first chunks
+    manifest = ExportManifest(manifest_file_name)
+    assert manifest.load(units) == 0
+
+    with CsvBatchWriter(file_name, 1) as writer:
+        written = export_chunks(writer, _sequence_frame, chunks[:4], units[:4], manifest, 1)
+        assert list(written) == units[:4]
+
+        # Incomplete batch and manifest entry
+        writer.write(pd.DataFrame({"sequence_id": [5], "v_i": [11]}))
+
+    with open(manifest_file_name, "a", encoding="utf-8") as manifest_file:
+        manifest_file.write('{"unit": [3,')
+
+    # Resume the export
+    manifest = ExportManifest(manifest_file_name)
+    completed = manifest.load(units)
+
+    assert completed == 4
+    assert manifest.units == units[:4]
+    assert manifest.row_count == sum(len(_sequence_frame(*c)) for c in chunks[:4])
+
+    with CsvBatchWriter(file_name, 1, manifest.offset) as writer:
+        written = export_chunks(writer, _sequence_frame, chunks[completed:],
+                                units[completed:], manifest, 2)
+        assert list(written) == units[4:]
+
+    with open(file_name, "r", encoding="utf-8") as csv_file:
+        assert csv_file.read() == expected
+
+    # Units of other parameters are not resumed
+    assert ExportManifest(manifest_file_name).load([(5, 1)]) == 0
+
+    manifest = ExportManifest(manifest_file_name, {"m": 5})
+    manifest.load(units)
+    manifest.commit(units[0], 10, 1)
+
+    assert ExportManifest(manifest_file_name, {"m": 5}).load(units) == 1
+    assert ExportManifest(manifest_file_name, {"m": 50}).load(units) == 0
+
+    # Units are not resumed if the export file has been deleted
+    manifest = ExportManifest(manifest_file_name)
+    manifest.load(units)
+    manifest.commit(units[0], 10, 1)
+    os.remove(file_name)
+
+    manifest = ExportManifest(manifest_file_name)
+    assert manifest.load(units, file_name) == 0
+    assert manifest.offset == 0 and manifest.units == []
+
+    with CsvBatchWriter(file_name, 1, manifest.offset) as writer:
+        assert list(export_chunks(writer, _sequence_frame, chunks, units, manifest, 1)) == units
+
+    with open(file_name, "r", encoding="utf-8") as csv_file:
+        assert csv_file.read() == expected
+
+    assert ExportManifest(manifest_file_name).load(units, file_name) == 6
+
+    manifest.remove()
+    assert not os.path.exists(manifest_file_name)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "bz2", "xz"])
+def test_read_sequences(tmp_path, compression):
+    """
+    Testcase for the index of the CsvBatchWriter and the function read_sequences.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :param compression: The compression of the csv file.
+    :return: None.
+    """
+    file_name = str(tmp_path / "export.csv")
+    if compression:
+        file_name = file_name + export.COMPRESSIONS[compression]
+
+    index_columns = ("sequence_id", "v_1")
+    frames = [_sequence_frame(i + 1, 2**64 + 2 * i + 1).assign(v_1=2**64 + 2 * i + 1)
+              for i in range(6)]
+
+    # Export that is interrupted after the first three sequences
+    with CsvBatchWriter(file_name, 2, compression=compression,
+                        index_columns=index_columns) as writer:
+        for frame in frames[:3]:
+            writer.write(frame)
+        offset = writer.sync()
+        writer.write(frames[3])
+
+    with CsvBatchWriter(file_name, 2, offset, compression, index_columns) as writer:
+        for frame in frames[3:]:
+            writer.write(frame)
+
+    index_frame = export.read_index(file_name)
+    assert list(index_frame["sequence_id"]) == [1, 2, 3, 4, 5, 6]
+    assert list(index_frame["rows"]) == [len(frame) for frame in frames]
+    assert index_frame["v_1"].astype(str).tolist() == [str(2**64 + 2 * i + 1) for i in range(6)]
+
+    # The sequences are read from their offsets
+    expected = pd.concat([frames[1], frames[4]], ignore_index=True)
+    result = export.read_sequences(file_name, [2, 5])
+
+    assert result["sequence_id"].tolist() == expected["sequence_id"].tolist()
+    assert result["v_i"].astype(str).tolist() == expected["v_i"].astype(str).tolist()
+
+    # Lookup of a start value
+    start_values = index_frame["v_1"].astype(str)
+    result = export.read_rows(file_name, index_frame[start_values == str(2**64 + 7)])
+    assert result["sequence_id"].unique().tolist() == [4]
+
+
+def test_export_metadata(tmp_path):
+    """
+    Testcase for the functions write_metadata, read_metadata and reusable_parts.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    file_name = str(tmp_path / "export.csv")
+    parameters = {"k": [1, 3], "start": 1, "stop": 99, "m": 100}
+    version = export.source_version()
+
+    assert len(version) == 64
+    assert export.read_metadata(file_name) is None
+
+    with CsvBatchWriter(file_name) as writer:
+        writer.write(_sequence_frame(1, 27))
+
+    export.write_metadata(file_name, parameters, version, writer.row_count)
+    metadata = export.read_metadata(file_name)
+
+    assert metadata["parameters"] == parameters
+    assert metadata["rows"] == writer.row_count
+
+    # Parts can only be taken over if all other parameters are equal
+    assert export.reusable_parts(metadata, dict(parameters, k=[3, 5]), version) == [1, 3]
+    assert export.reusable_parts(metadata, dict(parameters, m=200), version) == []
+    assert export.reusable_parts(metadata, parameters, "other") == []
+    assert export.reusable_parts(None, parameters, version) == []
+
+    # The metadata of a changed file is discarded
+    with open(file_name, "a", encoding="utf-8") as csv_file:
+        csv_file.write("2,1\n")
+
+    assert export.read_metadata(file_name) is None
+
+    # Compressed parquet files are rejected before any file is touched
+    file_name = str(tmp_path / "export.parquet")
+    parameters = {"k": [3], "m": 100, "format": export.PARQUET_FORMAT, "compression": "gzip"}
+
+    with pytest.raises(ValueError):
+        export.export_sequences(file_name, _sequence_frame, parameters, version, range(1, 9))
+
+    assert not os.path.exists(file_name)
+    assert not os.path.exists(export.temp_file_name(file_name))
+
+
+def test_read_part(tmp_path):
+    """
+    Testcase for the function read_part.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    file_name = str(tmp_path / "export.csv")
+    part_file_name = str(tmp_path / "part.csv")
+    frames = [_sequence_frame(i + 1, 2 * i + 1).assign(x=0.1 * i) for i in range(6)]
+
+    with CsvBatchWriter(file_name, index_columns=("sequence_id",)) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+    # The rows of the sequences 3 and 4 are written as sequences 1 and 2
+    with CsvBatchWriter(part_file_name) as writer:
+        writer.write(export.read_part(file_name, 3, 2, -2))
+
+    expected = pd.concat(frames[2:4]).assign(sequence_id=lambda f: f["sequence_id"] - 2)
+
+    with open(part_file_name, "r", encoding="utf-8") as csv_file:
+        assert csv_file.read() == expected.to_csv(index=False)
@@ -0,0 +1,136 @@
+"""
+This module contains test cases for the module collatz.markov.
+"""
+
+# Imports
+import numpy as np
+import pytest
+from collatz.markov import MarkovChain
+
+
+def _coin_chain():
+    """
+    This function returns a chain with two states, which are left with a probability
+    of one half. Leaving a state has the output one, staying has the output zero.
+
+    :return: The MarkovChain.
+    """
+    return MarkovChain([
+        ("a", "a", 0.5, 0),
+        ("a", "b", 0.5, 1),
+        ("b", "b", 0.5, 0),
+        ("b", "a", 0.5, 1)], initial_states=["a"])
+
+
+def test_transition_matrix():
+    """
+    Testcase for the method transition_matrix.
+
+    :return: None.
+    """
+    chain = _coin_chain()
+    assert chain.states == ["a", "b"]
+    assert np.allclose(chain.transition_matrix(), [[0.5, 0.5], [0.5, 0.5]])
+    assert np.allclose(chain.initial_distribution(), [1, 0])
+
+    # Multiple transitions between the same states
+    chain = MarkovChain([("a", "a", 0.25, 1), ("a", "a", 0.75, 2)])
+    assert np.allclose(chain.transition_matrix(), [[1]])
+    assert np.allclose(chain.initial_distribution(), [1])
+
+
+def test_stationary_distribution():
+    """
+    Testcase for the method stationary_distribution.
+
+    :return: None.
+    """
+    assert np.allclose(_coin_chain().stationary_distribution(), [0.5, 0.5])
+
+    # Transient states
+    chain = MarkovChain([
+        ("s", "a", 1, 0),
+        ("a", "b", 1, 0),
+        ("b", "a", 0.5, 0),
+        ("b", "b", 0.5, 0)])
+    assert np.allclose(chain.stationary_distribution(), [0, 1 / 3, 2 / 3])
+
+
+def test_expected_output():
+    """
+    Testcase for the method expected_output.
+
+    :return: None.
+    """
+    chain = _coin_chain()
+    assert chain.expected_output() == pytest.approx(0.5)
+    assert chain.expected_output(np.array([1, 0])) == pytest.approx(0.5)
+
+    chain = MarkovChain([("a", "a", 0.25, 1), ("a", "a", 0.75, -3)])
+    assert chain.expected_output() == pytest.approx(-2)
+
+
+def test_output_distribution():
+    """
+    Testcase for the method output_distribution.
+
+    :return: None.
+    """
+    # Binomial distribution
+    sums, probabilities = _coin_chain().output_distribution(4)
+    assert list(sums) == [0, 1, 2, 3, 4]
+    assert np.allclose(probabilities, np.array([1, 4, 6, 4, 1]) / 16)
+
+    # No transitions
+    sums, probabilities = _coin_chain().output_distribution(0)
+    assert list(sums) == [0]
+    assert np.allclose(probabilities, [1])
+
+    # Negative outputs and impossible sums
+    chain = MarkovChain([("a", "a", 0.5, -2), ("a", "a", 0.5, 2)])
+    sums, probabilities = chain.output_distribution(2)
+    assert list(sums) == [-4, 0, 4]
+    assert np.allclose(probabilities, [0.25, 0.5, 0.25])
+
+
+def test_reachable_sums():
+    """
+    Testcase for the method reachable_sums.
+
+    :return: None.
+    """
+    sums = _coin_chain().reachable_sums(2)
+    assert list(sums.keys()) == ["a", "b"]
+    assert list(sums["a"]) == [0, 2]
+    assert list(sums["b"]) == [1]
+
+    # Other start states and paths without transitions
+    sums = _coin_chain().reachable_sums(0, states=["b"])
+    assert list(sums.keys()) == ["b"]
+    assert list(sums["b"]) == [0]
+
+    # States without successors are not reachable after the first transition
+    chain = MarkovChain([("s", "a", 0.5, -1), ("s", "b", 0.5, 3), ("a", "a", 1, 2)])
+    sums = chain.reachable_sums(2, states=["s"])
+    assert list(sums.keys()) == ["a"]
+    assert list(sums["a"]) == [1]
+
+
+def test_output_bounds():
+    """
+    Testcase for the method output_bounds.
+
+    :return: None.
+    """
+    assert _coin_chain().output_bounds(0) == (0, 0)
+    assert _coin_chain().output_bounds(5) == (0, 5)
+
+    # Agreement with the reachable sums
+    chain = MarkovChain([
+        ("a", "b", 0.5, -2),
+        ("a", "a", 0.5, 1),
+        ("b", "a", 1, 3)], initial_states=["a"])
+
+    for steps in range(6):
+        sums = np.concatenate(list(chain.reachable_sums(steps).values()))
+        assert chain.output_bounds(steps) == (sums.min(), sums.max())
@@ -3,6 +3,7 @@ This module contains test cases for the module notebooks.nbutils.
 """
 
 # Imports
+import os
 import pytest
 import pandas as pd
 from notebooks import nbutils
@@ -66,3 +67,56 @@ def test_swap_column_names():
     # Should only accept data frames
     with pytest.raises(AssertionError):
         nbutils.swap_column_names(("a", "b"), 1)
+
+
+def test_load_export(tmp_path):
+    """
+    Test case for the method load_export.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :return: None.
+    """
+    file_name = str(tmp_path / "alpha_export.csv")
+    cache_file_name = file_name + nbutils.CACHE_SUFFIX
+
+    pd.DataFrame({
+        "sequence_id": [1, 1, 2],
+        "n": [1, 2, 1],
+        "v_i": [3, 5, 2**70 + 1],
+        "v_i_bin": ["11", "101", "1" + "0" * 69 + "1"],
+        "a_i_max": [1.5, 2.25, 70.5],
+        "terminal": [False, True, False]
+    }).to_csv(file_name, index=False)
+
+    # Test schema
+    frame = nbutils.load_export(file_name)
+    assert os.path.exists(cache_file_name)
+
+    assert frame["sequence_id"].dtype == "int64"
+    assert frame["a_i_max"].dtype == "float64"
+    assert frame["terminal"].dtype == "bool"
+    assert list(frame["v_i"]) == [3, 5, 2**70 + 1]
+    assert list(frame["v_i_bin"]) == ["11", "101", "1" + "0" * 69 + "1"]
+
+    # Test projection and downcasting
+    frame = nbutils.load_export(file_name, columns=["n", "v_i"], downcast=True, cache=False)
+    assert list(frame.columns) == ["n", "v_i"]
+    assert frame["n"].dtype == "int8"
+    assert frame["v_i"].dtype == "object"
+
+    # The cache is not used for another schema
+    frame = nbutils.load_export(file_name, schema={"v_i_bin": "str", "v_i": "str"})
+    assert list(frame["v_i"]) == ["3", "5", str(2**70 + 1)]
+    assert list(nbutils.load_export(file_name)["v_i"]) == [3, 5, 2**70 + 1]
+
+    # Older csv files are loaded from the cache
+    pd.DataFrame({"sequence_id": [7], "v_i": [9]}).to_csv(file_name, index=False)
+    cache_time = os.path.getmtime(cache_file_name)
+
+    os.utime(file_name, (cache_time - 10, cache_time - 10))
+    assert list(nbutils.load_export(file_name)["sequence_id"]) == [1, 1, 2]
+
+    os.utime(file_name, (cache_time + 10, cache_time + 10))
+    frame = nbutils.load_export(file_name)
+    assert list(frame["sequence_id"]) == [7]
+    assert frame["v_i"].dtype == "int64"
@@ -0,0 +1,67 @@
+"""
+This module contains test cases for the validation mode of the script run_alpha_export.
+"""
+
+# Imports
+import logging
+import pytest
+import run_alpha_export
+from collatz import export
+
+
+def test_invariant_violations():
+    """
+    Testcase for the function _invariant_violations.
+
+    :return: None.
+    """
+    sequence_frame = run_alpha_export._generate_odd_sequences(
+        1, range(1, 200, 2), 3, -1, run_alpha_export.BINARY_COMPACT)
+
+    # Valid steps do not violate any invariant
+    violation_frame = run_alpha_export._invariant_violations(sequence_frame)
+    columns = [run_alpha_export.INVARIANT_PREFIX + name
+               for name in run_alpha_export.INVARIANTS]
+    assert list(violation_frame.columns) == columns
+    assert not violation_frame.any(axis=None)
+
+    # A broken step is flagged
+    sequence_frame.loc[5, "a_i"] = 0
+    sequence_frame.loc[5, "l"] = sequence_frame.loc[5, "l_max"] + 1
+    violation_frame = run_alpha_export._invariant_violations(sequence_frame)
+    assert list(violation_frame.index[violation_frame.any(axis=1)]) == [5]
+    assert violation_frame.loc[5, "invalid_a_i_min"]
+    assert violation_frame.loc[5, "invalid_l_max"]
+    assert violation_frame.loc[5].sum() == 2
+
+
+def test_validate_odd_sequences(tmp_path, caplog):
+    """
+    Testcase for the function _validate_odd_sequences and the export of empty batches
+    of counterexamples.
+
+    :param tmp_path: The temporary directory provided by pytest.
+    :param caplog: The log capture provided by pytest.
+    :return: None.
+    """
+    pytest.importorskip("pyarrow")
+    file_name = str(tmp_path / "counterexamples.parquet")
+
+    counterexample_frame = run_alpha_export._validate_odd_sequences(
+        1, range(1, 200, 2), 3, -1)
+    assert len(counterexample_frame) == 0
+
+    with export.create_writer(file_name, export.PARQUET_FORMAT, batch_size=1,
+                              big_int_columns=run_alpha_export.BIG_INT_COLUMNS) as writer:
+        writer.write(counterexample_frame)
+
+    result = export.read_parquet(file_name)
+    assert list(result.columns) == list(counterexample_frame.columns)
+    assert len(result) == 0
+
+    # No violations are counted
+    with caplog.at_level(logging.INFO):
+        run_alpha_export._log_violations(file_name, export.PARQUET_FORMAT)
+
+    assert "0 steps violate at least one invariant" in caplog.text
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
@@ -1,89 +1,500 @@
 """
-This module contains test cases for the module collatz.tensor.
+This module contains test cases for the module collatz.tensor. The test cases
+for the tensorflow backend are skipped if tensorflow is not installed.
 """
 import numpy as np
-import tensorflow as tf
+import pytest
+from collatz import commons as com
 from collatz import tensor as tc
 
 
-def test_next_even_collatz_numbers():
+# Backends under test
+BACKENDS = ["numpy", "tensorflow", "tensorflow_compiled", "tensorflow_xla"]
+
+
+def _get_backend(name):
+    """
+    This function returns the backend with the given name and skips the
+    current test if the backend is not available.
+
+    :param name: The name of the backend.
+    :return: The backend.
+    """
+    if name.startswith("tensorflow"):
+        pytest.importorskip("tensorflow")
+    return tc.get_backend(name)
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_next_even_collatz_numbers(backend_name):
     """
     Testcase for the method next_even_collatz_numbers.
 
+    :param backend_name: The name of the backend to test.
     :return: None.
     """
+    backend = _get_backend(backend_name)
+
     # Test empty list
-    odds_np = np.array([])
-    odds = tf.constant(odds_np, dtype=tf.int64)
+    odds = np.array([])
 
-    evens = tc.next_even_collatz_numbers(odds)
+    evens = tc.next_even_collatz_numbers(odds, backend=backend)
     assert list(evens) == list(odds)
 
     # Test default case
-    odds_np = np.array([1, 3, 5])
-    odds = tf.constant(odds_np, dtype=tf.int64)
+    odds = np.array([1, 3, 5])
 
-    evens = tc.next_even_collatz_numbers(odds)
-    assert list(evens) == list(odds_np * 3 + 1)
+    evens = tc.next_even_collatz_numbers(odds, backend=backend)
+    assert list(evens) == list(odds * 3 + 1)
 
-    odds_np = np.array(range(1, 1001 + 1))
-    odds = tf.constant(odds_np, dtype=tf.int64)
+    odds = np.array(range(1, 1001 + 1))
 
-    evens = tc.next_even_collatz_numbers(odds, k=5, c=3)
-    assert list(evens) == list(odds_np * 5 + 3)
+    evens = tc.next_even_collatz_numbers(odds, k=5, c=3, backend=backend)
+    assert list(evens) == list(odds * 5 + 3)
 
     # Test negative values
-    odds_np = np.array([-1])
-    odds = tf.constant(odds_np, dtype=tf.int64)
+    odds = np.array([-1])
 
     # Test different k and c
-    evens = tc.next_even_collatz_numbers(odds, k=5, c=3)
-    assert list(evens) == list(odds_np * 5 + 3)
+    evens = tc.next_even_collatz_numbers(odds, k=5, c=3, backend=backend)
+    assert list(evens) == list(odds * 5 + 3)
 
-    # Test without tensor
+    # Test list
     odds = [1, 2, 3]
 
-    evens = tc.next_even_collatz_numbers(odds, k=7, c=5)
+    evens = tc.next_even_collatz_numbers(odds, k=7, c=5, backend=backend)
     assert list(evens) == list(np.array(odds) * 7 + 5)
 
 
-def test_next_odd_collatz_numbers():
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_next_odd_collatz_numbers(backend_name):
     """
     Testcase for the method next_odd_collatz_numbers.
 
+    :param backend_name: The name of the backend to test.
     :return: None.
     """
+    backend = _get_backend(backend_name)
+
     # Test empty list
-    evens_np = np.array([])
-    evens = tf.constant(evens_np, dtype=tf.int64)
+    evens = np.array([])
 
-    odds = tc.next_odd_collatz_numbers(evens)
+    odds = tc.next_odd_collatz_numbers(evens, backend=backend)
     assert list(odds) == list(evens)
 
     # Test default case
-    evens_np = [4, 10, 16]
-    evens = tf.constant(evens_np, dtype=tf.int64)
+    evens = [4, 10, 16]
 
-    odds = tc.next_odd_collatz_numbers(evens)
+    odds = tc.next_odd_collatz_numbers(evens, backend=backend)
     assert list(odds) == [1, 5, 1]
 
     # Test negative numbers
-    evens_np = [32, -10, 22]
-    evens = tf.constant(evens_np, dtype=tf.int64)
+    evens = [32, -10, 22]
 
-    odds = tc.next_odd_collatz_numbers(evens)
+    odds = tc.next_odd_collatz_numbers(evens, backend=backend)
     assert list(odds) == [1, -5, 11]
 
 
-def test_trailing_zeros():
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_trailing_zeros(backend_name):
     """
     Testcase for the method trailing_zeros.
 
+    :param backend_name: The name of the backend to test.
     :return: None.
     """
+    backend = _get_backend(backend_name)
+
     # Empty list
-    assert list(tc.trailing_zeros([])) == []
+    assert list(tc.trailing_zeros([], backend=backend)) == []
 
     # Default cases
-    assert list(tc.trailing_zeros([10, 16, 11])) == [1, 4, 0]
-    assert list(tc.trailing_zeros(np.array([32, -2, -20]))) == [5, 1, 2]
+    assert list(tc.trailing_zeros([10, 16, 11], backend=backend)) == [1, 4, 0]
+    assert list(tc.trailing_zeros(np.array([32, -2, -20]), backend=backend)) == [5, 1, 2]
+
+
+def test_tensorflow_input():
+    """
+    Testcase for tensorflow tensors handed over to the backends.
+
+    :return: None.
+    """
+    tf = pytest.importorskip("tensorflow")
+    odds = tf.constant([1, 3, 5], dtype=tf.int64)
+
+    for backend_name in BACKENDS:
+        evens = tc.next_even_collatz_numbers(odds, backend=backend_name)
+        assert list(evens) == [4, 10, 16]
+
+        odds_next = tc.next_odd_collatz_numbers(evens, backend=backend_name)
+        assert list(odds_next) == [1, 5, 1]
+
+
+def test_backends():
+    """
+    Testcase for the functions get_backend and set_backend.
+
+    :return: None.
+    """
+    # Numpy is the default backend
+    assert isinstance(tc.get_backend(), tc.NumpyBackend)
+    assert str(tc.get_backend()) == "numpy"
+    assert tc.get_backend("numpy") is tc.get_backend()
+
+    # Objects are returned as they are
+    backend = tc.NumpyBackend()
+    assert tc.get_backend(backend) is backend
+
+    # Select another backend
+    try:
+        assert tc.set_backend(backend) is backend
+        assert tc.get_backend() is backend
+        assert list(tc.next_even_collatz_numbers([1])) == [4]
+    finally:
+        tc.set_backend("numpy")
+
+    # Unknown backends are not accepted
+    with pytest.raises(ValueError):
+        tc.get_backend("abc")
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_trailing_zeros_exact(backend_name):
+    """
+    Testcase for the exactness of the method trailing_zeros for big values.
+
+    :param backend_name: The name of the backend to test.
+    :return: None.
+    """
+    backend = _get_backend(backend_name)
+
+    numbers = [2**62, 2**62 + 2**61, -2**63, 2**63 - 1, 3 * 2**40, 0]
+    assert list(tc.trailing_zeros(numbers, backend=backend)) == [62, 61, 63, 0, 40, 64]
+
+    numbers = list(range(1, 10001))
+    expected = [com.trailing_zeros(n) for n in numbers]
+    assert list(tc.trailing_zeros(numbers, backend=backend)) == expected
+
+    # Values that are not exact in float64
+    numbers = [2**60 - 2**3, 2**61 + 2**5, 2**62 + 2**4]
+    assert list(tc.trailing_zeros(numbers, backend=backend)) == [3, 5, 4]
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_checked_next_even_collatz_numbers(backend_name):
+    """
+    Testcase for the method checked_next_even_collatz_numbers.
+
+    :param backend_name: The name of the backend to test.
+    :return: None.
+    """
+    backend = _get_backend(backend_name)
+
+    # Default case
+    evens, overflow = tc.checked_next_even_collatz_numbers([1, 3, 5], backend=backend)
+    assert list(evens) == [4, 10, 16]
+    assert list(overflow) == [False, False, False]
+
+    # Values near the limit of int64
+    limit = (tc.INT64_MAX - 1) // 3
+    odds = [limit - 2, limit, limit + 2, tc.INT64_MAX]
+
+    evens, overflow = tc.checked_next_even_collatz_numbers(odds, backend=backend)
+    assert list(overflow) == [False, False, True, True]
+    assert list(evens)[:2] == [3 * (limit - 2) + 1, 3 * limit + 1]
+
+    # Different k and c
+    limit = (tc.INT64_MAX - 3) // 5
+    evens, overflow = tc.checked_next_even_collatz_numbers(
+        [limit, limit + 1, -limit - 1], k=5, c=3, backend=backend)
+    assert list(overflow) == [False, True, False]
+    assert list(evens)[0] == 5 * limit + 3
+
+
+def test_overflow_bounds():
+    """
+    Testcase for the method overflow_bounds.
+
+    :return: None.
+    """
+    for k, c in [(3, 1), (5, 3), (1, 1), (7, -5), (-3, 1), (0, 1), (9, 2**63)]:
+        lower, upper = tc.overflow_bounds(k, c)
+
+        if lower <= upper:
+            assert tc.INT64_MIN <= k * lower + c <= tc.INT64_MAX
+            assert tc.INT64_MIN <= k * upper + c <= tc.INT64_MAX
+
+        if tc.INT64_MIN < lower:
+            assert not tc.INT64_MIN <= k * (lower - 1) + c <= tc.INT64_MAX
+        if upper < tc.INT64_MAX:
+            assert not tc.INT64_MIN <= k * (upper + 1) + c <= tc.INT64_MAX
+
+    assert tc.overflow_bounds(3, 1) == (-3074457345618258603, 3074457345618258602)
+
+
+def _stopping_time(start_value, k=3, c=1):
+    """
+    This function returns the number of odd steps until a Collatz sequence
+    drops below its start value or reaches one.
+
+    :param start_value: The odd start value.
+    :param k: The factor by which odd numbers are multiplied in the sequence.
+    :param c: The summand by which odd numbers in the sequence are increased.
+    :return: The number of odd steps.
+    """
+    value = start_value
+    steps = 0
+
+    while True:
+        value = com.next_odd_collatz_number(value, k, c)
+        steps = steps + 1
+
+        if value < start_value or value == 1:
+            return steps
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_validate_block(backend_name):
+    """
+    Testcase for the method validate_block.
+
+    :param backend_name: The name of the backend to test.
+    :return: None.
+    """
+    backend = _get_backend(backend_name)
+
+    # Default case
+    max_steps, big_int_count, failed = tc.validate_block(1, 10001, backend=backend)
+    assert max_steps == max(_stopping_time(n) for n in range(1, 10001, 2))
+    assert big_int_count == 0
+    assert len(failed) == 0
+
+    # Even start values and empty blocks
+    assert tc.validate_block(27, 28, backend=backend)[0] == _stopping_time(27)
+    assert tc.validate_block(28, 29, backend=backend)[0] == 0
+    assert tc.validate_block(10, 10, backend=backend)[0] == 0
+
+    # Values that overflow int64 are continued with two limbs
+    start_value = 2**62 - 101
+    max_steps, big_int_count, failed = tc.validate_block(
+        start_value, start_value + 200, backend=backend)
+    assert max_steps == max(
+        _stopping_time(n) for n in range(start_value, start_value + 200, 2))
+    assert big_int_count == 0
+    assert len(failed) == 0
+
+    # Values that overflow 128 bits are continued with Python ints
+    max_steps, big_int_count, failed = tc.validate_block(
+        1, 8, k=2**31 - 1, max_iterations=10, backend=backend)
+    assert max_steps == 1
+    assert big_int_count == 3
+    assert list(failed) == [3, 5, 7]
+
+    # Factors that are not supported by two limbs
+    _, big_int_count, failed = tc.validate_block(
+        1, 8, k=2**33 + 1, max_iterations=10, backend=backend)
+    assert big_int_count == 4
+    assert list(failed) == [1, 3, 5, 7]
+
+    # Cycles and diverging sequences of 5v+1
+    _, _, failed = tc.validate_block(1, 20, k=5, max_iterations=50, backend=backend)
+    assert list(failed) == [5, 7, 9, 13, 17]
+
+    # Generalised variant
+    max_steps, _, failed = tc.validate_block(1, 1001, k=1, c=1, backend=backend)
+    assert len(failed) == 0
+    assert max_steps == max(_stopping_time(n, 1, 1) for n in range(1, 1001, 2))
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_iterate_block(backend_name):
+    """
+    Testcase for the method iterate_block.
+
+    :param backend_name: The name of the backend to test.
+    :return: None.
+    """
+    backend = _get_backend(backend_name)
+
+    # Retired sequences
+    values, iterations, status = backend.iterate_block([1, 3, 7, 27])
+    assert list(values) == [1, 1, 5, 23]
+    assert list(iterations) == [1, 2, 4, _stopping_time(27)]
+    assert list(status) == [tc.BLOCK_RETIRED] * 4
+
+    # Sequences that exceed the maximum number of iterations
+    values, iterations, status = backend.iterate_block([27, 3], max_iterations=3)
+    assert list(values) == [47, 1]
+    assert list(iterations) == [3, 2]
+    assert list(status) == [tc.BLOCK_EXHAUSTED, tc.BLOCK_RETIRED]
+
+    # Values that overflow int64 keep the value before the overflow
+    _, upper = tc.overflow_bounds()
+    values, iterations, status = backend.iterate_block([upper + 1, 3])
+    assert list(values) == [upper + 1, 1]
+    assert list(iterations) == [0, 2]
+    assert list(status) == [tc.BLOCK_OVERFLOW, tc.BLOCK_RETIRED]
+
+    # Empty input
+    values, iterations, status = backend.iterate_block([])
+    assert values.size == iterations.size == status.size == 0
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_classify_block(backend_name):
+    """
+    Testcase for the method classify_block.
+
+    :param backend_name: The name of the backend to test.
+    :return: None.
+    """
+    backend = _get_backend(backend_name)
+
+    # Default case
+    result = tc.classify_block(1, 1001, backend=backend)
+    assert list(result.keys()) == list(tc.CLASSIFICATION_COLUMNS)
+    assert list(result["v_1"]) == list(range(1, 1001, 2))
+    assert (result["class"] == tc.CLASS_ONE).all()
+    assert (result["cycle_min"] == -1).all()
+    assert list(result["odd_steps"]) == [0] + [
+        len(com.odd_collatz_sequence(n)) - 1 for n in range(3, 1001, 2)]
+
+    # Cycles and diverging sequences of 5v+1
+    result = tc.classify_block(1, 34, k=5, max_iterations=100, backend=backend)
+    assert list(result["class"][[0, 1, 2, 3, 6, 8, 13, 16]]) == [
+        tc.CLASS_ONE, tc.CLASS_ONE, tc.CLASS_CYCLE, tc.CLASS_BOUND,
+        tc.CLASS_CYCLE, tc.CLASS_CYCLE, tc.CLASS_CYCLE, tc.CLASS_CYCLE]
+    assert list(result["cycle_min"][[2, 6, 8, 13, 16]]) == [13, 13, 17, 17, 13]
+    assert list(result["cycle_length"][[2, 6, 8, 13, 16]]) == [3, 3, 3, 3, 3]
+    assert result["odd_steps"][3] == 100
+
+    # Sequences that exceed the maximum value or int64
+    result = tc.classify_block(7, 8, k=5, max_value=1000, backend=backend)
+    assert result["class"][0] == tc.CLASS_BOUND
+    assert result["odd_steps"][0] == 8
+
+    result = tc.classify_block(7, 8, k=5, backend=backend)
+    assert result["class"][0] == tc.CLASS_BOUND
+
+    # Cycles with a length of one
+    result = tc.classify_block(5, 6, k=3, c=5, backend=backend)
+    assert result["class"][0] == tc.CLASS_CYCLE
+    assert result["cycle_min"][0] == 5
+    assert result["cycle_length"][0] == 1
+
+    # Empty block
+    assert tc.classify_block(10, 10, backend=backend)["v_1"].size == 0
+
+
+def test_bit_length():
+    """
+    Testcase for the method bit_length.
+
+    :return: None.
+    """
+    numbers = [0, 1, 2, 3, 255, 256, 2**53 + 1, 2**62 - 1, 2**62, tc.INT64_MAX]
+    assert list(tc.bit_length(numbers)) == [n.bit_length() for n in numbers]
+    assert list(tc.bit_length([])) == []
+
+
+@pytest.mark.parametrize("backend_name", BACKENDS)
+def test_block_statistics(backend_name):
+    """
+    Testcase for the method block_statistics.
+
+    :param backend_name: The name of the backend to test.
+    :return: None.
+    """
+    backend = _get_backend(backend_name)
+
+    def expected_statistics(start_value):
+        sequence = com.collatz_sequence(start_value) if start_value > 1 else [1]
+        peak = max(sequence)
+        return [start_value, len([x for x in sequence[:-1] if x % 2 == 1]),
+                len(sequence) - 1, peak if peak <= tc.INT64_MAX else -1, peak.bit_length()]
+
+    def actual_statistics(stats):
+        return [[int(stats[name][i]) for name in tc.STATISTICS_COLUMNS]
+                for i in range(len(stats["v_1"]))]
+
+    # Values inside and outside of the table
+    stats = tc.block_statistics(1, 2001, table_size=500, backend=backend)
+    assert set(stats.keys()) == set(tc.STATISTICS_COLUMNS)
+    assert actual_statistics(stats) == [expected_statistics(n) for n in range(1, 2001, 2)]
+    assert actual_statistics(tc.block_statistics(27, 28, backend=backend)) == [
+        [27, 41, 111, 9232, 14]]
+
+    # Peaks that overflow int64
+    start_value = 2**62 - 101
+    stats = tc.block_statistics(
+        start_value, start_value + 100, table_size=2**12, backend=backend)
+    assert actual_statistics(stats) == [
+        expected_statistics(n) for n in range(start_value, start_value + 100, 2)]
+    assert -1 in list(stats["peak"])
+
+    # Peaks that overflow 128 bits
+    stats = tc.block_statistics(
+        1, 4, k=2**31 - 1, max_iterations=10, table_size=0, backend=backend)
+    assert list(stats["odd_steps"]) == [0, -1]
+    assert list(stats["peak"]) == [1, -1]
+
+    # Sequences that do not reach one
+    stats = tc.block_statistics(1, 16, k=5, max_iterations=30, table_size=0, backend=backend)
+    assert list(stats["odd_steps"]) == [0, 1, -1, -1, -1, -1, -1, 3]
+    assert list(stats["peak"]) == [1, 16, -1, -1, -1, -1, -1, 96]
+
+    # The looked up steps count towards the maximum number of iterations
+    stats = tc.block_statistics(1, 30, max_iterations=3, table_size=16, backend=backend)
+    assert int(stats["odd_steps"][11]) == -1
+
+    for start_value, max_iterations in [(1, 20), (2**62 - 101, 60)]:
+        stop_value = start_value + 2000
+        expected = tc.block_statistics(
+            start_value, stop_value, max_iterations=max_iterations, table_size=0,
+            backend=backend)
+
+        for table_size in [16, 500, 2**12]:
+            stats = tc.block_statistics(
+                start_value, stop_value, max_iterations=max_iterations,
+                table_size=table_size, backend=backend)
+            assert actual_statistics(stats) == actual_statistics(expected)
+
+
+def test_limbs():
+    """
+    Testcase for the functions that process numbers in the two limb representation.
+
+    :return: None.
+    """
+    numbers = [1, 3, 27, 2**63 + 1, 2**64 - 1, 2**64 + 1, 2**100 + 7, 2**127 - 1, 2**128 - 1]
+
+    # Conversion
+    hi, lo = tc.to_limbs(numbers)
+    assert hi.dtype == np.uint64
+    assert tc.from_limbs(hi, lo) == numbers
+    assert tc.from_limbs(*tc.to_limbs(np.array([5, 7], dtype=np.int64))) == [5, 7]
+    assert list(tc.bit_length_limbs(hi, lo)) == [n.bit_length() for n in numbers]
+
+    # Next even numbers
+    for k, c in [(3, 1), (5, 3), (2**32 - 1, 2**64 - 1)]:
+        next_hi, next_lo, overflow = tc.next_even_collatz_limbs(hi, lo, k, c)
+        expected = [k * n + c for n in numbers]
+        assert list(overflow) == [e >= 2**128 for e in expected]
+        assert [e for e, o in zip(expected, overflow) if not o] == [
+            n for n, o in zip(tc.from_limbs(next_hi, next_lo), overflow) if not o]
+
+    with pytest.raises(ValueError):
+        tc.next_even_collatz_limbs(hi, lo, k=2**32)
+
+    with pytest.raises(ValueError):
+        tc.next_even_collatz_limbs(hi, lo, c=-1)
+
+    # Trailing zeros and shifts
+    numbers = [2, 2**64, 3 * 2**70, 2**127, 2**65 + 2**3, 6]
+    hi, lo = tc.to_limbs(numbers)
+    assert list(tc.trailing_zeros_limbs(hi, lo)) == [1, 64, 70, 127, 3, 1]
+    assert tc.from_limbs(*tc.next_odd_collatz_limbs(hi, lo)) == [1, 1, 3, 1, 2**62 + 1, 3]
+
+    for shift in [0, 1, 63, 64, 65, 127, 128]:
+        shifted = tc.right_shift_limbs(hi, lo, [shift] * len(numbers))
+        assert tc.from_limbs(*shifted) == [n >> shift for n in numbers]